@@ -0,0 +1,73 @@
+"""split_document_ocr
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-01-26
+
+Move OCR text and metadata from documents into document_ocr
+(1:1, document_id primary key) so document list reads stay narrow.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b4c5d6e7f8'
+down_revision: Union[str, None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OCR_COLUMNS = (
+    # (alte Spalte in documents, neue Spalte in document_ocr)
+    ('ocr_raw_text', 'raw_text'),
+    ('ocr_corrected_text', 'corrected_text'),
+    ('ocr_confidence', 'confidence'),
+    ('ocr_engine', 'engine'),
+    ('llm_extraction_error', 'llm_extraction_error'),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'document_ocr',
+        sa.Column('document_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('raw_text', sa.Text(), nullable=True),
+        sa.Column('corrected_text', sa.Text(), nullable=True),
+        sa.Column('confidence', sa.Numeric(5, 2), nullable=True),
+        sa.Column('engine', sa.String(50), nullable=True),
+        sa.Column('llm_extraction_error', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('document_id'),
+    )
+
+    old = ", ".join(o for o, _ in OCR_COLUMNS)
+    new = ", ".join(n for _, n in OCR_COLUMNS)
+    op.execute(f"""
+        INSERT INTO document_ocr (document_id, {new})
+        SELECT id, {old} FROM documents
+        WHERE {" OR ".join(f"{o} IS NOT NULL" for o, _ in OCR_COLUMNS)}
+    """)
+
+    for old_column, _ in OCR_COLUMNS:
+        op.drop_column('documents', old_column)
+
+
+def downgrade() -> None:
+    op.add_column('documents', sa.Column('ocr_raw_text', sa.Text(), nullable=True))
+    op.add_column('documents', sa.Column('ocr_corrected_text', sa.Text(), nullable=True))
+    op.add_column('documents', sa.Column('ocr_confidence', sa.Numeric(5, 2), nullable=True))
+    op.add_column('documents', sa.Column('ocr_engine', sa.String(50), nullable=True))
+    op.add_column('documents', sa.Column('llm_extraction_error', sa.Text(), nullable=True))
+
+    op.execute(f"""
+        UPDATE documents d
+        SET {", ".join(f"{o} = o.{n}" for o, n in OCR_COLUMNS)}
+        FROM document_ocr o
+        WHERE o.document_id = d.id
+    """)
+
+    op.drop_table('document_ocr')
@@ -0,0 +1,41 @@
+"""add_current_partial_indexes
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-01-16
+
+Partial indexes for "current" lookups:
+- tenant_addresses(tenant_id) WHERE is_current
+- tenants(unit_id) WHERE is_active AND move_out_date IS NULL
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_tenant_addresses_current',
+        'tenant_addresses',
+        ['tenant_id'],
+        postgresql_where=sa.text('is_current'),
+    )
+    op.create_index(
+        'ix_tenants_unit_current',
+        'tenants',
+        ['unit_id'],
+        postgresql_where=sa.text('is_active AND move_out_date IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tenants_unit_current', table_name='tenants')
+    op.drop_index('ix_tenant_addresses_current', table_name='tenant_addresses')
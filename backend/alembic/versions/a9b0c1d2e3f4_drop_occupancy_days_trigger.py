@@ -0,0 +1,32 @@
+"""drop_occupancy_days_trigger
+
+Revision ID: a9b0c1d2e3f4
+Revises: f8a9b0c1d2e3
+Create Date: 2026-02-02
+
+Trigger aus c9d0e1f2a3b4 entfernen. Er hat bei geänderten Ein-/Auszugsdaten
+nur settlement_results.occupancy_days nachgezogen; Kosten, Vorauszahlungen,
+Saldo und Aufschlüsselungen blieben auf dem alten Stand. Außerdem waren die
+Status-Codes fest im SQL verdrahtet. Die Belegungstage kommen wieder
+ausschließlich aus der Berechnung (CalculationService).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9b0c1d2e3f4'
+down_revision: Union[str, None] = 'f8a9b0c1d2e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_tenants_occupancy_days ON tenants")
+    op.execute("DROP FUNCTION IF EXISTS refresh_occupancy_days()")
+
+
+def downgrade() -> None:
+    # Der inkonsistente Trigger wird bewusst nicht wiederhergestellt
+    pass
@@ -0,0 +1,30 @@
+"""add_document_content_sha256
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-01-27
+
+SHA-256 of the uploaded file, used to reuse OCR/extraction results
+when the same file is uploaded again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c5d6e7f8a9'
+down_revision: Union[str, None] = 'a3b4c5d6e7f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('content_sha256', sa.LargeBinary(32), nullable=True))
+    op.create_index('ix_documents_sha256', 'documents', ['content_sha256'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_sha256', table_name='documents')
+    op.drop_column('documents', 'content_sha256')
@@ -0,0 +1,46 @@
+"""add_fk_composite_indexes
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-01-18
+
+Composite / covering indexes for the FK lookups:
+- invoices(settlement_id, cost_category) INCLUDE (total_amount, allocation_percentage)
+- line_items(invoice_id)
+- documents(settlement_id, document_status), documents(settlement_result_id)
+- manual_entries(settlement_id, unit_id)
+- tenants(unit_id, is_active)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_invoices_settlement_cat',
+        'invoices',
+        ['settlement_id', 'cost_category'],
+        postgresql_include=['total_amount', 'allocation_percentage'],
+    )
+    op.create_index('ix_line_items_invoice_id', 'line_items', ['invoice_id'])
+    op.create_index('ix_documents_settlement_status', 'documents', ['settlement_id', 'document_status'])
+    op.create_index('ix_documents_settlement_result_id', 'documents', ['settlement_result_id'])
+    op.create_index('ix_manual_entries_settlement_unit', 'manual_entries', ['settlement_id', 'unit_id'])
+    op.create_index('ix_tenants_unit_active', 'tenants', ['unit_id', 'is_active'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tenants_unit_active', table_name='tenants')
+    op.drop_index('ix_manual_entries_settlement_unit', table_name='manual_entries')
+    op.drop_index('ix_documents_settlement_result_id', table_name='documents')
+    op.drop_index('ix_documents_settlement_status', table_name='documents')
+    op.drop_index('ix_line_items_invoice_id', table_name='line_items')
+    op.drop_index('ix_invoices_settlement_cat', table_name='invoices')
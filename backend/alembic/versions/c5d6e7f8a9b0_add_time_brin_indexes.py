@@ -0,0 +1,39 @@
+"""add_time_brin_indexes
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-01-28
+
+BRIN indexes on documents.upload_date and settlement_results.created_at
+(both tables are append-only in time order).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d6e7f8a9b0'
+down_revision: Union[str, None] = 'b4c5d6e7f8a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_documents_upload_date_brin',
+        'documents',
+        ['upload_date'],
+        postgresql_using='brin',
+    )
+    op.create_index(
+        'ix_settlement_results_created_brin',
+        'settlement_results',
+        ['created_at'],
+        postgresql_using='brin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_settlement_results_created_brin', table_name='settlement_results')
+    op.drop_index('ix_documents_upload_date_brin', table_name='documents')
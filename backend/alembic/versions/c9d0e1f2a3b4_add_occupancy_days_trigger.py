@@ -0,0 +1,54 @@
+"""add_occupancy_days_trigger
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-01-20
+
+Keep settlement_results.occupancy_days of open settlements in sync when a
+tenant's move-in / move-out date changes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # settlements.status: 1 = DRAFT, 2 = CALCULATED (siehe SETTLEMENT_STATUS_CODES);
+    # finalisierte/exportierte Abrechnungen bleiben unverändert
+    op.execute("""
+        CREATE OR REPLACE FUNCTION refresh_occupancy_days() RETURNS trigger AS $$
+        BEGIN
+            UPDATE settlement_results sr
+            SET occupancy_days = GREATEST(
+                LEAST(s.period_end, COALESCE(NEW.move_out_date, s.period_end))
+                - GREATEST(s.period_start, NEW.move_in_date) + 1,
+                0
+            )
+            FROM settlements s
+            WHERE sr.settlement_id = s.id
+              AND sr.tenant_id = NEW.id
+              AND s.status IN (1, 2);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_tenants_occupancy_days
+        AFTER UPDATE OF move_in_date, move_out_date ON tenants
+        FOR EACH ROW
+        WHEN (OLD.move_in_date IS DISTINCT FROM NEW.move_in_date
+              OR OLD.move_out_date IS DISTINCT FROM NEW.move_out_date)
+        EXECUTE FUNCTION refresh_occupancy_days()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_tenants_occupancy_days ON tenants")
+    op.execute("DROP FUNCTION IF EXISTS refresh_occupancy_days()")
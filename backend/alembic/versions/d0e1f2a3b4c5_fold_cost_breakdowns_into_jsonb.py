@@ -0,0 +1,116 @@
+"""fold_cost_breakdowns_into_jsonb
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-01-22
+
+Move settlement_cost_breakdowns into settlement_results.calculation_details
+(JSONB, key "breakdowns") and drop the table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SMALLINT-Codes (1-basiert) -> Enum-Namen, siehe app.models.enums *_CODES
+COST_CATEGORIES = (
+    "ARRAY['GRUNDSTEUER', 'WASSERVERSORGUNG', 'ENTWAESSERUNG', 'HEIZUNG', 'WARMWASSER', "
+    "'VERBUNDENE_ANLAGEN', 'AUFZUG', 'STRASSENREINIGUNG', 'GEBAEUDEREINIGUNG', "
+    "'GARTENPFLEGE', 'BELEUCHTUNG', 'SCHORNSTEINREINIGUNG', 'VERSICHERUNG', "
+    "'HAUSWART', 'ANTENNE_KABEL', 'WAESCHEPFLEGE', 'SONSTIGE']"
+)
+ALLOCATION_METHODS = (
+    "ARRAY['WOHNFLAECHE', 'PERSONENZAHL', 'EINHEIT', 'VERBRAUCH', 'MITEIGENTUMSANTEIL']"
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE settlement_results "
+        "ALTER COLUMN calculation_details TYPE jsonb USING calculation_details::jsonb"
+    )
+
+    op.execute(f"""
+        UPDATE settlement_results sr
+        SET calculation_details = COALESCE(sr.calculation_details, '{{}}'::jsonb)
+            || jsonb_build_object('breakdowns', b.breakdowns)
+        FROM (
+            SELECT
+                settlement_result_id,
+                jsonb_agg(jsonb_build_object(
+                    'cost_category', ({COST_CATEGORIES})[cost_category],
+                    'total_property_cost', (total_property_cost / 100.0)::numeric(12, 2)::text,
+                    'allocation_percentage', allocation_percentage::text,
+                    'allocated_amount', (allocated_amount / 100.0)::numeric(12, 2)::text,
+                    'allocation_method', ({ALLOCATION_METHODS})[allocation_method]
+                ) ORDER BY cost_category) AS breakdowns
+            FROM settlement_cost_breakdowns
+            GROUP BY settlement_result_id
+        ) b
+        WHERE b.settlement_result_id = sr.id
+    """)
+
+    op.drop_table('settlement_cost_breakdowns')
+
+    op.execute(
+        "CREATE INDEX ix_settlement_results_breakdowns ON settlement_results "
+        "USING gin ((calculation_details -> 'breakdowns') jsonb_path_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_settlement_results_breakdowns', table_name='settlement_results')
+
+    op.create_table(
+        'settlement_cost_breakdowns',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('settlement_result_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('cost_category', sa.SmallInteger(), nullable=False),
+        sa.Column('total_property_cost', sa.BigInteger(), nullable=False),
+        sa.Column('allocation_percentage', sa.Numeric(5, 4), nullable=False),
+        sa.Column('allocated_amount', sa.BigInteger(), nullable=False),
+        sa.Column('allocation_method', sa.SmallInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['settlement_result_id'], ['settlement_results.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('settlement_result_id', 'cost_category', name='uq_result_category'),
+    )
+
+    op.execute(f"""
+        INSERT INTO settlement_cost_breakdowns (
+            id, settlement_result_id, cost_category, total_property_cost,
+            allocation_percentage, allocated_amount, allocation_method
+        )
+        SELECT
+            gen_random_uuid(),
+            sr.id,
+            array_position({COST_CATEGORIES}, b.cost_category)::smallint,
+            round(b.total_property_cost::numeric * 100)::bigint,
+            b.allocation_percentage::numeric(5, 4),
+            round(b.allocated_amount::numeric * 100)::bigint,
+            array_position({ALLOCATION_METHODS}, b.allocation_method)::smallint
+        FROM settlement_results sr,
+            jsonb_to_recordset(sr.calculation_details -> 'breakdowns') AS b(
+                cost_category text,
+                total_property_cost text,
+                allocation_percentage text,
+                allocated_amount text,
+                allocation_method text
+            )
+    """)
+
+    op.execute(
+        "UPDATE settlement_results SET calculation_details = calculation_details - 'breakdowns'"
+    )
+    op.execute(
+        "ALTER TABLE settlement_results "
+        "ALTER COLUMN calculation_details TYPE json USING calculation_details::json"
+    )
@@ -0,0 +1,82 @@
+"""add_generated_display_columns
+
+Revision ID: d4e5f6a7b8c9
+Revises: 164666f109d6
+Create Date: 2026-01-10
+
+Display values as stored generated columns (computed once at write time):
+- properties.full_address
+- tenants.full_name
+- tenant_addresses.full_address
+- settlements.period_label
+- documents.file_size_mb
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, None] = '164666f109d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column(
+        'full_address',
+        sa.Text(),
+        sa.Computed("street || ' ' || house_number || ', ' || postal_code || ' ' || city", persisted=True),
+    ))
+
+    op.add_column('tenants', sa.Column(
+        'full_name',
+        sa.Text(),
+        sa.Computed(
+            "CASE WHEN coalesce(salutation, '') <> '' "
+            "THEN salutation || ' ' || first_name || ' ' || last_name "
+            "ELSE first_name || ' ' || last_name END",
+            persisted=True,
+        ),
+    ))
+
+    op.add_column('tenant_addresses', sa.Column(
+        'full_address',
+        sa.Text(),
+        sa.Computed(
+            "street || CASE WHEN coalesce(house_number, '') <> '' THEN ' ' || house_number ELSE '' END "
+            "|| ', ' || postal_code || ' ' || city",
+            persisted=True,
+        ),
+    ))
+
+    # to_char() ist nicht IMMUTABLE und in generated columns nicht erlaubt
+    op.add_column('settlements', sa.Column(
+        'period_label',
+        sa.Text(),
+        sa.Computed(
+            "lpad(extract(day FROM period_start)::int::text, 2, '0') || '.' "
+            "|| lpad(extract(month FROM period_start)::int::text, 2, '0') || '.' "
+            "|| extract(year FROM period_start)::int::text || ' - ' "
+            "|| lpad(extract(day FROM period_end)::int::text, 2, '0') || '.' "
+            "|| lpad(extract(month FROM period_end)::int::text, 2, '0') || '.' "
+            "|| extract(year FROM period_end)::int::text",
+            persisted=True,
+        ),
+    ))
+
+    op.add_column('documents', sa.Column(
+        'file_size_mb',
+        sa.Numeric(12, 2),
+        sa.Computed("round(file_size_bytes / 1048576.0, 2)", persisted=True),
+    ))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'file_size_mb')
+    op.drop_column('settlements', 'period_label')
+    op.drop_column('tenant_addresses', 'full_address')
+    op.drop_column('tenants', 'full_name')
+    op.drop_column('properties', 'full_address')
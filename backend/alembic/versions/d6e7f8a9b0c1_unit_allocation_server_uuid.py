@@ -0,0 +1,32 @@
+"""unit_allocation_server_uuid
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-01-29
+
+unit_allocations.id wird serverseitig per gen_random_uuid() erzeugt
+(PostgreSQL 13+, kein pgcrypto nötig).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6e7f8a9b0c1'
+down_revision: Union[str, None] = 'c5d6e7f8a9b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'unit_allocations',
+        'id',
+        server_default=sa.text('gen_random_uuid()'),
+    )
+
+
+def downgrade() -> None:
+    op.alter_column('unit_allocations', 'id', server_default=None)
@@ -0,0 +1,39 @@
+"""add_settlement_year_column
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-01-24
+
+settlements.year as stored generated column + BRIN index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, None] = 'd0e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('settlements', sa.Column(
+        'year',
+        sa.SmallInteger(),
+        sa.Computed("extract(year FROM period_start)::smallint", persisted=True),
+    ))
+    op.create_index(
+        'ix_settlements_year_brin',
+        'settlements',
+        ['year'],
+        postgresql_using='brin',
+        postgresql_with={'pages_per_range': 8},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_settlements_year_brin', table_name='settlements')
+    op.drop_column('settlements', 'year')
@@ -0,0 +1,75 @@
+"""enums_to_smallint
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-01-12
+
+Replace PostgreSQL enum types with SMALLINT codes
+(codes = declaration order, see app.models.enums *_CODES).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ENUM_VALUES = {
+    'costcategory': [
+        'GRUNDSTEUER', 'WASSERVERSORGUNG', 'ENTWAESSERUNG', 'HEIZUNG', 'WARMWASSER',
+        'VERBUNDENE_ANLAGEN', 'AUFZUG', 'STRASSENREINIGUNG', 'GEBAEUDEREINIGUNG',
+        'GARTENPFLEGE', 'BELEUCHTUNG', 'SCHORNSTEINREINIGUNG', 'VERSICHERUNG',
+        'HAUSWART', 'ANTENNE_KABEL', 'WAESCHEPFLEGE', 'SONSTIGE',
+    ],
+    'allocationmethod': ['WOHNFLAECHE', 'PERSONENZAHL', 'EINHEIT', 'VERBRAUCH', 'MITEIGENTUMSANTEIL'],
+    'documentstatus': ['PENDING', 'PROCESSING', 'PROCESSED', 'FAILED', 'VERIFIED'],
+    'settlementstatus': ['DRAFT', 'CALCULATED', 'FINALIZED', 'EXPORTED'],
+}
+
+# (Tabelle, Spalte, Enum-Typ)
+COLUMNS = [
+    ('documents', 'document_status', 'documentstatus'),
+    ('documents', 'extracted_cost_category', 'costcategory'),
+    ('invoices', 'cost_category', 'costcategory'),
+    ('line_items', 'cost_category', 'costcategory'),
+    ('manual_entries', 'cost_category', 'costcategory'),
+    ('settlements', 'status', 'settlementstatus'),
+    ('settlement_cost_breakdowns', 'cost_category', 'costcategory'),
+    ('settlement_cost_breakdowns', 'allocation_method', 'allocationmethod'),
+    ('unit_allocations', 'cost_category', 'costcategory'),
+    ('unit_allocations', 'allocation_method', 'allocationmethod'),
+]
+
+
+def _array_literal(enum_name: str) -> str:
+    return "ARRAY[" + ", ".join(f"'{v}'" for v in ENUM_VALUES[enum_name]) + "]"
+
+
+def upgrade() -> None:
+    for table, column, enum_name in COLUMNS:
+        # 1-basierte Position im Array = SMALLINT-Code
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE smallint "
+            f"USING array_position({_array_literal(enum_name)}::text[], {column}::text)::smallint"
+        )
+
+    for enum_name in ENUM_VALUES:
+        op.execute(f"DROP TYPE IF EXISTS {enum_name}")
+
+
+def downgrade() -> None:
+    for enum_name, values in ENUM_VALUES.items():
+        op.execute(
+            f"CREATE TYPE {enum_name} AS ENUM (" + ", ".join(f"'{v}'" for v in values) + ")"
+        )
+
+    for table, column, enum_name in COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {enum_name} "
+            f"USING ({_array_literal(enum_name)})[{column}]::{enum_name}"
+        )
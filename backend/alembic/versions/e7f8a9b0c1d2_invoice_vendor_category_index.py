@@ -0,0 +1,35 @@
+"""invoice_vendor_category_index
+
+Revision ID: e7f8a9b0c1d2
+Revises: d6e7f8a9b0c1
+Create Date: 2026-01-30
+
+Partial-Index auf lower(vendor_name) der verifizierten Rechnungen (inkl.
+cost_category) fuer die Kategorie-Historie pro Lieferant bei der
+LLM-Extraktion.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7f8a9b0c1d2'
+down_revision: Union[str, None] = 'd6e7f8a9b0c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_invoices_vendor_verified',
+        'invoices',
+        [sa.text('lower(vendor_name)')],
+        postgresql_include=['cost_category'],
+        postgresql_where=sa.text('is_verified'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoices_vendor_verified', table_name='invoices')
@@ -0,0 +1,37 @@
+"""entry_type_to_smallint
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-01-25
+
+Store manual_entries.entry_type as SMALLINT code
+(see app.models.enums.ENTRY_TYPE_CODES). Unknown free-text values
+become ADJUSTMENT.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ENTRY_TYPES = "ARRAY['CREDIT', 'DEBIT', 'ADJUSTMENT']"
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE manual_entries ALTER COLUMN entry_type TYPE smallint "
+        f"USING coalesce(array_position({ENTRY_TYPES}::text[], upper(trim(entry_type))), 3)::smallint"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE manual_entries ALTER COLUMN entry_type TYPE varchar(50) "
+        f"USING ({ENTRY_TYPES})[entry_type]"
+    )
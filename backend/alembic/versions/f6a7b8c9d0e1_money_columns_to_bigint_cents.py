@@ -0,0 +1,48 @@
+"""money_columns_to_bigint_cents
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-01-14
+
+Store money amounts as BIGINT cents instead of NUMERIC.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (Tabelle, Spalte, ursprünglicher NUMERIC-Typ)
+COLUMNS = [
+    ('invoices', 'total_amount', 'numeric(12, 2)'),
+    ('line_items', 'amount', 'numeric(12, 2)'),
+    ('manual_entries', 'amount', 'numeric(12, 2)'),
+    ('tenants', 'monthly_prepayment', 'numeric(10, 2)'),
+    ('settlement_results', 'total_costs', 'numeric(12, 2)'),
+    ('settlement_results', 'total_prepayments', 'numeric(12, 2)'),
+    ('settlement_results', 'balance', 'numeric(12, 2)'),
+    ('settlement_cost_breakdowns', 'total_property_cost', 'numeric(12, 2)'),
+    ('settlement_cost_breakdowns', 'allocated_amount', 'numeric(12, 2)'),
+]
+
+
+def upgrade() -> None:
+    for table, column, _ in COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE bigint "
+            f"USING round({column} * 100)::bigint"
+        )
+
+
+def downgrade() -> None:
+    for table, column, numeric_type in COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {numeric_type} "
+            f"USING {column} / 100.0"
+        )
@@ -0,0 +1,35 @@
+"""allocation_percentage_display_column
+
+Revision ID: f8a9b0c1d2e3
+Revises: e7f8a9b0c1d2
+Create Date: 2026-01-31
+
+unit_allocations.percentage_display als stored generated column, wie die
+Anzeige-Spalten aus d4e5f6a7b8c9. allocation_percentage ist NUMERIC(5, 4),
+x 100 hat also genau 2 Nachkommastellen (round() aendert den Wert nicht,
+setzt nur die Skala fuer die Textdarstellung, z.B. "50.00%").
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8a9b0c1d2e3'
+down_revision: Union[str, None] = 'e7f8a9b0c1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # to_char() ist nicht IMMUTABLE und in generated columns nicht erlaubt
+    op.add_column('unit_allocations', sa.Column(
+        'percentage_display',
+        sa.Text(),
+        sa.Computed("round(allocation_percentage * 100, 2)::text || '%'", persisted=True),
+    ))
+
+
+def downgrade() -> None:
+    op.drop_column('unit_allocations', 'percentage_display')
@@ -1,5 +1,7 @@
+import asyncio
 from typing import List
 from uuid import UUID
+import hashlib
 import uuid as uuid_module
 import os
 from datetime import datetime
@@ -14,8 +16,9 @@ from app.config import settings
 from app.models.document import Document
 from app.models.settlement import Settlement
 from app.models.enums import DocumentStatus
-from app.schemas.document import DocumentResponse, DocumentUploadResponse, OCRResultResponse, DocumentUpdate
+from app.schemas.document import DocumentResponse, DocumentDetailResponse, DocumentUploadResponse, OCRResultResponse, DocumentUpdate
 from app.ocr.processor import OCRProcessor
+from app.services.ocr_service import apply_cached_ocr_result
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -28,61 +31,114 @@ def get_upload_path(settlement_id: UUID, filename: str) -> str:
     return os.path.join(directory, filename)
 
 
-def process_document_ocr(document_id: UUID):
-    """Background Task fuer OCR-Verarbeitung"""
+def _store_ocr_result(document_obj: Document, result) -> None:
+    """OCR-Ergebnis und extrahierte Daten am Dokument speichern"""
+    document_obj.ocr_raw_text = result.raw_text
+    document_obj.ocr_corrected_text = result.corrected_text
+    document_obj.ocr_confidence = result.confidence
+    document_obj.ocr_engine = result.engine_used
+    document_obj.llm_extraction_used = result.llm_extraction_used
+    document_obj.llm_extraction_error = result.llm_extraction_error
+    document_obj.document_status = DocumentStatus.PROCESSED
+    document_obj.processed_at = datetime.utcnow()
+
+    # Extrahierte Daten speichern (von LLM oder Regex)
+    if result.extracted_data:
+        document_obj.extracted_vendor_name = result.extracted_data.vendor_name
+        document_obj.extracted_invoice_number = result.extracted_data.invoice_number
+        document_obj.extracted_invoice_date = result.extracted_data.invoice_date
+        document_obj.extracted_total_amount = result.extracted_data.total_amount
+        document_obj.extracted_cost_category = result.extracted_data.suggested_category
+
+    llm_info = " (mit LLM-Extraktion)" if result.llm_extraction_used else ""
+    if result.llm_extraction_error:
+        llm_info = f" (LLM-Fehler: {result.llm_extraction_error[:50]}...)"
+    logger.info(f"OCR erfolgreich: {document_obj.original_filename} "
+               f"(Konfidenz: {result.confidence}%, Engine: {result.engine_used}{llm_info})")
+
+
+def _load_documents(db: Session, document_ids: list[UUID]) -> list[Document]:
+    """Dokumente fuer die OCR-Verarbeitung laden (synchron, laeuft im Threadpool)"""
+    return db.query(Document).filter(Document.id.in_(document_ids)).all()
+
+
+def _commit_ocr_results(db: Session, documents: list[Document], results) -> None:
+    """OCR-Ergebnisse speichern und committen (synchron, laeuft im Threadpool)"""
+    for document_obj, result in zip(documents, results):
+        _store_ocr_result(document_obj, result)
+    db.commit()
+
+
+def _commit_ocr_failure(db: Session, documents: list[Document], error: Exception) -> None:
+    """Dokumente als fehlgeschlagen markieren und committen (synchron, laeuft im Threadpool)"""
+    for document_obj in documents:
+        document_obj.document_status = DocumentStatus.FAILED
+        document_obj.ocr_raw_text = f"Fehler: {str(error)}"
+    db.commit()
+
+
+async def process_document_ocr(document_id: UUID):
+    """
+    Background Task fuer OCR-Verarbeitung.
+
+    Nur das Warten auf den OCR-Thread-Pool und die LLM-Requests laeuft auf der
+    Event-Loop; Laden und Speichern (synchrone Session) laufen im Threadpool.
+    """
     # Neue DB-Session fuer Background Task
     db = SessionLocal()
     try:
-        document_obj = db.query(Document).filter(Document.id == document_id).first()
-        if not document_obj:
+        documents = await asyncio.to_thread(_load_documents, db, [document_id])
+        if not documents:
             logger.error(f"Dokument nicht gefunden: {document_id}")
             return
+        document_obj = documents[0]
 
         logger.info(f"Starte OCR-Verarbeitung fuer Dokument: {document_obj.original_filename}")
 
         try:
             # DB-Session fuer LLM-Extraktion uebergeben
             processor = OCRProcessor(db=db)
-            result = processor.process_file(document_obj.file_path)
-
-            document_obj.ocr_raw_text = result.raw_text
-            document_obj.ocr_corrected_text = result.corrected_text
-            document_obj.ocr_confidence = result.confidence
-            document_obj.ocr_engine = result.engine_used
-            document_obj.llm_extraction_used = result.llm_extraction_used
-            document_obj.llm_extraction_error = result.llm_extraction_error
-            document_obj.document_status = DocumentStatus.PROCESSED
-            document_obj.processed_at = datetime.utcnow()
-
-            # Extrahierte Daten speichern (von LLM oder Regex)
-            if result.extracted_data:
-                document_obj.extracted_vendor_name = result.extracted_data.vendor_name
-                document_obj.extracted_invoice_number = result.extracted_data.invoice_number
-                document_obj.extracted_invoice_date = result.extracted_data.invoice_date
-                document_obj.extracted_total_amount = result.extracted_data.total_amount
-                document_obj.extracted_cost_category = result.extracted_data.suggested_category
-
-            llm_info = " (mit LLM-Extraktion)" if result.llm_extraction_used else ""
-            if result.llm_extraction_error:
-                llm_info = f" (LLM-Fehler: {result.llm_extraction_error[:50]}...)"
-            logger.info(f"OCR erfolgreich: {document_obj.original_filename} "
-                       f"(Konfidenz: {result.confidence}%, Engine: {result.engine_used}{llm_info})")
-
+            result = await processor.process_file_async(document_obj.file_path)
         except Exception as e:
             logger.error(f"OCR-Fehler fuer {document_obj.original_filename}: {str(e)}")
-            document_obj.document_status = DocumentStatus.FAILED
-            document_obj.ocr_raw_text = f"Fehler: {str(e)}"
-
-        db.commit()
+            await asyncio.to_thread(_commit_ocr_failure, db, documents, e)
+        else:
+            await asyncio.to_thread(_commit_ocr_results, db, documents, [result])
 
     except Exception as e:
         logger.error(f"Fehler bei OCR-Verarbeitung: {str(e)}")
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
     finally:
-        db.close()
+        await asyncio.to_thread(db.close)
 
 
-@router.get("/{document_id}", response_model=DocumentResponse)
+async def process_documents_ocr(document_ids: list[UUID]):
+    """Background Task: mehrere Dokumente mit einem docTR-Modellaufruf verarbeiten"""
+    db = SessionLocal()
+    try:
+        documents = await asyncio.to_thread(_load_documents, db, document_ids)
+        if not documents:
+            return
+
+        logger.info(f"Starte Batch-OCR fuer {len(documents)} Dokumente")
+
+        try:
+            processor = OCRProcessor(db=db)
+            results = await processor.process_files_async([d.file_path for d in documents])
+        except Exception as e:
+            logger.error(f"Batch-OCR fehlgeschlagen: {str(e)}")
+            await asyncio.to_thread(_commit_ocr_failure, db, documents, e)
+        else:
+            await asyncio.to_thread(_commit_ocr_results, db, documents, results)
+
+    except Exception as e:
+        logger.error(f"Fehler bei Batch-OCR-Verarbeitung: {str(e)}")
+        await asyncio.to_thread(db.rollback)
+    finally:
+        await asyncio.to_thread(db.close)
+
+
+@router.get("/{document_id}", response_model=DocumentDetailResponse)
 def get_document(
     document_id: UUID,
     db: Session = Depends(get_db)
@@ -97,7 +153,7 @@ def get_document(
     return document_obj
 
 
-@router.patch("/{document_id}", response_model=DocumentResponse)
+@router.patch("/{document_id}", response_model=DocumentDetailResponse)
 def update_document(
     document_id: UUID,
     document_update: DocumentUpdate,
@@ -168,7 +224,7 @@ def delete_document(
     return None
 
 
-@router.post("/{document_id}/process", response_model=DocumentResponse)
+@router.post("/{document_id}/process", response_model=DocumentDetailResponse)
 async def process_document(
     document_id: UUID,
     background_tasks: BackgroundTasks,
@@ -282,16 +338,20 @@ async def re_extract_data(
 
     from app.ocr.llm_corrector import LLMExtractor
 
+    from app.ocr.category_classifier import classify
+
     extractor = LLMExtractor(llm_settings.api_key, llm_settings.model)
     result = await extractor.extract_data(document_obj.ocr_text)
 
     if result.success:
+        cost_category = classify(document_obj.ocr_text, result.vendor_name, db)
+
         # Aktualisiere gespeicherte Daten
         document_obj.extracted_vendor_name = result.vendor_name
         document_obj.extracted_invoice_number = result.invoice_number
         document_obj.extracted_invoice_date = result.invoice_date
         document_obj.extracted_total_amount = result.total_amount
-        document_obj.extracted_cost_category = result.cost_category
+        document_obj.extracted_cost_category = cost_category
         document_obj.llm_extraction_used = True
         document_obj.llm_extraction_error = None
 
@@ -303,7 +363,7 @@ async def re_extract_data(
             "invoice_number": result.invoice_number,
             "invoice_date": result.invoice_date.isoformat() if result.invoice_date else None,
             "total_amount": float(result.total_amount) if result.total_amount else None,
-            "suggested_category": result.cost_category.value if result.cost_category else None,
+            "suggested_category": cost_category.value,
         }
     else:
         # Speichere Fehler
@@ -346,6 +406,35 @@ def list_settlement_documents(
     return [doc for doc in settlement_obj.documents if doc.settlement_result_id is None]
 
 
+@router.post("/settlement/{settlement_id}/process", response_model=List[DocumentResponse])
+def process_settlement_documents(
+    settlement_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """OCR fuer alle wartenden Dokumente einer Abrechnung starten (ein Batch)"""
+    settlement_obj = db.query(Settlement).filter(Settlement.id == settlement_id).first()
+    if not settlement_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Abrechnung nicht gefunden"
+        )
+
+    documents = db.query(Document).filter(
+        Document.settlement_id == settlement_id,
+        Document.document_status == DocumentStatus.PENDING,
+    ).all()
+
+    for document_obj in documents:
+        document_obj.document_status = DocumentStatus.PROCESSING
+    db.commit()
+
+    if documents:
+        background_tasks.add_task(process_documents_ocr, [d.id for d in documents])
+
+    return documents
+
+
 @router.post("/settlement/{settlement_id}", response_model=DocumentUploadResponse, status_code=status.HTTP_201_CREATED)
 async def upload_document(
     settlement_id: UUID,
@@ -403,14 +492,22 @@ async def upload_document(
         file_path=file_path,
         file_size_bytes=file_size,
         mime_type=mime_types.get(file_ext, "application/octet-stream"),
+        content_sha256=hashlib.sha256(content).digest(),
         document_status=DocumentStatus.PENDING
     )
     db.add(document_obj)
+
+    # Gleiche Datei schon verarbeitet? Dann OCR + Extraktion übernehmen
+    reused = apply_cached_ocr_result(document_obj, db)
+
     db.commit()
     db.refresh(document_obj)
 
     return DocumentUploadResponse(
         id=document_obj.id,
         status=document_obj.document_status,
-        message="Dokument erfolgreich hochgeladen"
+        message=(
+            "Dokument erfolgreich hochgeladen (OCR-Ergebnis übernommen)"
+            if reused else "Dokument erfolgreich hochgeladen"
+        )
     )
@@ -4,7 +4,7 @@ import time
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import or_
 
 from app.db.session import get_db
@@ -113,7 +113,8 @@ def list_invoices(
     - unit_id: Filter nach Unit
     - include_settlement_wide: Bei unit_id=True, auch Settlement-weite Rechnungen einschließen
     """
-    query = db.query(Invoice)
+    # Positionen aller Rechnungen mit einem SELECT IN (statt Lazy-Load pro Rechnung)
+    query = db.query(Invoice).options(selectinload(Invoice.line_items))
     if settlement_id:
         query = query.filter(Invoice.settlement_id == settlement_id)
 
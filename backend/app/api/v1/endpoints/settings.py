@@ -10,12 +10,13 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.models.settings import Settings
+from app.services.settings_store import get_value, set_value
 from app.config import settings as app_settings
 from app.services.llm_service import (
     get_llm_settings,
     set_llm_api_key,
     set_llm_model,
+    set_llm_fast_model,
     set_llm_enabled,
     has_api_key,
     DEFAULT_LLM_MODEL,
@@ -24,6 +25,7 @@ from app.ocr.llm_corrector import RECOMMENDED_MODELS, test_openrouter_connection
 from app.services.signing_service import (
     get_signature_type,
     get_signature_setting,
+    load_signature_settings,
     set_signature_setting,
     validate_pkcs12,
     save_signature_image_from_base64,
@@ -56,6 +58,7 @@ class SettingsUpdate(BaseModel):
     # LLM-Einstellungen
     openrouter_api_key: Optional[str] = None
     openrouter_model: Optional[str] = None
+    openrouter_fast_model: Optional[str] = None  # "" = kein Routing
     llm_correction_enabled: Optional[bool] = None
 
 
@@ -76,6 +79,7 @@ class SettingsResponse(BaseModel):
     # LLM-Einstellungen (API-Key wird nie zurueckgegeben)
     openrouter_api_key_set: bool
     openrouter_model: str
+    openrouter_fast_model: Optional[str]
     llm_correction_enabled: bool
 
 
@@ -140,37 +144,31 @@ class TestConnectionResponse(BaseModel):
 
 def get_setting(db: Session, key: str) -> Optional[str]:
     """Hole einen Einstellungswert aus der DB"""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting:
-        return setting.value
+    value = get_value(db, key)
+    if value is not None:
+        return value
     return DEFAULT_SETTINGS.get(key)
 
 
 def set_setting(db: Session, key: str, value: str, description: str = None):
     """Setze einen Einstellungswert in der DB"""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting:
-        setting.value = value
-    else:
-        setting = Settings(key=key, value=value, description=description)
-        db.add(setting)
+    set_value(db, key, value, description)
     db.commit()
 
 
-def _is_signature_configured(db: Session, sig_type: str) -> bool:
+def _is_signature_configured(sig_settings: dict[str, str], sig_type: str) -> bool:
     """Pruefe ob die Signatur vollstaendig konfiguriert ist"""
     if sig_type == "NONE":
         return False
     if sig_type == "CERTIFICATE":
-        cert_path = get_signature_setting(db, SIGNATURE_CERT_PATH_KEY)
-        cert_pw = get_signature_setting(db, SIGNATURE_CERT_PASSWORD_KEY)
+        cert_path = sig_settings[SIGNATURE_CERT_PATH_KEY]
+        cert_pw = sig_settings[SIGNATURE_CERT_PASSWORD_KEY]
         return bool(cert_path and cert_pw and Path(cert_path).exists())
     if sig_type in ["PAD", "IMAGE"]:
-        img_path = get_signature_setting(db, SIGNATURE_IMAGE_PATH_KEY)
+        img_path = sig_settings[SIGNATURE_IMAGE_PATH_KEY]
         return bool(img_path and Path(img_path).exists())
     if sig_type == "TEXT":
-        text = get_signature_setting(db, SIGNATURE_TEXT_KEY)
-        return bool(text)
+        return bool(sig_settings[SIGNATURE_TEXT_KEY])
     return False
 
 
@@ -178,7 +176,8 @@ def _is_signature_configured(db: Session, sig_type: str) -> bool:
 def get_settings(db: Session = Depends(get_db)):
     """Alle Einstellungen abrufen"""
     llm_settings = get_llm_settings(db)
-    sig_type = get_signature_type(db)
+    sig_settings = load_signature_settings(db)
+    sig_type = get_signature_type(db, sig_settings)
 
     return SettingsResponse(
         company_name=get_setting(db, "company_name") or "",
@@ -190,12 +189,13 @@ def get_settings(db: Session = Depends(get_db)):
         signing_cert_path=app_settings.SIGNING_CERT_PATH if app_settings.signing_enabled else None,
         # Neue Signatur-Einstellungen
         signature_type=sig_type,
-        signature_configured=_is_signature_configured(db, sig_type),
-        signature_text=get_signature_setting(db, SIGNATURE_TEXT_KEY) or None,
-        signature_text_font=get_signature_setting(db, SIGNATURE_TEXT_FONT_KEY) or None,
+        signature_configured=_is_signature_configured(sig_settings, sig_type),
+        signature_text=sig_settings[SIGNATURE_TEXT_KEY] or None,
+        signature_text_font=sig_settings[SIGNATURE_TEXT_FONT_KEY] or None,
         # LLM-Einstellungen
         openrouter_api_key_set=has_api_key(db),
         openrouter_model=llm_settings.model,
+        openrouter_fast_model=llm_settings.fast_model,
         llm_correction_enabled=llm_settings.enabled,
     )
 
@@ -218,6 +218,8 @@ def update_settings(updates: SettingsUpdate, db: Session = Depends(get_db)):
         set_llm_api_key(db, updates.openrouter_api_key)
     if updates.openrouter_model is not None:
         set_llm_model(db, updates.openrouter_model)
+    if updates.openrouter_fast_model is not None:
+        set_llm_fast_model(db, updates.openrouter_fast_model)
     if updates.llm_correction_enabled is not None:
         set_llm_enabled(db, updates.llm_correction_enabled)
 
@@ -271,11 +273,12 @@ async def test_openrouter(
 @router.get("/signature", response_model=SignatureSettingsResponse)
 def get_signature_settings(db: Session = Depends(get_db)):
     """Aktuelle Signatur-Einstellungen abrufen"""
-    sig_type = get_signature_type(db)
-    cert_path = get_signature_setting(db, SIGNATURE_CERT_PATH_KEY)
-    img_path = get_signature_setting(db, SIGNATURE_IMAGE_PATH_KEY)
-    sig_text = get_signature_setting(db, SIGNATURE_TEXT_KEY)
-    sig_font = get_signature_setting(db, SIGNATURE_TEXT_FONT_KEY) or "HANDWRITING"
+    sig_settings = load_signature_settings(db)
+    sig_type = get_signature_type(db, sig_settings)
+    cert_path = sig_settings[SIGNATURE_CERT_PATH_KEY]
+    img_path = sig_settings[SIGNATURE_IMAGE_PATH_KEY]
+    sig_text = sig_settings[SIGNATURE_TEXT_KEY]
+    sig_font = sig_settings[SIGNATURE_TEXT_FONT_KEY] or "HANDWRITING"
 
     # Zertifikat-Dateiname extrahieren
     cert_filename = None
@@ -286,7 +289,7 @@ def get_signature_settings(db: Session = Depends(get_db)):
 
     return SignatureSettingsResponse(
         signature_type=sig_type,
-        configured=_is_signature_configured(db, sig_type),
+        configured=_is_signature_configured(sig_settings, sig_type),
         certificate_uploaded=bool(cert_path and Path(cert_path).exists()),
         certificate_filename=cert_filename,
         signature_image_uploaded=bool(img_path and Path(img_path).exists()),
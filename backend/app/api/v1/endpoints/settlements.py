@@ -1,13 +1,13 @@
+import asyncio
 from typing import List
 from uuid import UUID
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-import io
 
 from app.db.session import get_db
+from app.api.v1.http_cache import cached_json_response
 from app.models.settlement import Settlement
 from app.models.property import Property
 from app.models.enums import SettlementStatus
@@ -18,8 +18,10 @@ router = APIRouter()
 
 @router.get("", response_model=List[SettlementResponse])
 def list_settlements(
+    request: Request,
     property_id: UUID = None,
     status: SettlementStatus = None,
+    year: int = None,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
@@ -30,7 +32,10 @@ def list_settlements(
         query = query.filter(Settlement.property_id == property_id)
     if status:
         query = query.filter(Settlement.status == status)
-    return query.order_by(Settlement.period_start.desc()).offset(skip).limit(limit).all()
+    if year:
+        query = query.filter(Settlement.year == year)
+    settlements = query.order_by(Settlement.period_start.desc()).offset(skip).limit(limit).all()
+    return cached_json_response(request, List[SettlementResponse], settlements)
 
 
 @router.post("", response_model=SettlementResponse, status_code=status.HTTP_201_CREATED)
@@ -64,6 +69,7 @@ def create_settlement(
 @router.get("/{settlement_id}", response_model=SettlementResponse)
 def get_settlement(
     settlement_id: UUID,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Abrechnung abrufen"""
@@ -73,7 +79,12 @@ def get_settlement(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Abrechnung nicht gefunden"
         )
-    return settlement_obj
+    return cached_json_response(
+        request,
+        SettlementResponse,
+        settlement_obj,
+        finalized=settlement_obj.status == SettlementStatus.FINALIZED,
+    )
 
 
 @router.put("/{settlement_id}", response_model=SettlementResponse)
@@ -212,6 +223,7 @@ def copy_settlement(
     """Korrekturabrechnung erstellen (Kopie einer finalisierten Abrechnung)"""
     from app.models.invoice import Invoice
     from app.models.document import Document
+    from app.db.bulk import bulk_insert_invoices
 
     original = db.query(Settlement).filter(Settlement.id == settlement_id).first()
     if not original:
@@ -233,8 +245,8 @@ def copy_settlement(
 
     # Rechnungen kopieren (ohne document_id - Dokumente bleiben beim Original)
     invoices = db.query(Invoice).filter(Invoice.settlement_id == settlement_id).all()
-    for inv in invoices:
-        new_invoice = Invoice(
+    new_invoices = [
+        Invoice(
             settlement_id=new_settlement.id,
             document_id=None,  # Dokumente bleiben beim Original
             vendor_name=inv.vendor_name,
@@ -245,20 +257,23 @@ def copy_settlement(
             allocation_percentage=inv.allocation_percentage,
             notes=inv.notes
         )
-        db.add(new_invoice)
+        for inv in invoices
+    ]
+    # Mehrzeilige INSERTs statt einem INSERT pro Rechnung
+    bulk_insert_invoices(db, new_invoices)
 
     db.commit()
     db.refresh(new_settlement)
     return new_settlement
 
 
-@router.get("/{settlement_id}/export/pdf")
-def export_settlement_pdf(
-    settlement_id: UUID,
-    db: Session = Depends(get_db)
-):
-    """Abrechnung als PDF exportieren"""
-    from app.pdf.generator import PDFGenerator
+def _prepare_settlement_export(settlement_id: UUID, db: Session) -> str:
+    """
+    Abrechnung prüfen und neu berechnen (synchron, läuft im Threadpool).
+
+    Returns:
+        Dateiname des PDFs
+    """
     from app.models.invoice import Invoice
     from app.services.calculation_service import CalculationService
 
@@ -268,6 +283,7 @@ def export_settlement_pdf(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Abrechnung nicht gefunden"
         )
+    filename = f"Nebenkostenabrechnung_{settlement_obj.year}.pdf"
 
     # Prüfen ob Rechnungen vorhanden sind
     invoice_count = db.query(Invoice).filter(Invoice.settlement_id == settlement_id).count()
@@ -286,18 +302,24 @@ def export_settlement_pdf(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Berechnung fehlgeschlagen: {str(e)}"
         )
+    return filename
+
+
+@router.get("/{settlement_id}/export/pdf")
+async def export_settlement_pdf(
+    settlement_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """Abrechnung als PDF exportieren"""
+    from app.pdf.pool import pdf_file_response, render_settlement_pdf
+
+    # DB-Zugriffe und Berechnung nicht auf der Event-Loop ausführen
+    filename = await asyncio.to_thread(_prepare_settlement_export, settlement_id, db)
 
     try:
-        generator = PDFGenerator()
-        pdf_bytes = generator.generate_settlement_pdf(settlement_id, db)
-
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=Nebenkostenabrechnung_{settlement_obj.year}.pdf"
-            }
-        )
+        pdf_path = await render_settlement_pdf(settlement_id)
+
+        return pdf_file_response(pdf_path, filename)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
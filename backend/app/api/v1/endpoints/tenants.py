@@ -3,7 +3,7 @@ from uuid import UUID
 from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.db.session import get_db
 from app.models.tenant import Tenant, TenantAddress
@@ -22,7 +22,8 @@ def list_tenants(
     db: Session = Depends(get_db)
 ):
     """Liste aller Mieter (optional gefiltert)"""
-    query = db.query(Tenant)
+    # Adressen aller Mieter mit einem SELECT IN statt einer Abfrage pro Mieter
+    query = db.query(Tenant).options(selectinload(Tenant.addresses))
     if unit_id:
         query = query.filter(Tenant.unit_id == unit_id)
     if is_active is not None:
@@ -168,7 +168,7 @@ def bulk_upsert_unit_allocations(
             results.append(new_alloc)
 
     db.commit()
-    for r in results:
-        db.refresh(r)
+    # Ein SELECT statt refresh() pro Eintrag (lädt die abgelaufenen Objekte neu)
+    db.query(UnitAllocation).filter(UnitAllocation.unit_id == unit_id).all()
 
     return results
@@ -3,26 +3,31 @@ Unit Settlement (Einzelabrechnung) API Endpoints
 
 Endpoints für die Verwaltung von Einzelabrechnungen pro Wohneinheit/Mieter.
 """
+import asyncio
 from decimal import Decimal
 from typing import List
 from uuid import UUID
+import hashlib
 import os
 import uuid as uuid_module
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session, joinedload
-import io
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload, undefer
 
 from app.db.session import get_db
+from app.api.v1.http_cache import cached_json_response
 from app.models.settlement import Settlement
 from app.models.settlement_result import SettlementResult
 from app.models.document import Document
+from app.models.unit import Unit
+from app.models.tenant import Tenant
 from app.models.enums import SettlementStatus, DocumentStatus
 from app.schemas.settlement import (
     UnitSettlementResponse,
     UnitSettlementUpdate,
+    UnitSettlementListItem,
     UnitSettlementListResponse,
 )
 from app.schemas.document import DocumentResponse
@@ -33,15 +38,23 @@ router = APIRouter()
 
 def _get_unit_settlement_or_404(
     unit_settlement_id: UUID,
-    db: Session
+    db: Session,
+    with_details: bool = False,
 ) -> SettlementResult:
-    """Helper: Einzelabrechnung laden oder 404"""
-    result = db.query(SettlementResult).options(
+    """Helper: Einzelabrechnung laden oder 404 (with_details: inkl. calculation_details)"""
+    # many-to-one per JOIN, Collections per separatem SELECT IN (kein Kreuzprodukt)
+    options = [
+        joinedload(SettlementResult.settlement),
         joinedload(SettlementResult.unit),
         joinedload(SettlementResult.tenant),
-        joinedload(SettlementResult.cost_breakdowns),
-        joinedload(SettlementResult.documents),
-    ).filter(SettlementResult.id == unit_settlement_id).first()
+        selectinload(SettlementResult.documents),
+    ]
+    if with_details:
+        options.append(undefer(SettlementResult.calculation_details))
+
+    result = db.query(SettlementResult).options(*options).filter(
+        SettlementResult.id == unit_settlement_id
+    ).first()
 
     if not result:
         raise HTTPException(
@@ -58,6 +71,7 @@ def _get_unit_settlement_or_404(
 )
 def list_unit_settlements(
     settlement_id: UUID,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Liste aller Einzelabrechnungen einer Settlement"""
@@ -68,24 +82,70 @@ def list_unit_settlements(
             detail="Abrechnung nicht gefunden"
         )
 
-    results = db.query(SettlementResult).options(
-        joinedload(SettlementResult.unit),
-        joinedload(SettlementResult.tenant),
-        joinedload(SettlementResult.cost_breakdowns),
-        joinedload(SettlementResult.documents),
+    # Flaches SELECT: nur Skalare + Anzahl Dokumente, keine verschachtelten Collections
+    document_count = (
+        select(func.count(Document.id))
+        .where(Document.settlement_result_id == SettlementResult.id)
+        .correlate(SettlementResult)
+        .scalar_subquery()
+    )
+
+    rows = db.query(
+        SettlementResult.id,
+        SettlementResult.settlement_id,
+        SettlementResult.unit_id,
+        SettlementResult.tenant_id,
+        SettlementResult.total_costs,
+        SettlementResult.total_prepayments,
+        SettlementResult.balance,
+        SettlementResult.occupancy_days,
+        SettlementResult.created_at,
+        Unit.designation,
+        Tenant.full_name,
+        Tenant.last_name,
+        document_count.label("document_count"),
+    ).join(
+        Unit, SettlementResult.unit_id == Unit.id
+    ).join(
+        Tenant, SettlementResult.tenant_id == Tenant.id
     ).filter(
         SettlementResult.settlement_id == settlement_id
     ).order_by(SettlementResult.created_at).all()
 
+    items = [
+        UnitSettlementListItem(
+            id=row.id,
+            settlement_id=row.settlement_id,
+            unit_id=row.unit_id,
+            tenant_id=row.tenant_id,
+            total_costs=row.total_costs,
+            total_prepayments=row.total_prepayments,
+            balance=row.balance,
+            occupancy_days=row.occupancy_days,
+            unit_designation=row.designation,
+            tenant_name=row.full_name,
+            tenant_last_name=row.last_name,
+            document_count=row.document_count,
+            created_at=row.created_at,
+        )
+        for row in rows
+    ]
+
     # Summen berechnen
-    total_costs = sum(r.total_costs for r in results) if results else Decimal("0.00")
-    total_balance = sum(r.balance for r in results) if results else Decimal("0.00")
+    total_costs = sum(i.total_costs for i in items) if items else Decimal("0.00")
+    total_balance = sum(i.balance for i in items) if items else Decimal("0.00")
 
-    return UnitSettlementListResponse(
-        unit_settlements=results,
+    response = UnitSettlementListResponse(
+        unit_settlements=items,
         total_costs=total_costs,
         total_balance=total_balance
     )
+    return cached_json_response(
+        request,
+        UnitSettlementListResponse,
+        response,
+        finalized=settlement.status == SettlementStatus.FINALIZED,
+    )
 
 
 @router.get(
@@ -95,10 +155,17 @@ def list_unit_settlements(
 )
 def get_unit_settlement(
     unit_settlement_id: UUID,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Einzelabrechnung abrufen"""
-    return _get_unit_settlement_or_404(unit_settlement_id, db)
+    result = _get_unit_settlement_or_404(unit_settlement_id, db, with_details=True)
+    return cached_json_response(
+        request,
+        UnitSettlementResponse,
+        result,
+        finalized=result.settlement.status == SettlementStatus.FINALIZED,
+    )
 
 
 @router.patch(
@@ -112,7 +179,7 @@ def update_unit_settlement(
     db: Session = Depends(get_db)
 ):
     """Einzelabrechnung aktualisieren (nur Notes)"""
-    result = _get_unit_settlement_or_404(unit_settlement_id, db)
+    result = _get_unit_settlement_or_404(unit_settlement_id, db, with_details=True)
 
     # Prüfen ob Settlement finalisiert
     settlement = db.query(Settlement).filter(Settlement.id == result.settlement_id).first()
@@ -201,10 +268,15 @@ async def upload_unit_settlement_document(
         file_path=file_path,
         file_size_bytes=len(content),
         mime_type=file.content_type or "application/octet-stream",
+        content_sha256=hashlib.sha256(content).digest(),
         document_status=DocumentStatus.PENDING,
         include_in_export=True,  # Unit-Dokumente standardmäßig exportieren
     )
     db.add(document)
+
+    from app.services.ocr_service import apply_cached_ocr_result
+    apply_cached_ocr_result(document, db)
+
     db.commit()
     db.refresh(document)
 
@@ -216,17 +288,13 @@ async def upload_unit_settlement_document(
     }
 
 
-@router.get(
-    "/unit-settlements/{unit_settlement_id}/export/pdf",
-    tags=["Unit Settlements"]
-)
-def export_unit_settlement_pdf(
-    unit_settlement_id: UUID,
-    db: Session = Depends(get_db)
-):
-    """PDF für eine einzelne Wohneinheit exportieren"""
-    from app.pdf.generator import PDFGenerator
+def _prepare_unit_settlement_export(unit_settlement_id: UUID, db: Session) -> str:
+    """
+    Einzelabrechnung prüfen und Dateinamen bilden (synchron, läuft im Threadpool).
 
+    Returns:
+        Dateiname des PDFs
+    """
     result = _get_unit_settlement_or_404(unit_settlement_id, db)
 
     # Settlement laden für Metadaten
@@ -237,21 +305,31 @@ def export_unit_settlement_pdf(
             detail="Abrechnung nicht gefunden"
         )
 
+    # Dateiname mit Unit-Bezeichnung
+    unit_designation = result.unit.designation.replace(" ", "_").replace("/", "-")
+    tenant_name = f"{result.tenant.last_name}".replace(" ", "_")
+    return f"Nebenkostenabrechnung_{settlement.year}_{unit_designation}_{tenant_name}.pdf"
+
+
+@router.get(
+    "/unit-settlements/{unit_settlement_id}/export/pdf",
+    tags=["Unit Settlements"]
+)
+async def export_unit_settlement_pdf(
+    unit_settlement_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """PDF für eine einzelne Wohneinheit exportieren"""
+    from app.pdf.pool import pdf_file_response, render_unit_settlement_pdf
+
+    # DB-Zugriffe nicht auf der Event-Loop ausführen
+    filename = await asyncio.to_thread(
+        _prepare_unit_settlement_export, unit_settlement_id, db
+    )
+
     try:
-        generator = PDFGenerator()
-        pdf_bytes = generator.generate_unit_settlement_pdf(unit_settlement_id, db)
-
-        # Dateiname mit Unit-Bezeichnung
-        unit_designation = result.unit.designation.replace(" ", "_").replace("/", "-")
-        tenant_name = f"{result.tenant.last_name}".replace(" ", "_")
-
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=Nebenkostenabrechnung_{settlement.year}_{unit_designation}_{tenant_name}.pdf"
-            }
-        )
+        pdf_path = await render_unit_settlement_pdf(unit_settlement_id)
+        return pdf_file_response(pdf_path, filename)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
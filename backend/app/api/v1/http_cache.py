@@ -0,0 +1,59 @@
+"""
+HTTP-Caching (ETag / Cache-Control) für lesende Endpunkte
+
+Der ETag wird aus dem serialisierten Response-Body berechnet. Stimmt er mit
+If-None-Match überein, wird 304 ohne Body zurückgegeben.
+"""
+import hashlib
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+# Finalisierte Abrechnungen ändern sich praktisch nicht mehr
+CACHE_CONTROL_FINALIZED = "private, max-age=300"
+# Entwürfe: Browser darf cachen, muss aber immer per ETag revalidieren
+CACHE_CONTROL_DEFAULT = "private, no-cache"
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_json_response(
+    request: Request,
+    response_type: Any,
+    data: Any,
+    finalized: bool = False,
+) -> Response:
+    """
+    Serialisiere data als response_type und setze ETag + Cache-Control.
+
+    Args:
+        request: Eingehender Request (für If-None-Match)
+        response_type: Pydantic-Schema (oder List[...]) des Endpunkts
+        data: ORM-Objekt(e) oder Schema-Instanz(en)
+        finalized: True für finalisierte Abrechnungen (längeres max-age)
+    """
+    adapter = _adapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL_FINALIZED if finalized else CACHE_CONTROL_DEFAULT,
+    }
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -17,8 +17,21 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: List[str] = ["pdf", "png", "jpg", "jpeg"]
 
+    # PDF-Generierung (Anzahl Worker-Prozesse, None = CPU-Kerne)
+    PDF_POOL_WORKERS: Optional[int] = None
+
     # OCR
     TESSERACT_CMD: str = "/usr/bin/tesseract"
+    # PDF-Rasterung fuer Tesseract (300 fuer schwer lesbare Scans)
+    TESSERACT_PDF_DPI: int = 200
+    # docTR mit torch.compile + CUDA-Graphen (nur mit GPU; erster Aufruf kompiliert)
+    OCR_TORCH_COMPILE: bool = False
+    # docTR ohne GPU: Recognition-Decoder dynamisch nach INT8 quantisieren
+    OCR_CPU_INT8: bool = False
+    # docTR-Modell beim App-Start laden (statt beim ersten Upload)
+    OCR_PRELOAD: bool = True
+    # Gleichzeitige OCR-Background-Tasks (eigener Thread-Pool)
+    OCR_WORKERS: int = 2
 
     # PDF Signing (Legacy - wird durch Settings ersetzt)
     SIGNING_CERT_PATH: Optional[str] = None
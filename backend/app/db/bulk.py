@@ -0,0 +1,182 @@
+"""
+Bulk-Inserts (PostgreSQL COPY / execute_values)
+
+Für Tabellen, die in Schüben geschrieben werden (Abrechnungsergebnisse,
+kopierte Rechnungen), umgehen diese Helfer den Unit-of-Work von SQLAlchemy
+und das zeilenweise INSERT. Gelesen wird weiterhin über das ORM.
+"""
+import io
+import struct
+import uuid
+from typing import Callable, Iterable, Sequence
+
+import orjson
+from psycopg2.extras import execute_values
+from sqlalchemy.orm import Session
+
+from app.db.ids import uuid7_batch
+from app.db.types import to_cents
+from app.models.enums import COST_CATEGORY_CODES
+from app.models.invoice import Invoice
+from app.models.settlement_result import SettlementResult
+
+# Zeilen pro Statement bei execute_values
+INSERT_PAGE_SIZE = 1000
+# Zeilen pro Aufruf (begrenzt den Speicher für die Parameterliste)
+INSERT_CHUNK_SIZE = 10_000
+
+
+def _assign_ids(objects: Sequence) -> None:
+    """Fehlende Primärschlüssel clientseitig als UUIDv7 (ein Batch) vergeben"""
+    missing = [obj for obj in objects if obj.id is None]
+    for obj, new_id in zip(missing, uuid7_batch(len(missing))):
+        obj.id = new_id
+
+
+# PostgreSQL Binary-COPY: Signatur + Flags + Header-Erweiterung, Trailer = -1
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_TRAILER = struct.pack("!h", -1)
+_NULL = struct.pack("!i", -1)
+_FIELD_COUNT = struct.Struct("!h")
+_LENGTH = struct.Struct("!i")
+_INT4 = struct.Struct("!ii")
+_INT8 = struct.Struct("!iq")
+_UUID_LENGTH = _LENGTH.pack(16)
+_JSONB_VERSION = b"\x01"
+
+
+def _uuid(value: uuid.UUID) -> bytes:
+    return _UUID_LENGTH + value.bytes
+
+
+def _int4(value: int) -> bytes:
+    return _INT4.pack(4, value)
+
+
+def _int8(value: int) -> bytes:
+    return _INT8.pack(8, value)
+
+
+def _text(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return _LENGTH.pack(len(data)) + data
+
+
+def _jsonb(value) -> bytes:
+    data = _JSONB_VERSION + orjson.dumps(value)
+    return _LENGTH.pack(len(data)) + data
+
+
+def _copy_binary(
+    db: Session,
+    table: str,
+    columns: Sequence[str],
+    encoders: Sequence[Callable],
+    rows: Iterable[tuple],
+) -> None:
+    """
+    Schreibe rows per COPY ... FROM STDIN (FORMAT binary).
+
+    Jeder Wert wird direkt im Wire-Format kodiert (kein Text-Parsing im
+    Server). encoders[i] kodiert Spalte i; None wird zu NULL.
+    """
+    field_count = _FIELD_COUNT.pack(len(columns))
+    parts = [_COPY_HEADER]
+    for row in rows:
+        parts.append(field_count)
+        for encode, value in zip(encoders, row):
+            parts.append(_NULL if value is None else encode(value))
+    if len(parts) == 1:
+        return
+    parts.append(_COPY_TRAILER)
+
+    # Roh-Verbindung der Session -> gleiche Transaktion wie die übrigen ORM-Statements
+    dbapi_connection = db.connection().connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)",
+            io.BytesIO(b"".join(parts)),
+        )
+
+
+def bulk_insert_results(db: Session, results: Sequence[SettlementResult]) -> None:
+    """
+    Schreibe SettlementResults per Binary-COPY.
+
+    IDs werden clientseitig vergeben (falls noch nicht gesetzt), damit
+    Dokumente nach der Neuberechnung direkt verknüpft werden können.
+    """
+    _assign_ids(results)
+
+    _copy_binary(
+        db,
+        SettlementResult.__tablename__,
+        (
+            "id", "settlement_id", "unit_id", "tenant_id", "total_costs",
+            "total_prepayments", "balance", "occupancy_days", "calculation_details",
+            "notes",
+        ),
+        (_uuid, _uuid, _uuid, _uuid, _int8, _int8, _int8, _int4, _jsonb, _text),
+        (
+            (
+                r.id,
+                r.settlement_id,
+                r.unit_id,
+                r.tenant_id,
+                to_cents(r.total_costs),
+                to_cents(r.total_prepayments),
+                to_cents(r.balance),
+                r.occupancy_days,
+                r.calculation_details,
+                r.notes,
+            )
+            for r in results
+        ),
+    )
+
+
+def _insert_rows(db: Session, table: str, columns: Sequence[str], rows: list[tuple]) -> None:
+    """Mehrzeilige INSERTs per execute_values in der Transaktion der Session"""
+    if not rows:
+        return
+
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+    dbapi_connection = db.connection().connection
+    with dbapi_connection.cursor() as cursor:
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            execute_values(
+                cursor, sql, rows[start:start + INSERT_CHUNK_SIZE], page_size=INSERT_PAGE_SIZE
+            )
+
+
+def bulk_insert_invoices(db: Session, invoices: Sequence[Invoice]) -> None:
+    """Schreibe Rechnungen (ohne Positionen) per execute_values"""
+    _assign_ids(invoices)
+
+    _insert_rows(
+        db,
+        Invoice.__tablename__,
+        (
+            "id", "settlement_id", "document_id", "unit_id", "vendor_name",
+            "invoice_number", "invoice_date", "due_date", "total_amount",
+            "cost_category", "allocation_percentage", "notes", "is_verified",
+        ),
+        [
+            (
+                str(i.id),
+                str(i.settlement_id),
+                str(i.document_id) if i.document_id else None,
+                str(i.unit_id) if i.unit_id else None,
+                i.vendor_name,
+                i.invoice_number,
+                i.invoice_date,
+                i.due_date,
+                to_cents(i.total_amount),
+                COST_CATEGORY_CODES[i.cost_category],
+                i.allocation_percentage,
+                i.notes,
+                bool(i.is_verified),
+            )
+            for i in invoices
+        ],
+    )
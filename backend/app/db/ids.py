@@ -0,0 +1,45 @@
+"""
+UUIDv7-Primärschlüssel (zeitlich sortiert, RFC 9562)
+
+Zeitlich aufsteigende Schlüssel halten den B-Tree des Primärschlüssels
+append-only (keine Page-Splits wie bei zufälligen uuid4).
+"""
+import secrets
+import time
+import uuid
+
+_VERSION_7 = 0x7 << 76
+_VARIANT_RFC4122 = 0x2 << 62
+# 12 Bit rand_a + 62 Bit rand_b
+_RAND_A_MASK = (1 << 12) - 1
+_RAND_B_MASK = (1 << 62) - 1
+
+
+def _build(timestamp_ms: int, random_bits: int) -> uuid.UUID:
+    rand_a = (random_bits >> 62) & _RAND_A_MASK
+    rand_b = random_bits & _RAND_B_MASK
+    value = (
+        (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+        | _VERSION_7
+        | rand_a << 64
+        | _VARIANT_RFC4122
+        | rand_b
+    )
+    return uuid.UUID(int=value)
+
+
+def uuid7() -> uuid.UUID:
+    """Einzelne UUIDv7 (Spalten-Default)"""
+    return _build(time.time_ns() // 1_000_000, int.from_bytes(secrets.token_bytes(10)))
+
+
+def uuid7_batch(n: int) -> list[uuid.UUID]:
+    """n UUIDv7 mit einem Zeitstempel und einem einzigen Zufallsblock"""
+    if n <= 0:
+        return []
+    timestamp_ms = time.time_ns() // 1_000_000
+    blob = secrets.token_bytes(10 * n)
+    return [
+        _build(timestamp_ms, int.from_bytes(blob[i:i + 10]))
+        for i in range(0, 10 * n, 10)
+    ]
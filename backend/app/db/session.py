@@ -1,9 +1,21 @@
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+
+
+def _json_serializer(value) -> str:
+    """JSON/JSONB-Spalten mit orjson kodieren (C statt stdlib json)"""
+    return orjson.dumps(value).decode()
+
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
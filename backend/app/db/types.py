@@ -0,0 +1,71 @@
+"""
+Eigene SQLAlchemy-Spaltentypen
+"""
+import enum
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Type
+
+from sqlalchemy import BigInteger, SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+from app.models.enums import ENUM_CODES
+
+
+class SmallIntEnum(TypeDecorator):
+    """
+    Enum als SMALLINT-Code (2 Byte statt PG-Enum).
+
+    Die Codes stehen in app.models.enums (*_CODES); im Python-Code und in der
+    API bleibt es das normale Enum.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_cls: Type[enum.Enum]):
+        super().__init__()
+        self.enum_cls = enum_cls
+        self._to_code = ENUM_CODES[enum_cls]
+        self._from_code = {code: member for member, code in self._to_code.items()}
+
+    def process_bind_param(self, value, dialect) -> Optional[int]:
+        if value is None:
+            return None
+        # str-Enums hashen wie ihr Wert: Member und Rohstring treffen denselben Eintrag,
+        # der Enum-Konstruktor läuft nur noch für ungültige Werte (-> ValueError)
+        code = self._to_code.get(value)
+        if code is None:
+            code = self._to_code[self.enum_cls(value)]
+        return code
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._from_code[value]
+
+
+def to_cents(value) -> int:
+    """Eurobetrag (Decimal/str/int) -> ganze Cent, kaufmännisch gerundet"""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int((value * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+class MoneyCents(TypeDecorator):
+    """
+    Geldbetrag als BIGINT in Cent.
+
+    Nach außen (Berechnung, Schemas, PDF) bleibt es ein Decimal in Euro
+    mit zwei Nachkommastellen.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return to_cents(value)
+
+    def process_result_value(self, value, dialect) -> Optional[Decimal]:
+        if value is None:
+            return None
+        return Decimal(value).scaleb(-2)
@@ -1,13 +1,45 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.api.v1.router import api_router
+from app.ocr.llm_corrector import close_client as close_llm_client
+from app.ocr.processor import preload_ocr
+from app.pdf.pool import warm_pdf_pool, shutdown_pdf_pool
+from app.services.settings_store import start_settings_listener, stop_settings_listener
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pillow-SIMD (Docker-Build-Arg PILLOW_SIMD) meldet sich mit ".postN"-Version
+    import PIL
+    logger.info(f"Pillow {PIL.__version__}")
+    # PDF-Worker vorab starten und initialisieren, damit der erste Export nicht die
+    # Startkosten trägt (vor Listener und OCR-Modell, siehe start_pdf_pool)
+    await warm_pdf_pool()
+    # Einstellungen prozesslokal cachen, Invalidierung per LISTEN/NOTIFY
+    start_settings_listener()
+    # docTR-Modell laden, bevor der erste Upload kommt (blockiert nicht die Event-Loop)
+    if settings.OCR_PRELOAD:
+        await asyncio.to_thread(preload_ocr)
+    yield
+    stop_settings_listener()
+    shutdown_pdf_pool()
+    # Keep-Alive-Verbindungen zu OpenRouter schliessen
+    await close_llm_client()
+
 
 app = FastAPI(
     title="Nebenkostenabrechnung API",
     description="API für die Verwaltung von Nebenkostenabrechnungen",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS Middleware
@@ -1,29 +1,31 @@
-from app.models.enums import CostCategory, AllocationMethod, DocumentStatus, SettlementStatus
+from app.models.enums import CostCategory, AllocationMethod, DocumentStatus, SettlementStatus, EntryType
 from app.models.property import Property
 from app.models.unit import Unit
 from app.models.tenant import Tenant, TenantAddress
 from app.models.settlement import Settlement
 from app.models.document import Document
+from app.models.document_ocr import DocumentOcr
 from app.models.invoice import Invoice, LineItem
 from app.models.unit_allocation import UnitAllocation
 from app.models.manual_entry import ManualEntry
-from app.models.settlement_result import SettlementResult, SettlementCostBreakdown
+from app.models.settlement_result import SettlementResult
 
 __all__ = [
     "CostCategory",
     "AllocationMethod",
     "DocumentStatus",
     "SettlementStatus",
+    "EntryType",
     "Property",
     "Unit",
     "Tenant",
     "TenantAddress",
     "Settlement",
     "Document",
+    "DocumentOcr",
     "Invoice",
     "LineItem",
     "UnitAllocation",
     "ManualEntry",
     "SettlementResult",
-    "SettlementCostBreakdown",
 ]
@@ -3,12 +3,16 @@ from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import String, Text, BigInteger, Boolean, DateTime, Date, Numeric, ForeignKey, Enum, func
+from sqlalchemy import String, BigInteger, LargeBinary, Boolean, DateTime, Date, Numeric, ForeignKey, Computed, Index, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import SmallIntEnum
+from app.db.ids import uuid7
 from app.models.enums import DocumentStatus, CostCategory
+from app.models.document_ocr import DocumentOcr
 
 if TYPE_CHECKING:
     from app.models.settlement import Settlement
@@ -19,9 +23,16 @@ if TYPE_CHECKING:
 class Document(Base):
     """Hochgeladenes Dokument / Beleg"""
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_settlement_status", "settlement_id", "document_status"),
+        Index("ix_documents_settlement_result_id", "settlement_result_id"),
+        Index("ix_documents_sha256", "content_sha256"),
+        # Append-only in Einfügereihenfolge -> BRIN für Zeitbereiche/Aufräumen alter Jahre
+        Index("ix_documents_upload_date_brin", "upload_date", postgresql_using="brin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     settlement_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("settlements.id", ondelete="CASCADE"), nullable=False
@@ -36,17 +47,18 @@ class Document(Base):
     stored_filename: Mapped[str] = mapped_column(String(255), nullable=False)
     file_path: Mapped[str] = mapped_column(String(500), nullable=False)
     file_size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    file_size_mb: Mapped[float] = mapped_column(
+        Numeric(12, 2, asdecimal=False),
+        Computed("round(file_size_bytes / 1048576.0, 2)", persisted=True),
+    )
     mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    # SHA-256 des Dateiinhalts: gleiche Datei erneut hochgeladen -> OCR-Ergebnis übernehmen
+    content_sha256: Mapped[Optional[bytes]] = mapped_column(LargeBinary(32), nullable=True)
 
     document_status: Mapped[DocumentStatus] = mapped_column(
-        Enum(DocumentStatus), default=DocumentStatus.PENDING
+        SmallIntEnum(DocumentStatus), default=DocumentStatus.PENDING
     )
-    ocr_raw_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    ocr_corrected_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    ocr_confidence: Mapped[Optional[Decimal]] = mapped_column(Numeric(5, 2), nullable=True)
-    ocr_engine: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     llm_extraction_used: Mapped[bool] = mapped_column(Boolean, default=False)
-    llm_extraction_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     include_in_export: Mapped[bool] = mapped_column(Boolean, default=False)
 
     # Extrahierte Rechnungsdaten (von LLM oder Regex)
@@ -55,7 +67,7 @@ class Document(Base):
     extracted_invoice_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     extracted_total_amount: Mapped[Optional[Decimal]] = mapped_column(Numeric(12, 2), nullable=True)
     extracted_cost_category: Mapped[Optional[CostCategory]] = mapped_column(
-        Enum(CostCategory), nullable=True
+        SmallIntEnum(CostCategory), nullable=True
     )
 
     upload_date: Mapped[datetime] = mapped_column(
@@ -71,10 +83,21 @@ class Document(Base):
         "SettlementResult", back_populates="documents"
     )
     invoice: Mapped[Optional["Invoice"]] = relationship("Invoice", back_populates="document", uselist=False)
+    # OCR-Texte liegen in document_ocr und werden erst beim Zugriff geladen
+    ocr: Mapped[Optional["DocumentOcr"]] = relationship(
+        "DocumentOcr", back_populates="document", uselist=False, cascade="all, delete-orphan"
+    )
 
-    @property
-    def file_size_mb(self) -> float:
-        return round(self.file_size_bytes / (1024 * 1024), 2)
+    # Bisherige Attributnamen; Schreiben legt die OCR-Zeile bei Bedarf an
+    ocr_raw_text = association_proxy("ocr", "raw_text", creator=lambda v: DocumentOcr(raw_text=v))
+    ocr_corrected_text = association_proxy(
+        "ocr", "corrected_text", creator=lambda v: DocumentOcr(corrected_text=v)
+    )
+    ocr_confidence = association_proxy("ocr", "confidence", creator=lambda v: DocumentOcr(confidence=v))
+    ocr_engine = association_proxy("ocr", "engine", creator=lambda v: DocumentOcr(engine=v))
+    llm_extraction_error = association_proxy(
+        "ocr", "llm_extraction_error", creator=lambda v: DocumentOcr(llm_extraction_error=v)
+    )
 
     @property
     def ocr_text(self) -> Optional[str]:
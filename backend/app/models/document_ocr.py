@@ -0,0 +1,29 @@
+import uuid
+from decimal import Decimal
+from typing import Optional, TYPE_CHECKING
+
+from sqlalchemy import String, Text, Numeric, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.base import Base
+
+if TYPE_CHECKING:
+    from app.models.document import Document
+
+
+class DocumentOcr(Base):
+    """OCR-Ergebnis eines Dokuments (1:1, getrennt von der schlanken documents-Zeile)"""
+    __tablename__ = "document_ocr"
+
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True
+    )
+    raw_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    corrected_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    confidence: Mapped[Optional[Decimal]] = mapped_column(Numeric(5, 2), nullable=True)
+    engine: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    llm_extraction_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Relationships
+    document: Mapped["Document"] = relationship("Document", back_populates="ocr")
@@ -76,3 +76,69 @@ class SettlementStatus(str, enum.Enum):
     CALCULATED = "CALCULATED"  # Berechnung durchgeführt
     FINALIZED = "FINALIZED"  # Abgeschlossen
     EXPORTED = "EXPORTED"  # PDF exportiert
+
+
+class EntryType(str, enum.Enum):
+    """Art einer manuellen Buchung"""
+    CREDIT = "CREDIT"  # Gutschrift
+    DEBIT = "DEBIT"  # Belastung
+    ADJUSTMENT = "ADJUSTMENT"  # Korrektur
+
+
+# Persistente SMALLINT-Codes (Reihenfolge = Deklarationsreihenfolge, nie umnummerieren)
+COST_CATEGORY_CODES = {
+    CostCategory.GRUNDSTEUER: 1,
+    CostCategory.WASSERVERSORGUNG: 2,
+    CostCategory.ENTWAESSERUNG: 3,
+    CostCategory.HEIZUNG: 4,
+    CostCategory.WARMWASSER: 5,
+    CostCategory.VERBUNDENE_ANLAGEN: 6,
+    CostCategory.AUFZUG: 7,
+    CostCategory.STRASSENREINIGUNG: 8,
+    CostCategory.GEBAEUDEREINIGUNG: 9,
+    CostCategory.GARTENPFLEGE: 10,
+    CostCategory.BELEUCHTUNG: 11,
+    CostCategory.SCHORNSTEINREINIGUNG: 12,
+    CostCategory.VERSICHERUNG: 13,
+    CostCategory.HAUSWART: 14,
+    CostCategory.ANTENNE_KABEL: 15,
+    CostCategory.WAESCHEPFLEGE: 16,
+    CostCategory.SONSTIGE: 17,
+}
+
+ALLOCATION_METHOD_CODES = {
+    AllocationMethod.WOHNFLAECHE: 1,
+    AllocationMethod.PERSONENZAHL: 2,
+    AllocationMethod.EINHEIT: 3,
+    AllocationMethod.VERBRAUCH: 4,
+    AllocationMethod.MITEIGENTUMSANTEIL: 5,
+}
+
+DOCUMENT_STATUS_CODES = {
+    DocumentStatus.PENDING: 1,
+    DocumentStatus.PROCESSING: 2,
+    DocumentStatus.PROCESSED: 3,
+    DocumentStatus.FAILED: 4,
+    DocumentStatus.VERIFIED: 5,
+}
+
+SETTLEMENT_STATUS_CODES = {
+    SettlementStatus.DRAFT: 1,
+    SettlementStatus.CALCULATED: 2,
+    SettlementStatus.FINALIZED: 3,
+    SettlementStatus.EXPORTED: 4,
+}
+
+ENTRY_TYPE_CODES = {
+    EntryType.CREDIT: 1,
+    EntryType.DEBIT: 2,
+    EntryType.ADJUSTMENT: 3,
+}
+
+ENUM_CODES = {
+    CostCategory: COST_CATEGORY_CODES,
+    AllocationMethod: ALLOCATION_METHOD_CODES,
+    DocumentStatus: DOCUMENT_STATUS_CODES,
+    SettlementStatus: SETTLEMENT_STATUS_CODES,
+    EntryType: ENTRY_TYPE_CODES,
+}
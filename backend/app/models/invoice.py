@@ -3,11 +3,13 @@ from datetime import datetime, date
 from decimal import Decimal
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import String, Text, Boolean, Date, DateTime, Numeric, ForeignKey, Enum, func
+from sqlalchemy import String, Text, Boolean, Date, DateTime, Numeric, ForeignKey, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import SmallIntEnum, MoneyCents
+from app.db.ids import uuid7
 from app.models.enums import CostCategory
 
 if TYPE_CHECKING:
@@ -19,6 +21,19 @@ if TYPE_CHECKING:
 class Invoice(Base):
     """Rechnung"""
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Covering-Index für die Berechnung (Index-Only-Scan pro Abrechnung)
+        Index(
+            "ix_invoices_settlement_cat", "settlement_id", "cost_category",
+            postgresql_include=["total_amount", "allocation_percentage"],
+        ),
+        # Kategorie-Historie pro Lieferant (ocr/category_classifier.py)
+        Index(
+            "ix_invoices_vendor_verified", text("lower(vendor_name)"),
+            postgresql_include=["cost_category"],
+            postgresql_where=text("is_verified"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -38,9 +53,9 @@ class Invoice(Base):
     invoice_number: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     invoice_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     due_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
-    total_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    total_amount: Mapped[Decimal] = mapped_column(MoneyCents, nullable=False)
     cost_category: Mapped[CostCategory] = mapped_column(
-        Enum(CostCategory), nullable=False
+        SmallIntEnum(CostCategory), nullable=False
     )
     allocation_percentage: Mapped[Optional[Decimal]] = mapped_column(
         Numeric(5, 4), nullable=True
@@ -65,21 +80,24 @@ class Invoice(Base):
 class LineItem(Base):
     """Rechnungsposition"""
     __tablename__ = "line_items"
+    __table_args__ = (
+        Index("ix_line_items_invoice_id", "invoice_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     invoice_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("invoices.id", ondelete="CASCADE"), nullable=False
     )
 
     description: Mapped[str] = mapped_column(String(500), nullable=False)
-    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(MoneyCents, nullable=False)
     quantity: Mapped[Decimal] = mapped_column(Numeric(10, 4), default=1)
     unit_price: Mapped[Optional[Decimal]] = mapped_column(Numeric(12, 4), nullable=True)
     vat_rate: Mapped[Decimal] = mapped_column(Numeric(5, 2), default=19.00)
     cost_category: Mapped[Optional[CostCategory]] = mapped_column(
-        Enum(CostCategory), nullable=True
+        SmallIntEnum(CostCategory), nullable=True
     )
 
     created_at: Mapped[datetime] = mapped_column(
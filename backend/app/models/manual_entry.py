@@ -3,12 +3,13 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import String, Text, DateTime, Numeric, ForeignKey, Enum, func
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
-from app.models.enums import CostCategory
+from app.db.types import SmallIntEnum, MoneyCents
+from app.models.enums import CostCategory, EntryType
 
 if TYPE_CHECKING:
     from app.models.settlement import Settlement
@@ -18,6 +19,9 @@ if TYPE_CHECKING:
 class ManualEntry(Base):
     """Manuelle Buchung (Guthaben, Sonderausgaben etc.)"""
     __tablename__ = "manual_entries"
+    __table_args__ = (
+        Index("ix_manual_entries_settlement_unit", "settlement_id", "unit_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -29,11 +33,11 @@ class ManualEntry(Base):
         UUID(as_uuid=True), ForeignKey("units.id", ondelete="SET NULL"), nullable=True
     )  # NULL = gilt für alle Einheiten
 
-    entry_type: Mapped[str] = mapped_column(String(50), nullable=False)  # CREDIT, DEBIT, ADJUSTMENT
+    entry_type: Mapped[EntryType] = mapped_column(SmallIntEnum(EntryType), nullable=False)
     description: Mapped[str] = mapped_column(String(500), nullable=False)
-    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)  # Positiv = Gutschrift, Negativ = Belastung
+    amount: Mapped[Decimal] = mapped_column(MoneyCents, nullable=False)  # Positiv = Gutschrift, Negativ = Belastung
     cost_category: Mapped[Optional[CostCategory]] = mapped_column(
-        Enum(CostCategory), nullable=True
+        SmallIntEnum(CostCategory), nullable=True
     )
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, TYPE_CHECKING
 
-from sqlalchemy import String, Numeric, DateTime, func
+from sqlalchemy import String, Text, Numeric, DateTime, Computed, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,6 +26,11 @@ class Property(Base):
     house_number: Mapped[str] = mapped_column(String(20), nullable=False)
     postal_code: Mapped[str] = mapped_column(String(10), nullable=False)
     city: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Beim Schreiben berechnet (GENERATED ALWAYS AS ... STORED)
+    full_address: Mapped[str] = mapped_column(
+        Text,
+        Computed("street || ' ' || house_number || ', ' || postal_code || ' ' || city", persisted=True),
+    )
     total_area_sqm: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(
@@ -38,7 +43,3 @@ class Property(Base):
     # Relationships
     units: Mapped[List["Unit"]] = relationship("Unit", back_populates="property_ref", cascade="all, delete-orphan")
     settlements: Mapped[List["Settlement"]] = relationship("Settlement", back_populates="property_ref", cascade="all, delete-orphan")
-
-    @property
-    def full_address(self) -> str:
-        return f"{self.street} {self.house_number}, {self.postal_code} {self.city}"
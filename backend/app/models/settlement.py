@@ -2,11 +2,12 @@ import uuid
 from datetime import datetime, date
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import String, Text, Date, DateTime, ForeignKey, Enum, func
+from sqlalchemy import String, Text, Date, DateTime, SmallInteger, ForeignKey, Computed, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import SmallIntEnum
 from app.models.enums import SettlementStatus
 
 if TYPE_CHECKING:
@@ -20,6 +21,14 @@ if TYPE_CHECKING:
 class Settlement(Base):
     """Nebenkostenabrechnung"""
     __tablename__ = "settlements"
+    __table_args__ = (
+        # Abrechnungen entstehen zeitlich geordnet -> BRIN statt B-Tree
+        Index(
+            "ix_settlements_year_brin", "year",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 8},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -29,8 +38,25 @@ class Settlement(Base):
     )
     period_start: Mapped[date] = mapped_column(Date, nullable=False)
     period_end: Mapped[date] = mapped_column(Date, nullable=False)
+    year: Mapped[int] = mapped_column(
+        SmallInteger,
+        Computed("extract(year FROM period_start)::smallint", persisted=True),
+    )
+    # "TT.MM.JJJJ - TT.MM.JJJJ" (to_char ist nicht IMMUTABLE, daher über EXTRACT)
+    period_label: Mapped[str] = mapped_column(
+        Text,
+        Computed(
+            "lpad(extract(day FROM period_start)::int::text, 2, '0') || '.' "
+            "|| lpad(extract(month FROM period_start)::int::text, 2, '0') || '.' "
+            "|| extract(year FROM period_start)::int::text || ' - ' "
+            "|| lpad(extract(day FROM period_end)::int::text, 2, '0') || '.' "
+            "|| lpad(extract(month FROM period_end)::int::text, 2, '0') || '.' "
+            "|| extract(year FROM period_end)::int::text",
+            persisted=True,
+        ),
+    )
     status: Mapped[SettlementStatus] = mapped_column(
-        Enum(SettlementStatus), default=SettlementStatus.DRAFT
+        SmallIntEnum(SettlementStatus), default=SettlementStatus.DRAFT
     )
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
@@ -50,11 +76,3 @@ class Settlement(Base):
     invoices: Mapped[List["Invoice"]] = relationship("Invoice", back_populates="settlement", cascade="all, delete-orphan")
     manual_entries: Mapped[List["ManualEntry"]] = relationship("ManualEntry", back_populates="settlement", cascade="all, delete-orphan")
     results: Mapped[List["SettlementResult"]] = relationship("SettlementResult", back_populates="settlement", cascade="all, delete-orphan")
-
-    @property
-    def period_label(self) -> str:
-        return f"{self.period_start.strftime('%d.%m.%Y')} - {self.period_end.strftime('%d.%m.%Y')}"
-
-    @property
-    def year(self) -> int:
-        return self.period_start.year
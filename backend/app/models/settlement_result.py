@@ -1,13 +1,16 @@
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import Integer, DateTime, Numeric, ForeignKey, Enum, JSON, Text, UniqueConstraint, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Integer, DateTime, ForeignKey, Text, UniqueConstraint, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import MoneyCents
+from app.db.ids import uuid7
 from app.models.enums import CostCategory, AllocationMethod
 
 if TYPE_CHECKING:
@@ -17,15 +20,53 @@ if TYPE_CHECKING:
     from app.models.document import Document
 
 
+@dataclass(frozen=True, slots=True)
+class CostBreakdown:
+    """Kostenaufschlüsselung pro Kategorie (in calculation_details["breakdowns"])"""
+    cost_category: CostCategory
+    total_property_cost: Decimal
+    allocation_percentage: Decimal
+    allocated_amount: Decimal
+    allocation_method: AllocationMethod
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CostBreakdown":
+        return cls(
+            cost_category=CostCategory(data["cost_category"]),
+            total_property_cost=Decimal(data["total_property_cost"]),
+            allocation_percentage=Decimal(data["allocation_percentage"]),
+            allocated_amount=Decimal(data["allocated_amount"]),
+            allocation_method=AllocationMethod(data["allocation_method"]),
+        )
+
+    def to_dict(self) -> dict:
+        # Beträge als String, damit keine Float-Rundung entsteht
+        return {
+            "cost_category": self.cost_category.value,
+            "total_property_cost": str(self.total_property_cost),
+            "allocation_percentage": str(self.allocation_percentage),
+            "allocated_amount": str(self.allocated_amount),
+            "allocation_method": self.allocation_method.value,
+        }
+
+
 class SettlementResult(Base):
     """Abrechnungsergebnis pro Wohneinheit"""
     __tablename__ = "settlement_results"
     __table_args__ = (
         UniqueConstraint("settlement_id", "unit_id", "tenant_id", name="uq_settlement_unit_tenant"),
+        # Auswertungen pro Kategorie über mehrere Abrechnungen (@> auf breakdowns)
+        Index(
+            "ix_settlement_results_breakdowns",
+            text("(calculation_details -> 'breakdowns') jsonb_path_ops"),
+            postgresql_using="gin",
+        ),
+        # Append-only in Einfügereihenfolge -> BRIN für Zeitbereiche/Aufräumen alter Jahre
+        Index("ix_settlement_results_created_brin", "created_at", postgresql_using="brin"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     settlement_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("settlements.id", ondelete="CASCADE"), nullable=False
@@ -37,12 +78,14 @@ class SettlementResult(Base):
         UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False
     )
 
-    total_costs: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
-    total_prepayments: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
-    balance: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)  # Positiv = Nachzahlung, Negativ = Guthaben
+    total_costs: Mapped[Decimal] = mapped_column(MoneyCents, nullable=False)
+    total_prepayments: Mapped[Decimal] = mapped_column(MoneyCents, nullable=False)
+    balance: Mapped[Decimal] = mapped_column(MoneyCents, nullable=False)  # Positiv = Nachzahlung, Negativ = Guthaben
     occupancy_days: Mapped[int] = mapped_column(Integer, nullable=False)
 
-    calculation_details: Mapped[dict] = mapped_column(JSON, nullable=True)
+    # Berechnungsparameter + Kostenaufschlüsselung ("breakdowns")
+    # Nur für Einzelansicht/PDF benötigt -> erst beim Zugriff bzw. per undefer() laden
+    calculation_details: Mapped[dict] = mapped_column(JSONB, nullable=True, deferred=True)
 
     # Unit-spezifische Notizen
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -55,14 +98,16 @@ class SettlementResult(Base):
     settlement: Mapped["Settlement"] = relationship("Settlement", back_populates="results")
     unit: Mapped["Unit"] = relationship("Unit")
     tenant: Mapped["Tenant"] = relationship("Tenant")
-    cost_breakdowns: Mapped[List["SettlementCostBreakdown"]] = relationship(
-        "SettlementCostBreakdown", back_populates="settlement_result", cascade="all, delete-orphan"
-    )
     # Unit-spezifische Dokumente (ohne delete-orphan damit Dokumente bei Neuberechnung erhalten bleiben)
     documents: Mapped[List["Document"]] = relationship(
         "Document", back_populates="settlement_result"
     )
 
+    @property
+    def cost_breakdowns(self) -> List[CostBreakdown]:
+        details = self.calculation_details or {}
+        return [CostBreakdown.from_dict(b) for b in details.get("breakdowns", [])]
+
     @property
     def has_nachzahlung(self) -> bool:
         return self.balance > 0
@@ -70,31 +115,3 @@ class SettlementResult(Base):
     @property
     def has_guthaben(self) -> bool:
         return self.balance < 0
-
-
-class SettlementCostBreakdown(Base):
-    """Kostenaufschlüsselung pro Kategorie"""
-    __tablename__ = "settlement_cost_breakdowns"
-    __table_args__ = (
-        UniqueConstraint("settlement_result_id", "cost_category", name="uq_result_category"),
-    )
-
-    id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
-    )
-    settlement_result_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("settlement_results.id", ondelete="CASCADE"), nullable=False
-    )
-
-    cost_category: Mapped[CostCategory] = mapped_column(
-        Enum(CostCategory), nullable=False
-    )
-    total_property_cost: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
-    allocation_percentage: Mapped[Decimal] = mapped_column(Numeric(5, 4), nullable=False)
-    allocated_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
-    allocation_method: Mapped[AllocationMethod] = mapped_column(
-        Enum(AllocationMethod), nullable=False
-    )
-
-    # Relationships
-    settlement_result: Mapped["SettlementResult"] = relationship("SettlementResult", back_populates="cost_breakdowns")
@@ -3,11 +3,12 @@ from datetime import datetime, date
 from decimal import Decimal
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import String, Integer, Boolean, Date, DateTime, Numeric, ForeignKey, func
+from sqlalchemy import String, Text, Integer, Boolean, Date, DateTime, ForeignKey, Computed, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import MoneyCents
 
 if TYPE_CHECKING:
     from app.models.unit import Unit
@@ -16,6 +17,14 @@ if TYPE_CHECKING:
 class Tenant(Base):
     """Mieter"""
     __tablename__ = "tenants"
+    __table_args__ = (
+        Index("ix_tenants_unit_active", "unit_id", "is_active"),
+        # Aktueller Mieter einer Einheit (Unit.current_tenant)
+        Index(
+            "ix_tenants_unit_current", "unit_id",
+            postgresql_where=text("is_active AND move_out_date IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -26,6 +35,15 @@ class Tenant(Base):
     salutation: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # Herr/Frau
     first_name: Mapped[str] = mapped_column(String(100), nullable=False)
     last_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    full_name: Mapped[str] = mapped_column(
+        Text,
+        Computed(
+            "CASE WHEN coalesce(salutation, '') <> '' "
+            "THEN salutation || ' ' || first_name || ' ' || last_name "
+            "ELSE first_name || ' ' || last_name END",
+            persisted=True,
+        ),
+    )
     email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     phone: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
 
@@ -33,7 +51,7 @@ class Tenant(Base):
     move_out_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
 
     resident_count: Mapped[int] = mapped_column(Integer, default=1)
-    monthly_prepayment: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2), nullable=True)  # Vorauszahlung
+    monthly_prepayment: Mapped[Optional[Decimal]] = mapped_column(MoneyCents, nullable=True)  # Vorauszahlung
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
@@ -47,24 +65,21 @@ class Tenant(Base):
     # Relationships
     unit: Mapped["Unit"] = relationship("Unit", back_populates="tenants")
     addresses: Mapped[List["TenantAddress"]] = relationship("TenantAddress", back_populates="tenant", cascade="all, delete-orphan")
-
-    @property
-    def full_name(self) -> str:
-        if self.salutation:
-            return f"{self.salutation} {self.first_name} {self.last_name}"
-        return f"{self.first_name} {self.last_name}"
-
-    @property
-    def current_address(self) -> Optional["TenantAddress"]:
-        for addr in self.addresses:
-            if addr.is_current:
-                return addr
-        return None
+    # Nur die aktuelle Adresse (Index-Lookup statt Scan über alle Adressen)
+    current_address: Mapped[Optional["TenantAddress"]] = relationship(
+        "TenantAddress",
+        primaryjoin="and_(Tenant.id == TenantAddress.tenant_id, TenantAddress.is_current.is_(True))",
+        viewonly=True,
+        uselist=False,
+    )
 
 
 class TenantAddress(Base):
     """Adresse des Mieters (für ausgezogene Mieter)"""
     __tablename__ = "tenant_addresses"
+    __table_args__ = (
+        Index("ix_tenant_addresses_current", "tenant_id", postgresql_where=text("is_current")),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -76,6 +91,14 @@ class TenantAddress(Base):
     house_number: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     postal_code: Mapped[str] = mapped_column(String(10), nullable=False)
     city: Mapped[str] = mapped_column(String(100), nullable=False)
+    full_address: Mapped[str] = mapped_column(
+        Text,
+        Computed(
+            "street || CASE WHEN coalesce(house_number, '') <> '' THEN ' ' || house_number ELSE '' END "
+            "|| ', ' || postal_code || ' ' || city",
+            persisted=True,
+        ),
+    )
     country: Mapped[str] = mapped_column(String(100), default="Deutschland")
 
     is_current: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -87,8 +110,3 @@ class TenantAddress(Base):
 
     # Relationships
     tenant: Mapped["Tenant"] = relationship("Tenant", back_populates="addresses")
-
-    @property
-    def full_address(self) -> str:
-        house = f" {self.house_number}" if self.house_number else ""
-        return f"{self.street}{house}, {self.postal_code} {self.city}"
@@ -43,11 +43,13 @@ class Unit(Base):
     property_ref: Mapped["Property"] = relationship("Property", back_populates="units")
     tenants: Mapped[List["Tenant"]] = relationship("Tenant", back_populates="unit", cascade="all, delete-orphan")
     allocations: Mapped[List["UnitAllocation"]] = relationship("UnitAllocation", back_populates="unit", cascade="all, delete-orphan")
-
-    @property
-    def current_tenant(self) -> Optional["Tenant"]:
-        """Aktueller Mieter (ohne Auszugsdatum)"""
-        for tenant in self.tenants:
-            if tenant.is_active and tenant.move_out_date is None:
-                return tenant
-        return None
+    # Aktueller Mieter (ohne Auszugsdatum), über Partial-Index ix_tenants_unit_current
+    current_tenant: Mapped[Optional["Tenant"]] = relationship(
+        "Tenant",
+        primaryjoin=(
+            "and_(Unit.id == Tenant.unit_id, Tenant.is_active.is_(True), "
+            "Tenant.move_out_date.is_(None))"
+        ),
+        viewonly=True,
+        uselist=False,
+    )
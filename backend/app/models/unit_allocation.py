@@ -3,11 +3,12 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import DateTime, Numeric, ForeignKey, Enum, UniqueConstraint, func
+from sqlalchemy import Computed, DateTime, Numeric, ForeignKey, Text, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import SmallIntEnum
 from app.models.enums import CostCategory, AllocationMethod
 
 if TYPE_CHECKING:
@@ -21,17 +22,18 @@ class UnitAllocation(Base):
         UniqueConstraint("unit_id", "cost_category", name="uq_unit_cost_category"),
     )
 
+    # Serverseitig erzeugt: Sammel-INSERTs holen die IDs per RETURNING
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
     )
     unit_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("units.id", ondelete="CASCADE"), nullable=False
     )
     cost_category: Mapped[CostCategory] = mapped_column(
-        Enum(CostCategory), nullable=False
+        SmallIntEnum(CostCategory), nullable=False
     )
     allocation_method: Mapped[AllocationMethod] = mapped_column(
-        Enum(AllocationMethod), nullable=False
+        SmallIntEnum(AllocationMethod), nullable=False
     )
     allocation_percentage: Mapped[Decimal] = mapped_column(
         Numeric(5, 4), nullable=False  # 0.0000 bis 1.0000
@@ -39,6 +41,11 @@ class UnitAllocation(Base):
     custom_value: Mapped[Optional[Decimal]] = mapped_column(
         Numeric(10, 2), nullable=True  # Für verbrauchsbasierte Abrechnung
     )
+    # Beim Schreiben berechnet (GENERATED ALWAYS AS ... STORED), z.B. "50.00%"
+    percentage_display: Mapped[str] = mapped_column(
+        Text,
+        Computed("round(allocation_percentage * 100, 2)::text || '%'", persisted=True),
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -50,6 +57,3 @@ class UnitAllocation(Base):
     # Relationships
     unit: Mapped["Unit"] = relationship("Unit", back_populates="allocations")
 
-    @property
-    def percentage_display(self) -> str:
-        return f"{self.allocation_percentage * 100:.2f}%"
@@ -0,0 +1,68 @@
+"""
+Prozesslokaler LRU-Cache fuer OCR- und LLM-Ergebnisse, plus Datei-Cache fuer OCR
+"""
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+
+class LRUCache:
+    """Threadsicherer LRU-Cache mit fester Maximalgroesse"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[bytes, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class DiskCache:
+    """
+    Dateibasierter Cache fuer JSON-serialisierbare Werte (ueberlebt Neustarts
+    und wird von allen Worker-Prozessen geteilt). Fehler beim Lesen/Schreiben
+    werden ignoriert; der Cache ist nur eine Abkuerzung.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path(self, key: bytes) -> Path:
+        return self.directory / f"{key.hex()}.json"
+
+    def get(self, key: bytes) -> Optional[Any]:
+        try:
+            return json.loads(self._path(key).read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: bytes, value: Any) -> None:
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(value, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
@@ -0,0 +1,49 @@
+"""
+Lokale Kostenarten-Zuordnung fuer LLM-Extraktionen.
+Das LLM liefert nur die Rohfelder; die Kategorie wird hier bestimmt:
+1. Verifizierte Rechnungen desselben Lieferanten (haeufigste Kategorie)
+2. Schluesselwoerter im OCR-Text (wie bei der Regex-Extraktion)
+"""
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.enums import CostCategory
+from app.ocr.extractor import InvoiceDataExtractor
+
+_extractor = InvoiceDataExtractor()
+
+
+def _vendor_category(db: Session, vendor_name: str) -> Optional[CostCategory]:
+    """Haeufigste Kategorie der verifizierten Rechnungen dieses Lieferanten"""
+    from app.models.invoice import Invoice
+
+    return db.execute(
+        select(Invoice.cost_category)
+        .where(
+            func.lower(Invoice.vendor_name) == vendor_name.lower(),
+            Invoice.is_verified,  # wie das Praedikat des Partial-Index
+        )
+        .group_by(Invoice.cost_category)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).scalar()
+
+
+def classify(
+    text: str, vendor_name: Optional[str] = None, db: Optional[Session] = None
+) -> CostCategory:
+    """
+    Kostenart fuer eine Rechnung bestimmen.
+
+    Args:
+        text: OCR-Text der Rechnung
+        vendor_name: Vom LLM extrahierter Lieferant (fuer die Historie)
+        db: Optionale DB-Session; ohne Session nur Schluesselwoerter
+    """
+    if db is not None and vendor_name:
+        category = _vendor_category(db, vendor_name)
+        if category is not None:
+            return category
+    return _extractor.suggest_category(text)
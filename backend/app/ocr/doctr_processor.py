@@ -4,44 +4,134 @@ Verwendet das docTR (Document Text Recognition) Framework fuer OCR.
 """
 import io
 import logging
+import threading
 from pathlib import Path
-from dataclasses import dataclass
 
 from PIL import Image
 
-from app.ocr.extractor import InvoiceDataExtractor, ExtractedInvoiceData
+from app.config import settings
+from app.ocr.engine_result import EngineResult
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class OCRResult:
-    """Ergebnis der OCR-Verarbeitung"""
-    raw_text: str
-    confidence: float
-    extracted_data: ExtractedInvoiceData
+# Ein geladenes Modell pro Prozess (Laden/Kompilieren dauert Sekunden bis Minuten)
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+# Modellaufrufe seriell: CUDA-Graphen sind nicht threadsicher, auf der CPU nutzt
+# ein Aufruf ohnehin alle Kerne
+_PREDICT_LOCK = threading.Lock()
+
+
+def _to_device(model):
+    """
+    Mit CUDA: Modell auf die GPU in FP16, Detection-CNN im channels_last-Layout.
+
+    Ohne CUDA bleibt das Modell unveraendert (FP32 auf der CPU).
+    """
+    import torch
+
+    if not torch.cuda.is_available():
+        return model
+
+    # .half() ist der von docTR unterstuetzte Weg (Eingaben werden passend gecastet)
+    model = model.cuda().half()
+    det_model = model.det_predictor.model
+    model.det_predictor.model = det_model.to(memory_format=torch.channels_last).eval()
+    model.reco_predictor.model.eval()
+    logger.info(f"docTR auf GPU ({torch.cuda.get_device_name()}, FP16)")
+    return model
+
+
+def _quantize(model):
+    """
+    Dynamische INT8-Quantisierung der Recognition (nur CPU, OCR_CPU_INT8).
+
+    quantize_dynamic unterstuetzt nur Linear/LSTM - das betrifft den
+    Sequenz-Decoder von crnn_vgg16_bn. Die Detection (reines CNN) bleibt FP32.
+    """
+    import torch
+
+    if not settings.OCR_CPU_INT8 or torch.cuda.is_available():
+        return model
+
+    model.reco_predictor.model = torch.ao.quantization.quantize_dynamic(
+        model.reco_predictor.model, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8
+    )
+    logger.info("docTR Recognition dynamisch INT8-quantisiert (CPU)")
+    return model
+
+
+def _compile(model):
+    """
+    torch.compile(mode="reduce-overhead") fuer Detection und Recognition (nur CUDA).
+
+    reduce-overhead zeichnet pro Eingabeform einen CUDA-Graphen auf; die
+    Recognition-Crops haben eine feste Groesse, es variiert nur die Batchgroesse.
+    """
+    import torch
+
+    if not (settings.OCR_TORCH_COMPILE and torch.cuda.is_available()):
+        return model
+
+    for predictor in (model.det_predictor, model.reco_predictor):
+        predictor.model = torch.compile(predictor.model, mode="reduce-overhead")
+    logger.info("docTR Detection/Recognition mit torch.compile (reduce-overhead)")
+    return model
+
+
+def _get_model():
+    """Geteiltes docTR-Modell laden (einmal pro Prozess)"""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                from doctr.models import ocr_predictor
+                # db_resnet50 fuer Detection, crnn_vgg16_bn fuer Recognition
+                model = ocr_predictor(
+                    det_arch='db_resnet50',
+                    reco_arch='crnn_vgg16_bn',
+                    pretrained=True
+                )
+                _MODEL = _compile(_quantize(_to_device(model)))
+                logger.info("docTR Modell erfolgreich geladen")
+    return _MODEL
+
+
+# Render-Skalierung wie DocumentFile.from_pdf (72 dpi * 2)
+PDF_RENDER_SCALE = 2
+
+
+def _iter_pdf_pages(source):
+    """
+    PDF-Seiten einzeln rendern (Pfad oder Bytes).
+
+    Entspricht DocumentFile.from_pdf, haelt aber immer nur eine Seite als
+    Bild im Speicher statt das ganze Dokument vorab zu rastern.
+    """
+    import pypdfium2 as pdfium  # Abhaengigkeit von docTR
+
+    pdf = pdfium.PdfDocument(source)
+    try:
+        for page in pdf:
+            yield page.render(scale=PDF_RENDER_SCALE, rev_byteorder=True).to_numpy()
+            page.close()
+    finally:
+        pdf.close()
 
 
 class DocTRProcessor:
     """docTR-basierter OCR-Prozessor fuer deutsche Rechnungen"""
 
     def __init__(self):
-        self.extractor = InvoiceDataExtractor()
         self._model = None
 
     @property
     def model(self):
-        """Lazy load docTR model (cached after first load)"""
+        """Lazy load docTR model (prozessweit geteilt)"""
         if self._model is None:
             try:
-                from doctr.models import ocr_predictor
-                # db_resnet50 fuer Detection, crnn_vgg16_bn fuer Recognition
-                self._model = ocr_predictor(
-                    det_arch='db_resnet50',
-                    reco_arch='crnn_vgg16_bn',
-                    pretrained=True
-                )
-                logger.info("docTR Modell erfolgreich geladen")
+                self._model = _get_model()
             except ImportError as e:
                 logger.error(f"docTR nicht installiert: {e}")
                 raise
@@ -50,8 +140,30 @@ class DocTRProcessor:
                 raise
         return self._model
 
-    def process_file(self, file_path: str) -> OCRResult:
-        """Verarbeite eine Datei und extrahiere Rechnungsdaten"""
+    def _predict(self, pages):
+        """Modellaufruf ohne Autograd-Buchhaltung"""
+        import torch
+
+        model = self.model
+        with _PREDICT_LOCK, torch.inference_mode():
+            return model(pages)
+
+    def warmup(self) -> None:
+        """Modell laden und Detection + Recognition einmal auf Leerbildern ausfuehren"""
+        import numpy as np
+        import torch
+
+        model = self.model
+        page = np.full((32, 32, 3), 255, dtype=np.uint8)
+        # Auf einer leeren Seite findet die Detection nichts -> Recognition direkt aufrufen
+        crop = np.full((32, 128, 3), 255, dtype=np.uint8)
+        with _PREDICT_LOCK, torch.inference_mode():
+            model([page])
+            model.reco_predictor([crop])
+        logger.info("docTR Warm-up abgeschlossen")
+
+    def _load_file(self, file_path: str) -> list:
+        """Lade die Seiten einer Datei als Bilder"""
         from doctr.io import DocumentFile
 
         path = Path(file_path)
@@ -62,64 +174,98 @@ class DocTRProcessor:
         suffix = path.suffix.lower()
 
         if suffix == '.pdf':
-            doc = DocumentFile.from_pdf(str(path))
+            return DocumentFile.from_pdf(str(path))
         elif suffix in ['.png', '.jpg', '.jpeg']:
-            doc = DocumentFile.from_images(str(path))
+            return DocumentFile.from_images(str(path))
         else:
             raise ValueError(f"Nicht unterstuetztes Dateiformat: {suffix}")
 
-        result = self.model(doc)
-        full_text, avg_confidence = self._extract_text_and_confidence(result)
-        extracted_data = self.extractor.extract(full_text)
+    def _load_bytes(self, content: bytes, filename: str) -> list:
+        """Lade die Seiten aus Bytes als Bilder"""
+        from doctr.io import DocumentFile
 
-        return OCRResult(
-            raw_text=full_text,
-            confidence=round(avg_confidence, 2),
-            extracted_data=extracted_data
-        )
+        if filename.lower().endswith('.pdf'):
+            return DocumentFile.from_pdf(content)
 
-    def process_bytes(self, content: bytes, filename: str) -> OCRResult:
-        """Verarbeite Bytes und extrahiere Rechnungsdaten"""
-        from doctr.io import DocumentFile
+        # Fuer Bilder: Als einzelnes Bild laden
+        image = Image.open(io.BytesIO(content))
+        import numpy as np
+        img_array = np.array(image)
+        return DocumentFile.from_images([img_array])
+
+    def _build_result(self, pages) -> EngineResult:
+        full_text, avg_confidence = self._extract_text_and_confidence(pages)
+        return EngineResult(raw_text=full_text, confidence=round(avg_confidence, 2))
 
+    def _process_pdf(self, source) -> EngineResult:
+        """PDF seitenweise erkennen (Spitzenspeicher: eine gerasterte Seite)"""
+        result_pages = []
+        for image in _iter_pdf_pages(source):
+            result_pages.extend(self._predict([image]).pages)
+            del image
+        return self._build_result(result_pages)
+
+    def process_file(self, file_path: str) -> EngineResult:
+        """Erkenne den Text einer Datei"""
+        path = Path(file_path)
+        if path.suffix.lower() == '.pdf' and path.exists():
+            return self._process_pdf(str(path))
+        result = self._predict(self._load_file(file_path))
+        return self._build_result(result.pages)
+
+    def process_bytes(self, content: bytes, filename: str) -> EngineResult:
+        """Erkenne den Text aus Bytes"""
         if filename.lower().endswith('.pdf'):
-            doc = DocumentFile.from_pdf(content)
-        else:
-            # Fuer Bilder: Als einzelnes Bild laden
-            image = Image.open(io.BytesIO(content))
-            # Temporaer speichern oder direkt konvertieren
-            import numpy as np
-            img_array = np.array(image)
-            doc = DocumentFile.from_images([img_array])
-
-        result = self.model(doc)
-        full_text, avg_confidence = self._extract_text_and_confidence(result)
-        extracted_data = self.extractor.extract(full_text)
-
-        return OCRResult(
-            raw_text=full_text,
-            confidence=round(avg_confidence, 2),
-            extracted_data=extracted_data
-        )
+            return self._process_pdf(content)
+        result = self._predict(self._load_bytes(content, filename))
+        return self._build_result(result.pages)
+
+    def process_batch(self, file_paths: list[str]) -> list[EngineResult]:
+        """
+        Verarbeite mehrere Dateien mit einem einzigen Modellaufruf.
+
+        Die Seiten aller Dateien werden zusammen durch den Predictor geschickt
+        (Detection/Recognition laufen in Batches) und danach wieder pro Datei
+        aufgeteilt. Ergebnisse in derselben Reihenfolge wie file_paths.
+        """
+        all_pages = []
+        page_counts = []
+        for file_path in file_paths:
+            pages = self._load_file(file_path)
+            all_pages.extend(pages)
+            page_counts.append(len(pages))
+
+        if not all_pages:
+            return [self._build_result([]) for _ in file_paths]
+
+        result_pages = self._predict(all_pages).pages
+
+        results = []
+        offset = 0
+        for count in page_counts:
+            results.append(self._build_result(result_pages[offset:offset + count]))
+            offset += count
+        return results
+
+    def _extract_text_and_confidence(self, pages) -> tuple:
+        """Extrahiere Text und Durchschnittskonfidenz aus den Seiten eines docTR-Ergebnisses"""
+        import numpy as np
 
-    def _extract_text_and_confidence(self, result) -> tuple:
-        """Extrahiere Text und Durchschnittskonfidenz aus docTR-Ergebnis"""
         all_text = []
         confidences = []
 
-        for page in result.pages:
-            page_lines = []
-            for block in page.blocks:
-                for line in block.lines:
-                    line_text = " ".join(word.value for word in line.words)
-                    page_lines.append(line_text)
-                    # Sammle Wort-Konfidenzen
-                    for word in line.words:
-                        confidences.append(word.confidence)
-            all_text.append("\n".join(page_lines))
+        for page in pages:
+            # Wortlisten aller Zeilen der Seite, Block fuer Block
+            lines = [line.words for block in page.blocks for line in block.lines]
+            all_text.append("\n".join([" ".join([word.value for word in words]) for words in lines]))
+            # Sammle Wort-Konfidenzen
+            confidences.extend([word.confidence for words in lines for word in words])
 
         full_text = "\n\n".join(all_text)
         # docTR gibt Konfidenz als 0-1, konvertiere zu 0-100
-        avg_confidence = (sum(confidences) / len(confidences) * 100) if confidences else 0
+        avg_confidence = (
+            float(np.fromiter(confidences, dtype=np.float64, count=len(confidences)).mean()) * 100
+            if confidences else 0
+        )
 
         return full_text, avg_confidence
@@ -0,0 +1,12 @@
+"""
+Gemeinsames Ergebnis der OCR-Engines (docTR, Tesseract).
+Die Datenextraktion (LLM/Regex) uebernimmt ausschliesslich OCRProcessor.
+"""
+from dataclasses import dataclass
+
+
+@dataclass
+class EngineResult:
+    """Erkannter Text einer Engine"""
+    raw_text: str
+    confidence: float
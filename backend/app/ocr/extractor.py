@@ -7,6 +7,8 @@ from decimal import Decimal, InvalidOperation
 from typing import Optional
 from dataclasses import dataclass, field
 
+import ahocorasick
+
 from app.models.enums import CostCategory
 
 
@@ -21,32 +23,68 @@ class ExtractedInvoiceData:
     line_items: list = field(default_factory=list)
 
 
+def _build_keyword_automaton(
+    category_keywords: dict[CostCategory, list[str]],
+) -> ahocorasick.Automaton:
+    """
+    Aho-Corasick-Automat über alle Kategorie-Keywords (kleingeschrieben).
+
+    Ein Durchlauf über den Text liefert alle Treffer, auch überlappende
+    (z.B. "wasser" in "trinkwasser"). Wert je Keyword: (keyword, Indizes der
+    Kategorien in category_keywords).
+    """
+    keyword_categories: dict[str, list[int]] = {}
+    for index, keywords in enumerate(category_keywords.values()):
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword.lower(), []).append(index)
+
+    automaton = ahocorasick.Automaton()
+    for keyword, indices in keyword_categories.items():
+        automaton.add_word(keyword, (keyword, tuple(indices)))
+    automaton.make_automaton()
+    return automaton
+
+
 class InvoiceDataExtractor:
     """Extraktor für strukturierte Daten aus deutschem Rechnungstext"""
 
+    # Alle Patterns werden einmalig beim Import kompiliert.
+    # Betrags- und Datums-Patterns laufen auf dem kleingeschriebenen Text
+    # (siehe _fold) ohne IGNORECASE - das ist mit re um ein Vielfaches schneller.
+
     # Patterns für deutsche Geldbeträge: 1.234,56 EUR oder 1.234,56 €
     AMOUNT_PATTERNS = [
         # Gesamtbetrag/Summe/Brutto Patterns
-        r'(?:Gesamt|Summe|Brutto|Total|Endbetrag|Rechnungsbetrag)[:\s]*(\d{1,3}(?:\.\d{3})*,\d{2})\s*(?:EUR|€)?',
+        re.compile(
+            r'(?:gesamt|summe|brutto|total|endbetrag|rechnungsbetrag)[:\s]*(\d{1,3}(?:\.\d{3})*,\d{2})\s*(?:eur|€)?'
+        ),
         # Euro-Beträge mit Währungssymbol
-        r'(\d{1,3}(?:\.\d{3})*,\d{2})\s*(?:EUR|€)',
+        re.compile(r'(\d{1,3}(?:\.\d{3})*,\d{2})\s*(?:eur|€)'),
         # Zu zahlender Betrag
-        r'[Zz]u\s*zahlen[:\s]*(\d{1,3}(?:\.\d{3})*,\d{2})',
+        re.compile(r'zu\s*zahlen[:\s]*(\d{1,3}(?:\.\d{3})*,\d{2})'),
     ]
 
     # Patterns für deutsche Datumsformate
-    DATE_PATTERNS = [
-        (r'(\d{2})\.(\d{2})\.(\d{4})', '%d.%m.%Y'),  # DD.MM.YYYY
-        (r'(\d{2})/(\d{2})/(\d{4})', '%d/%m/%Y'),     # DD/MM/YYYY
-        (r'(\d{2})-(\d{2})-(\d{4})', '%d-%m-%Y'),     # DD-MM-YYYY
-    ]
+    # DD.MM.YYYY, DD/MM/YYYY, DD-MM-YYYY (gleiches Trennzeichen, per Rückverweis)
+    DATE_PATTERN = re.compile(r'\d{2}([./-])\d{2}\1\d{4}')
+
+    # Datum in der Nähe von "Rechnungsdatum", "Datum", etc.
+    DATE_CONTEXT_PATTERN = re.compile(
+        r'(?:rechnungs?datum|datum|date)[:\s]*(\d{2}[\./-]\d{2}[\./-]\d{4})'
+    )
 
     # Patterns für Rechnungsnummern
     INVOICE_NUMBER_PATTERNS = [
-        r'(?:Rechnungs?(?:nummer|nr\.?)|Re\.?-?Nr\.?|Beleg-?Nr\.?)[:\s]*([A-Z0-9\-/]+)',
-        r'(?:Invoice|Inv\.?)\s*(?:No\.?|Nr\.?)?[:\s]*([A-Z0-9\-/]+)',
+        re.compile(
+            r'(?:Rechnungs?(?:nummer|nr\.?)|Re\.?-?Nr\.?|Beleg-?Nr\.?)[:\s]*([A-Z0-9\-/]+)',
+            re.IGNORECASE,
+        ),
+        re.compile(r'(?:Invoice|Inv\.?)\s*(?:No\.?|Nr\.?)?[:\s]*([A-Z0-9\-/]+)', re.IGNORECASE),
     ]
 
+    # Lieferanten-Heuristik: Zeilen, die kein Firmenname sind
+    VENDOR_SKIP_PATTERN = re.compile(r'^\d|rechnung|datum|seite|nr')
+
     # Keywords für Kostenkategorien
     CATEGORY_KEYWORDS: dict[CostCategory, list[str]] = {
         CostCategory.WASSERVERSORGUNG: [
@@ -95,23 +133,42 @@ class InvoiceDataExtractor:
         ],
     }
 
+    # Einmal beim Import aus CATEGORY_KEYWORDS aufgebaut
+    KEYWORD_CATEGORIES = tuple(CATEGORY_KEYWORDS)
+    KEYWORD_AUTOMATON = _build_keyword_automaton(CATEGORY_KEYWORDS)
+
     def extract(self, text: str) -> ExtractedInvoiceData:
         """Extrahiere strukturierte Daten aus OCR-Text"""
+        # Einmal kleinschreiben, von allen Pattern- und Keyword-Suchen geteilt
+        text_lower = text.lower()
+        folded = self._fold(text_lower)
         return ExtractedInvoiceData(
-            vendor_name=self._extract_vendor_name(text),
+            vendor_name=self._extract_vendor_name(text, folded),
             invoice_number=self._extract_invoice_number(text),
-            invoice_date=self._extract_date(text),
-            total_amount=self._extract_total_amount(text),
-            suggested_category=self._suggest_category(text)
+            invoice_date=self._extract_date(folded),
+            total_amount=self._extract_total_amount(folded),
+            suggested_category=self._suggest_category(text_lower)
         )
 
-    def _extract_total_amount(self, text: str) -> Optional[Decimal]:
-        """Extrahiere den Gesamtbetrag"""
+    def suggest_category(self, text: str) -> CostCategory:
+        """Kostenkategorie allein aus den Keywords im Text"""
+        return self._suggest_category(text.lower())
+
+    @staticmethod
+    def _fold(text_lower: str) -> str:
+        """
+        Kleingeschriebenen Text für die Pattern-Suche vorbereiten.
+
+        IGNORECASE behandelt das lange ſ wie s; lower() lässt es stehen.
+        """
+        return text_lower.replace('ſ', 's') if 'ſ' in text_lower else text_lower
+
+    def _extract_total_amount(self, folded: str) -> Optional[Decimal]:
+        """Extrahiere den Gesamtbetrag (aus dem Text nach _fold)"""
         amounts = []
 
         for pattern in self.AMOUNT_PATTERNS:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
+            for match in pattern.findall(folded):
                 try:
                     # Deutsches Zahlenformat in Decimal konvertieren
                     amount_str = match.replace('.', '').replace(',', '.')
@@ -124,78 +181,65 @@ class InvoiceDataExtractor:
         # Den größten Betrag zurückgeben (normalerweise der Gesamtbetrag)
         return max(amounts) if amounts else None
 
-    def _extract_date(self, text: str) -> Optional[date]:
-        """Extrahiere das Rechnungsdatum"""
+    def _extract_date(self, folded: str) -> Optional[date]:
+        """Extrahiere das Rechnungsdatum (aus dem Text nach _fold)"""
         # Suche nach Datum in der Nähe von "Rechnungsdatum", "Datum", etc.
-        date_context_pattern = r'(?:Rechnungs?datum|Datum|Date)[:\s]*(\d{2}[\./-]\d{2}[\./-]\d{4})'
-        match = re.search(date_context_pattern, text, re.IGNORECASE)
+        match = self.DATE_CONTEXT_PATTERN.search(folded)
 
         if match:
             date_str = match.group(1)
         else:
             # Fallback: Erstes Datum im Text finden
-            for pattern, _ in self.DATE_PATTERNS:
-                match = re.search(pattern, text)
-                if match:
-                    date_str = match.group(0)
-                    break
-            else:
+            match = self.DATE_PATTERN.search(folded)
+            if not match:
                 return None
+            date_str = match.group(0)
 
-        # Datum parsen
-        for pattern, _ in self.DATE_PATTERNS:
-            match = re.match(pattern, date_str)
-            if match:
-                day, month, year = match.groups()
-                try:
-                    return date(int(year), int(month), int(day))
-                except ValueError:
-                    continue
-
-        return None
+        # Datum parsen: date_str hat immer die Form DD?MM?YYYY
+        if date_str[2] != date_str[5]:
+            return None  # Gemischte Trennzeichen (z.B. 01.02/2024)
+        try:
+            return date(int(date_str[6:]), int(date_str[3:5]), int(date_str[:2]))
+        except ValueError:
+            return None
 
     def _extract_invoice_number(self, text: str) -> Optional[str]:
         """Extrahiere die Rechnungsnummer"""
         for pattern in self.INVOICE_NUMBER_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         return None
 
-    def _extract_vendor_name(self, text: str) -> Optional[str]:
+    def _extract_vendor_name(self, text: str, folded: str) -> Optional[str]:
         """Extrahiere den Lieferantennamen (erste Zeile oder nach bestimmten Patterns)"""
-        lines = text.strip().split('\n')
+        # Nur erste 5 Zeilen prüfen; folded liefert dieselben Zeilen kleingeschrieben
+        lines = text.strip().split('\n', 5)[:5]
+        folded_lines = folded.strip().split('\n', 5)[:5]
 
         # Erste nicht-leere Zeile als Firmenname nehmen
-        for line in lines[:5]:  # Nur erste 5 Zeilen prüfen
+        for line, line_folded in zip(lines, folded_lines):
             line = line.strip()
             if line and len(line) > 3:
                 # Prüfen ob es wie ein Firmenname aussieht
-                if not re.match(r'^\d', line) and not any(
-                    keyword in line.lower()
-                    for keyword in ['rechnung', 'datum', 'seite', 'nr']
-                ):
+                if not self.VENDOR_SKIP_PATTERN.search(line_folded.strip()):
                     return line[:100]  # Max 100 Zeichen
 
         return None
 
-    def _suggest_category(self, text: str) -> Optional[CostCategory]:
-        """Schlage eine Kostenkategorie basierend auf Keywords vor"""
-        text_lower = text.lower()
-
-        # Zähle Treffer pro Kategorie
-        category_scores: dict[CostCategory, int] = {}
-
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            score = 0
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    score += 1
-            if score > 0:
-                category_scores[category] = score
-
-        # Kategorie mit höchstem Score zurückgeben
-        if category_scores:
-            return max(category_scores, key=category_scores.get)
-
-        return CostCategory.SONSTIGE
+    def _suggest_category(self, text_lower: str) -> Optional[CostCategory]:
+        """Schlage eine Kostenkategorie basierend auf Keywords vor (Text kleingeschrieben)"""
+        # Gefundene Keywords (jedes zählt einmal, auch bei mehrfachem Vorkommen)
+        found = {value for _, value in self.KEYWORD_AUTOMATON.iter(text_lower)}
+        if not found:
+            return CostCategory.SONSTIGE
+
+        # Treffer pro Kategorie-Index
+        scores = [0] * len(self.KEYWORD_CATEGORIES)
+        for _, indices in found:
+            for index in indices:
+                scores[index] += 1
+
+        # Kategorie mit höchstem Score (bei Gleichstand die zuerst definierte)
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return self.KEYWORD_CATEGORIES[best]
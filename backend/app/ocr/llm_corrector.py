@@ -3,16 +3,24 @@ LLM-basierte OCR-Textkorrektur und Datenextraktion via OpenRouter API.
 - Korrigiert OCR-Fehler kontextbasiert unter Beibehaltung des Originalformats
 - Extrahiert strukturierte Rechnungsdaten direkt aus OCR-Text
 """
+import asyncio
+import hashlib
 import logging
-import json
-from typing import Optional
-from dataclasses import dataclass
+import random
+import re
+import threading
+import time
+import weakref
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+from dataclasses import dataclass, replace
 from datetime import date
 from decimal import Decimal, InvalidOperation
 
 import httpx
+import orjson
 
-from app.models.enums import CostCategory
+from app.ocr.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +46,275 @@ OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 # Maximale Eingabelaenge (Zeichen)
 MAX_INPUT_LENGTH = 8000
 
+# Rundung extrahierter Betraege auf Cent
+CENT = Decimal("0.01")
+
+# Leerraum im OCR-Text (Tesseract-Layout): Leerzeichenfolgen und Leerzeilen
+HORIZONTAL_SPACE_PATTERN = re.compile(r'[ \t\f\v\r]+')
+LINE_BREAK_PATTERN = re.compile(r' ?\n[ \n]*')
+
+# Kuerzere Texte werden nicht korrigiert (Aufwand lohnt nicht)
+MIN_CORRECTION_LENGTH = 200
+# Anteil ungewoehnlicher Zeichen, ab dem ein Text als verrauscht gilt
+MAX_NOISE_RATIO = 0.02
+# Typische OCR-Verwechslungen mitten im Wort: "Rechn0ng", "W1rtschaft", "Ste|le"
+SUSPICIOUS_TOKEN_PATTERN = re.compile(r'[a-zäöüß][0-9|][a-zäöüß]')
+# Zeichen, die in deutschen Rechnungen normal vorkommen
+COMMON_CHARS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzäöüß"
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÜ"
+    "0123456789 \t\n.,:;-+/()%€&@#*'\"!?§="
+)
+
+# Gleichzeitige Requests pro Client (Rate-Limit des Providers)
+MAX_CONCURRENT_REQUESTS = 8
+# Offen gehaltene Verbindungen pro Client
+MAX_KEEPALIVE_CONNECTIONS = 20
+
+# Voruebergehende Fehler (Rate-Limit, Gateway, Verbindung) werden wiederholt,
+# mit exponentiellem Backoff und Jitter
+MAX_ATTEMPTS = 4
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+RETRY_BASE_DELAY = 1.0  # Sekunden
+RETRY_MAX_DELAY = 10.0
+# Nach so vielen endgueltig fehlgeschlagenen Requests in Folge wird OpenRouter
+# fuer CIRCUIT_COOLDOWN Sekunden nicht angefragt (direkt Regex-Fallback)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 60.0
+
+# Modelle, deren Anbieter Prompt-Caching nur mit cache_control-Breakpoint nutzen
+PROMPT_CACHE_PROVIDERS = ("anthropic/", "google/")
+
+# Feste Header fuer alle OpenRouter-Requests (Authorization kommt pro Request dazu).
+# Request-Bodies werden mit orjson serialisiert (content= statt json=)
+_STATIC_HEADERS = {
+    "HTTP-Referer": "https://github.com/AbrechnungsaBot8000",
+    "X-Title": "AbrechnungsaBot8000",
+    "Content-Type": "application/json",
+}
+
+# Ein HTTP-Client pro Event-Loop, prozessweit geteilt: die Verbindungen zu
+# OpenRouter bleiben ueber einzelne Aufrufe und Extraktor-Instanzen hinweg offen
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+
+def _auth_header(api_key: str) -> dict:
+    return {"Authorization": f"Bearer {api_key}"}
+
+
+def _loop_client() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    """HTTP-Client und Request-Semaphore der laufenden Event-Loop"""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(loop)
+    if entry is None:
+        client = httpx.AsyncClient(
+            http2=True,
+            headers=_STATIC_HEADERS,
+            limits=httpx.Limits(
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=100,
+                keepalive_expiry=30.0,
+            ),
+        )
+        entry = (client, asyncio.Semaphore(MAX_CONCURRENT_REQUESTS))
+        _clients[loop] = entry
+    return entry
+
+
+async def close_client() -> None:
+    """HTTP-Client der laufenden Event-Loop schliessen (App-Shutdown)"""
+    entry = _clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].aclose()
+
+
+def run_sync(coro):
+    """Coroutine in eigener Event-Loop ausfuehren und deren HTTP-Client schliessen"""
+    async def run():
+        try:
+            return await coro
+        finally:
+            await close_client()
+    return asyncio.run(run())
+
+
+class OpenRouterError(Exception):
+    """Fehlerantwort der OpenRouter API (Meldung fuer error_message)"""
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Wartezeit vor dem naechsten Versuch: Retry-After, sonst exponentiell mit Jitter"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), RETRY_MAX_DELAY)
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+class _CircuitBreaker:
+    """Weist Requests nach wiederholten Fehlschlaegen fuer eine Abklingzeit ab (prozessweit)"""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        if time.monotonic() < self._open_until:
+            raise OpenRouterError(
+                "OpenRouter API voruebergehend deaktiviert (wiederholte Fehler)"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._failures = 0
+                self._open_until = time.monotonic() + self.cooldown
+                logger.warning(
+                    f"OpenRouter {self.threshold}x in Folge fehlgeschlagen, "
+                    f"pausiere Anfragen fuer {self.cooldown:.0f}s"
+                )
+
+
+_circuit = _CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN)
+
+
+class _OpenRouterClient:
+    """
+    Basis fuer OpenRouter-Aufrufe ueber den geteilten HTTP-Client (HTTP/2, Keep-Alive).
+
+    Die *_sync-Varianten laufen in einer eigenen Loop (asyncio.run) und
+    schliessen deren Client am Ende wieder.
+    """
+
+    def __init__(self, api_key: str, model: str):
+        self.api_key = api_key
+        self.model = model
+        self.timeout = 60.0  # Sekunden
+
+    def _system_message(self, prompt: str, model: Optional[str] = None) -> dict:
+        """
+        System-Nachricht; fuer Anbieter mit expliziten Cache-Breakpoints mit cache_control.
+
+        Der System-Prompt ist fuer alle Aufrufe gleich und steht vor dem
+        OCR-Text, kann also als Praefix gecacht werden. OpenAI und andere
+        cachen Praefixe automatisch.
+        """
+        if (model or self.model).startswith(PROMPT_CACHE_PROVIDERS):
+            return {
+                "role": "system",
+                "content": [
+                    {"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}
+                ],
+            }
+        return {"role": "system", "content": prompt}
+
+    async def _send(self, send) -> httpx.Response:
+        """
+        send() mit Wiederholung bei Verbindungsfehlern und RETRY_STATUS_CODES.
+
+        Nach dem letzten Versuch wird die Fehlerantwort zurueckgegeben bzw. der
+        Verbindungsfehler weitergereicht. Ist der Circuit Breaker offen, wird
+        sofort OpenRouterError ausgeloest.
+        """
+        _circuit.check()
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                response = await send()
+            except httpx.TransportError:
+                if attempt == MAX_ATTEMPTS:
+                    _circuit.record_failure()
+                    raise
+                delay = _retry_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    _circuit.record_success()
+                    return response
+                if attempt == MAX_ATTEMPTS:
+                    _circuit.record_failure()
+                    return response
+                delay = _retry_delay(attempt, response)
+                await response.aclose()
+
+            logger.warning(
+                f"OpenRouter Versuch {attempt}/{MAX_ATTEMPTS} fehlgeschlagen, "
+                f"neuer Versuch in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _post(self, payload: dict) -> httpx.Response:
+        client, semaphore = _loop_client()
+        async with semaphore:
+            return await self._send(lambda: client.post(
+                OPENROUTER_API_URL,
+                content=orjson.dumps(payload),
+                headers=_auth_header(self.api_key),
+                timeout=self.timeout,
+            ))
+
+    async def _stream(self, payload: dict) -> AsyncIterator[str]:
+        """
+        Request mit "stream": true; liefert die Text-Deltas der Antwort (SSE).
+
+        Wiederholt wird nur der Verbindungsaufbau, nicht ein abgebrochener Stream.
+        Mit contextlib.aclosing verwenden, wenn vorzeitig abgebrochen wird -
+        erst das Schliessen gibt Verbindung und Semaphore frei.
+
+        Raises:
+            OpenRouterError: HTTP-Fehler oder Fehler-Event im Stream
+        """
+        client, semaphore = _loop_client()
+        async with semaphore:
+            request = client.build_request(
+                "POST",
+                OPENROUTER_API_URL,
+                content=orjson.dumps({**payload, "stream": True}),
+                headers=_auth_header(self.api_key),
+                timeout=self.timeout,
+            )
+            response = await self._send(lambda: client.send(request, stream=True))
+            try:
+                if response.status_code != 200:
+                    await response.aread()
+                    error_msg = f"OpenRouter API Fehler: {response.status_code}"
+                    try:
+                        error_data = response.json()
+                        if "error" in error_data:
+                            error_msg = f"{error_msg} - {error_data['error'].get('message', '')}"
+                    except Exception:
+                        pass
+                    raise OpenRouterError(error_msg)
+
+                async for line in response.aiter_lines():
+                    # Kommentarzeilen (": OPENROUTER PROCESSING") und Leerzeilen ignorieren
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[6:]
+                    if data == "[DONE]":
+                        break
+                    chunk = orjson.loads(data)
+                    if "error" in chunk:
+                        raise OpenRouterError(
+                            f"OpenRouter API Fehler: {chunk['error'].get('message', '')}"
+                        )
+                    choices = chunk.get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+            finally:
+                await response.aclose()
+
+    def _run_sync(self, coro):
+        return run_sync(coro)
+
+
 # System-Prompt fuer OCR-Korrektur
 CORRECTION_SYSTEM_PROMPT = """Du bist ein OCR-Korrektur-Assistent fuer deutsche Rechnungen und Belege.
 
@@ -69,7 +346,27 @@ class CorrectionResult:
     error_message: Optional[str] = None
 
 
-class LLMCorrector:
+# Erfolgreiche Korrekturen: (Modell, Eingabetext) -> korrigierter Text.
+# Wiederholungen und Duplikate sparen so den kompletten LLM-Aufruf.
+_correction_cache = LRUCache(maxsize=1024)
+
+
+def _compact(text: str) -> str:
+    """Leerzeichenfolgen zu einem, mehrere Leerzeilen zu einer zusammenfassen"""
+    text = HORIZONTAL_SPACE_PATTERN.sub(' ', text)
+    text = LINE_BREAK_PATTERN.sub(lambda m: '\n\n' if m.group().count('\n') > 1 else '\n', text)
+    return text.strip()
+
+
+def _cache_key(model: str, text: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model.encode())
+    digest.update(b"\0")
+    digest.update(text.encode())
+    return digest.digest()
+
+
+class LLMCorrector(_OpenRouterClient):
     """LLM-basierte Textkorrektur via OpenRouter API"""
 
     def __init__(self, api_key: str, model: str):
@@ -80,9 +377,34 @@ class LLMCorrector:
             api_key: OpenRouter API-Key
             model: Modell-ID (z.B. "anthropic/claude-3.5-sonnet")
         """
-        self.api_key = api_key
-        self.model = model
-        self.timeout = 60.0  # Sekunden
+        super().__init__(api_key, model)
+
+    @staticmethod
+    def _needs_correction(text: str) -> bool:
+        """
+        Grobe Vorpruefung, ob sich ein LLM-Aufruf lohnt.
+
+        Kurze Texte und Texte ohne typische OCR-Fehler (Ziffern/| mitten in
+        Woertern, ungewoehnliche Zeichen) werden unveraendert uebernommen.
+        """
+        stripped = text.strip()
+        if len(stripped) < MIN_CORRECTION_LENGTH:
+            return False
+        if SUSPICIOUS_TOKEN_PATTERN.search(stripped):
+            return True
+        unusual = sum(1 for c in stripped if c not in COMMON_CHARS)
+        return unusual / len(stripped) > MAX_NOISE_RATIO
+
+    def _payload(self, truncated: str) -> dict:
+        return {
+            "model": self.model,
+            "messages": [
+                self._system_message(CORRECTION_SYSTEM_PROMPT),
+                {"role": "user", "content": CORRECTION_USER_PROMPT.format(text=truncated)}
+            ],
+            "temperature": 0.1,  # Niedrig fuer Genauigkeit
+            "max_tokens": 4000
+        }
 
     async def correct_text(self, text: str) -> CorrectionResult:
         """
@@ -94,7 +416,9 @@ class LLMCorrector:
         Returns:
             CorrectionResult mit korrigiertem Text
         """
-        if not text or not text.strip():
+        if not text or not self._needs_correction(text):
+            if text and text.strip():
+                logger.info("LLM-Korrektur uebersprungen: Text kurz oder ohne typische OCR-Fehler")
             return CorrectionResult(
                 original_text=text,
                 corrected_text=text,
@@ -106,56 +430,59 @@ class LLMCorrector:
         # Eingabe auf maximale Laenge begrenzen
         truncated = text[:MAX_INPUT_LENGTH] if len(text) > MAX_INPUT_LENGTH else text
 
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    OPENROUTER_API_URL,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://github.com/AbrechnungsaBot8000",
-                        "X-Title": "AbrechnungsaBot8000"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": CORRECTION_SYSTEM_PROMPT},
-                            {"role": "user", "content": CORRECTION_USER_PROMPT.format(text=truncated)}
-                        ],
-                        "temperature": 0.1,  # Niedrig fuer Genauigkeit
-                        "max_tokens": 4000
-                    }
-                )
-
-                if response.status_code != 200:
-                    error_msg = f"OpenRouter API Fehler: {response.status_code}"
-                    try:
-                        error_data = response.json()
-                        if "error" in error_data:
-                            error_msg = f"{error_msg} - {error_data['error'].get('message', '')}"
-                    except Exception:
-                        pass
+        cache_key = _cache_key(self.model, truncated)
+        cached = _correction_cache.get(cache_key)
+        if cached is not None:
+            return CorrectionResult(
+                original_text=text,
+                corrected_text=cached,
+                model_used=self.model,
+                success=True
+            )
 
-                    logger.error(error_msg)
-                    return CorrectionResult(
-                        original_text=text,
-                        corrected_text=text,
-                        model_used=self.model,
-                        success=False,
-                        error_message=error_msg
-                    )
+        try:
+            response = await self._post(self._payload(truncated))
 
-                data = response.json()
-                corrected = data["choices"][0]["message"]["content"].strip()
+            if response.status_code != 200:
+                error_msg = f"OpenRouter API Fehler: {response.status_code}"
+                try:
+                    error_data = response.json()
+                    if "error" in error_data:
+                        error_msg = f"{error_msg} - {error_data['error'].get('message', '')}"
+                except Exception:
+                    pass
 
-                logger.info(f"LLM-Korrektur erfolgreich mit {self.model}")
+                logger.error(error_msg)
                 return CorrectionResult(
                     original_text=text,
-                    corrected_text=corrected,
+                    corrected_text=text,
                     model_used=self.model,
-                    success=True
+                    success=False,
+                    error_message=error_msg
                 )
 
+            data = orjson.loads(response.content)
+            corrected = data["choices"][0]["message"]["content"].strip()
+
+            _correction_cache.put(cache_key, corrected)
+            logger.info(f"LLM-Korrektur erfolgreich mit {self.model}")
+            return CorrectionResult(
+                original_text=text,
+                corrected_text=corrected,
+                model_used=self.model,
+                success=True
+            )
+
+        except OpenRouterError as e:
+            error_msg = str(e)
+            logger.error(error_msg)
+            return CorrectionResult(
+                original_text=text,
+                corrected_text=text,
+                model_used=self.model,
+                success=False,
+                error_message=error_msg
+            )
         except httpx.TimeoutException:
             error_msg = f"OpenRouter API Timeout nach {self.timeout}s"
             logger.error(error_msg)
@@ -197,8 +524,7 @@ class LLMCorrector:
         Returns:
             CorrectionResult mit korrigiertem Text
         """
-        import asyncio
-        return asyncio.run(self.correct_text(text))
+        return self._run_sync(self.correct_text(text))
 
 
 async def test_openrouter_connection(api_key: str, model: str) -> dict:
@@ -219,40 +545,36 @@ async def test_openrouter_connection(api_key: str, model: str) -> dict:
         return {"success": False, "message": "Kein Modell ausgewaehlt"}
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                OPENROUTER_API_URL,
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://github.com/AbrechnungsaBot8000",
-                    "X-Title": "AbrechnungsaBot8000"
-                },
-                json={
-                    "model": model,
-                    "messages": [
-                        {"role": "user", "content": "Antworte nur mit: OK"}
-                    ],
-                    "temperature": 0,
-                    "max_tokens": 10
-                }
-            )
-
-            if response.status_code == 200:
-                return {"success": True, "message": f"Verbindung erfolgreich mit {model}"}
-            elif response.status_code == 401:
-                return {"success": False, "message": "Ungueltiger API-Key"}
-            elif response.status_code == 402:
-                return {"success": False, "message": "Nicht genuegend Guthaben bei OpenRouter"}
-            elif response.status_code == 404:
-                return {"success": False, "message": f"Modell '{model}' nicht gefunden"}
-            else:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
-                except Exception:
-                    error_msg = f"HTTP {response.status_code}"
-                return {"success": False, "message": error_msg}
+        client, _ = _loop_client()
+        response = await client.post(
+            OPENROUTER_API_URL,
+            headers=_auth_header(api_key),
+            content=orjson.dumps({
+                "model": model,
+                "messages": [
+                    {"role": "user", "content": "Antworte nur mit: OK"}
+                ],
+                "temperature": 0,
+                "max_tokens": 10
+            }),
+            timeout=30.0,
+        )
+
+        if response.status_code == 200:
+            return {"success": True, "message": f"Verbindung erfolgreich mit {model}"}
+        elif response.status_code == 401:
+            return {"success": False, "message": "Ungueltiger API-Key"}
+        elif response.status_code == 402:
+            return {"success": False, "message": "Nicht genuegend Guthaben bei OpenRouter"}
+        elif response.status_code == 404:
+            return {"success": False, "message": f"Modell '{model}' nicht gefunden"}
+        else:
+            try:
+                error_data = response.json()
+                error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
+            except Exception:
+                error_msg = f"HTTP {response.status_code}"
+            return {"success": False, "message": error_msg}
 
     except httpx.TimeoutException:
         return {"success": False, "message": "Verbindungs-Timeout"}
@@ -266,27 +588,50 @@ async def test_openrouter_connection(api_key: str, model: str) -> dict:
 # LLM-basierte Datenextraktion
 # ============================================================================
 
-# Liste der verfuegbaren Kostenkategorien fuer den Prompt
-COST_CATEGORIES_LIST = ", ".join([c.value for c in CostCategory])
+# Modell-Routing: kurze, gut erkannte Belege ohne Positionstabelle gehen an das
+# guenstige Modell (fast_model), alles andere an das konfigurierte Modell
+FAST_MODEL_MAX_LENGTH = 800
+FAST_MODEL_MIN_CONFIDENCE = 90.0
+FAST_MODEL_MAX_AMOUNTS = 4
+AMOUNT_TOKEN_PATTERN = re.compile(r'\d,\d{2}\b')
 
-EXTRACTION_SYSTEM_PROMPT = f"""Du bist ein Experte fuer die Extraktion von Daten aus deutschen Rechnungen und Belegen.
+# Die Kostenkategorie bestimmt nicht das LLM, sondern category_classifier.classify
+EXTRACTION_SYSTEM_PROMPT = """Du bist ein Experte fuer die Extraktion von Daten aus deutschen Rechnungen und Belegen.
 
 Deine Aufgabe ist es, aus OCR-Text einer Rechnung folgende Informationen zu extrahieren:
 - vendor_name: Name des Lieferanten/Unternehmens
 - invoice_number: Rechnungsnummer
 - invoice_date: Rechnungsdatum (Format: YYYY-MM-DD)
 - total_amount: Gesamtbetrag in EUR (nur Zahl, z.B. 123.45)
-- cost_category: Passende Kategorie aus: {COST_CATEGORIES_LIST}
 
 Regeln:
 1. Extrahiere NUR Informationen, die im Text vorhanden sind
 2. Bei Unsicherheit: null zurueckgeben
 3. Betraege: Deutsches Format (1.234,56) zu Dezimal (1234.56) konvertieren
 4. Datum: Immer als YYYY-MM-DD formatieren
-5. Kategorie: Waehle die passendste aus der Liste, im Zweifel SONSTIGE
 
 Antworte AUSSCHLIESSLICH mit einem JSON-Objekt, keine Erklaerungen:
-{{"vendor_name": "...", "invoice_number": "...", "invoice_date": "YYYY-MM-DD", "total_amount": 123.45, "cost_category": "..."}}"""
+{"vendor_name": "...", "invoice_number": "...", "invoice_date": "YYYY-MM-DD", "total_amount": 123.45}"""
+
+# Structured Output: Dekodierung wird auf dieses Schema beschraenkt (response_format)
+EXTRACTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "invoice_extraction",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "vendor_name": {"type": ["string", "null"]},
+                "invoice_number": {"type": ["string", "null"]},
+                "invoice_date": {"type": ["string", "null"], "format": "date"},
+                "total_amount": {"type": ["number", "null"]},
+            },
+            "required": ["vendor_name", "invoice_number", "invoice_date", "total_amount"],
+            "additionalProperties": False,
+        },
+    },
+}
 
 EXTRACTION_USER_PROMPT = """Extrahiere die Rechnungsdaten aus folgendem OCR-Text:
 
@@ -302,33 +647,96 @@ class ExtractionResult:
     invoice_number: Optional[str] = None
     invoice_date: Optional[date] = None
     total_amount: Optional[Decimal] = None
-    cost_category: Optional[CostCategory] = None
     success: bool = False
     error_message: Optional[str] = None
     model_used: str = ""
 
 
-class LLMExtractor:
+class _JsonObjectScanner:
+    """
+    Findet das erste JSON-Objekt in einem Zeichenstrom (ein Durchlauf).
+
+    Beachtet Strings und Escapes; Text davor (Erklaerungen, ```json-Fence)
+    und danach wird ignoriert.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.start = -1  # Position der oeffnenden Klammer im Gesamtstrom
+        self.in_string = False
+        self.escape = False
+        self._offset = 0
+
+    def feed(self, chunk: str) -> int:
+        """Position direkt nach der schliessenden Klammer in chunk, sonst -1"""
+        offset = self._offset
+        self._offset += len(chunk)
+        if self.start < 0:
+            i = chunk.find('{')
+            if i < 0:
+                return -1  # Text vor dem Objekt
+            self.start = offset + i
+            chunk_start = i
+        else:
+            chunk_start = 0
+
+        for i in range(chunk_start, len(chunk)):
+            c = chunk[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '{':
+                self.depth += 1
+            elif c == '"':
+                self.in_string = True
+            elif c == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
+# Erfolgreiche Extraktionen: (Modell, Eingabetext) -> ExtractionResult (Kopien ausgeben)
+_extraction_cache = LRUCache(maxsize=1024)
+
+
+class LLMExtractor(_OpenRouterClient):
     """LLM-basierte Rechnungsdaten-Extraktion via OpenRouter API"""
 
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, fast_model: Optional[str] = None):
         """
         Initialisiere den Extraktor.
 
         Args:
             api_key: OpenRouter API-Key
             model: Modell-ID (z.B. "anthropic/claude-3.5-sonnet")
+            fast_model: Optionales guenstiges Modell fuer einfache Belege
         """
-        self.api_key = api_key
-        self.model = model
-        self.timeout = 60.0
-
-    async def extract_data(self, text: str) -> ExtractionResult:
+        super().__init__(api_key, model)
+        self.fast_model = fast_model
+
+    def _pick_model(self, text: str, confidence: Optional[float] = None) -> str:
+        """Guenstiges Modell fuer kurze, sauber erkannte Belege ohne Positionstabelle"""
+        if (
+            self.fast_model
+            and len(text) < FAST_MODEL_MAX_LENGTH
+            and (confidence is None or confidence >= FAST_MODEL_MIN_CONFIDENCE)
+            and len(AMOUNT_TOKEN_PATTERN.findall(text)) <= FAST_MODEL_MAX_AMOUNTS
+        ):
+            return self.fast_model
+        return self.model
+
+    async def extract_data(self, text: str, confidence: Optional[float] = None) -> ExtractionResult:
         """
         Extrahiere Rechnungsdaten mittels LLM.
 
         Args:
             text: OCR-Rohtext zur Extraktion
+            confidence: OCR-Konfidenz in Prozent (fuer das Modell-Routing)
 
         Returns:
             ExtractionResult mit extrahierten Daten
@@ -340,82 +748,77 @@ class LLMExtractor:
                 model_used=self.model
             )
 
-        truncated = text[:MAX_INPUT_LENGTH] if len(text) > MAX_INPUT_LENGTH else text
+        # Erst Leerraum verdichten, dann kuerzen: mehr Inhalt pro Request
+        compact = _compact(text)
+        truncated = compact[:MAX_INPUT_LENGTH]
+        model = self._pick_model(truncated, confidence)
+
+        # Gleicher Text (z.B. erneut hochgeladene Rechnung) -> gleiche Extraktion
+        cache_key = _cache_key(model, truncated)
+        cached = _extraction_cache.get(cache_key)
+        if cached is not None:
+            logger.info("LLM-Extraktion aus Cache (gleicher OCR-Text)")
+            return replace(cached)
+
+        payload = {
+            "model": model,
+            "messages": [
+                self._system_message(EXTRACTION_SYSTEM_PROMPT, model),
+                {"role": "user", "content": EXTRACTION_USER_PROMPT.format(text=truncated)}
+            ],
+            "temperature": 0.1,
+            "max_tokens": 500,
+            "response_format": EXTRACTION_RESPONSE_FORMAT,
+        }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    OPENROUTER_API_URL,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://github.com/AbrechnungsaBot8000",
-                        "X-Title": "AbrechnungsaBot8000"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-                            {"role": "user", "content": EXTRACTION_USER_PROMPT.format(text=truncated)}
-                        ],
-                        "temperature": 0.1,
-                        "max_tokens": 500
-                    }
-                )
-
-                if response.status_code != 200:
-                    error_msg = f"OpenRouter API Fehler: {response.status_code}"
-                    try:
-                        error_data = response.json()
-                        if "error" in error_data:
-                            error_msg = f"{error_msg} - {error_data['error'].get('message', '')}"
-                    except Exception:
-                        pass
-
-                    logger.error(error_msg)
-                    return ExtractionResult(
-                        success=False,
-                        error_message=error_msg,
-                        model_used=self.model
-                    )
-
-                data = response.json()
-                content = data["choices"][0]["message"]["content"].strip()
-
-                # JSON aus der Antwort extrahieren
-                return self._parse_response(content)
+            # Antwort streamen und abbrechen, sobald das JSON-Objekt vollstaendig ist
+            parts = []
+            scanner = _JsonObjectScanner()
+            async with aclosing(self._stream(payload)) as deltas:
+                async for delta in deltas:
+                    end = scanner.feed(delta)
+                    if end >= 0:
+                        parts.append(delta[:end])
+                        break
+                    parts.append(delta)
+
+            content = "".join(parts)
+            # Text vor dem Objekt (z.B. Code-Fence) abschneiden
+            if scanner.start > 0:
+                content = content[scanner.start:]
+            content = content.strip()
+
+            result = self._parse_response(content, model)
+            if result.success:
+                _extraction_cache.put(cache_key, replace(result))
+            return result
 
+        except OpenRouterError as e:
+            error_msg = str(e)
+            logger.error(error_msg)
+            return ExtractionResult(success=False, error_message=error_msg, model_used=model)
         except httpx.TimeoutException:
             error_msg = f"OpenRouter API Timeout nach {self.timeout}s"
             logger.error(error_msg)
-            return ExtractionResult(success=False, error_message=error_msg, model_used=self.model)
+            return ExtractionResult(success=False, error_message=error_msg, model_used=model)
         except httpx.RequestError as e:
             error_msg = f"OpenRouter API Verbindungsfehler: {str(e)}"
             logger.error(error_msg)
-            return ExtractionResult(success=False, error_message=error_msg, model_used=self.model)
+            return ExtractionResult(success=False, error_message=error_msg, model_used=model)
         except Exception as e:
             error_msg = f"Unerwarteter Fehler bei LLM-Extraktion: {str(e)}"
             logger.error(error_msg)
-            return ExtractionResult(success=False, error_message=error_msg, model_used=self.model)
+            return ExtractionResult(success=False, error_message=error_msg, model_used=model)
 
-    def _parse_response(self, content: str) -> ExtractionResult:
+    def _parse_response(self, content: str, model: str) -> ExtractionResult:
         """Parse die LLM-Antwort und extrahiere die Daten"""
         try:
-            # Versuche JSON zu extrahieren (auch wenn drumherum Text ist)
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            if json_start == -1 or json_end == 0:
-                return ExtractionResult(
-                    success=False,
-                    error_message="Kein JSON in LLM-Antwort gefunden",
-                    model_used=self.model
-                )
-
-            json_str = content[json_start:json_end]
-            parsed = json.loads(json_str)
+            # Reines JSON-Objekt (response_format, vom Stream-Scanner ausgeschnitten)
+            parsed = orjson.loads(content)
 
             # Daten extrahieren und konvertieren
-            result = ExtractionResult(success=True, model_used=self.model)
+            result = ExtractionResult(success=True, model_used=model)
 
             # vendor_name
             if parsed.get("vendor_name"):
@@ -442,30 +845,50 @@ class LLMExtractor:
                     if isinstance(amount, str):
                         # Konvertiere deutsches Format falls noetig
                         amount = amount.replace('.', '').replace(',', '.')
-                    result.total_amount = Decimal(str(amount)).quantize(Decimal("0.01"))
+                    result.total_amount = Decimal(str(amount)).quantize(CENT)
                 except (InvalidOperation, ValueError):
                     pass
 
-            # cost_category
-            if parsed.get("cost_category"):
-                category_str = str(parsed["cost_category"]).upper()
-                try:
-                    result.cost_category = CostCategory(category_str)
-                except ValueError:
-                    result.cost_category = CostCategory.SONSTIGE
-
-            logger.info(f"LLM-Extraktion erfolgreich mit {self.model}")
+            logger.info(f"LLM-Extraktion erfolgreich mit {model}")
             return result
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             error_msg = f"JSON-Parsing fehlgeschlagen: {e}"
             logger.error(error_msg)
             return ExtractionResult(
                 success=False,
                 error_message=error_msg,
-                model_used=self.model
+                model_used=model
             )
 
+    async def extract_data_batch(
+        self,
+        texts: list[str],
+        confidences: Optional[list[float]] = None,
+        concurrency: int = MAX_CONCURRENT_REQUESTS,
+    ) -> list[ExtractionResult]:
+        """
+        Extrahiere Rechnungsdaten aus mehreren Texten parallel (ein Request pro Text).
+
+        Returns:
+            ExtractionResults in der Reihenfolge von texts
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        if confidences is None:
+            confidences = [None] * len(texts)
+
+        async def extract_one(text: str, confidence: Optional[float]) -> ExtractionResult:
+            async with semaphore:
+                return await self.extract_data(text, confidence)
+
+        return list(await asyncio.gather(
+            *(extract_one(t, c) for t, c in zip(texts, confidences))
+        ))
+
+    def extract_data_batch_sync(self, texts: list[str]) -> list[ExtractionResult]:
+        """Synchrone Version von extract_data_batch"""
+        return self._run_sync(self.extract_data_batch(texts))
+
     def extract_data_sync(self, text: str) -> ExtractionResult:
         """
         Synchrone Version der Datenextraktion.
@@ -476,5 +899,4 @@ class LLMExtractor:
         Returns:
             ExtractionResult mit extrahierten Daten
         """
-        import asyncio
-        return asyncio.run(self.extract_data(text))
+        return self._run_sync(self.extract_data(text))
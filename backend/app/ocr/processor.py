@@ -2,16 +2,133 @@
 Haupt-OCR-Prozessor fuer Rechnungsdokumente.
 Orchestriert docTR (primary), Tesseract (fallback), und optionale LLM-Extraktion.
 """
+import asyncio
+import hashlib
 import logging
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from app.config import settings as app_settings
+from app.ocr.cache import DiskCache, LRUCache
+from app.ocr.category_classifier import classify
 from app.ocr.extractor import InvoiceDataExtractor, ExtractedInvoiceData
 
 logger = logging.getLogger(__name__)
 
+# docTR-Ergebnisse nach Dateiinhalt: (raw_text, confidence, engine).
+# Im Speicher (LRU) und auf Platte unter UPLOAD_DIR/cache/ocr, damit Neustarts und
+# andere Worker-Prozesse bereits erkannte Dateien nicht erneut durch docTR schicken.
+# Bei Modellwechsel OCR_CACHE_VERSION erhoehen (aendert alle Schluessel).
+OCR_CACHE_VERSION = b"doctr-1"
+_ocr_cache = LRUCache(maxsize=256)
+_ocr_disk_cache = DiskCache(Path(app_settings.UPLOAD_DIR) / "cache" / "ocr")
+
+# (Pfad, mtime_ns, Groesse) -> Inhalts-Hash: unveraenderte Dateien werden nicht neu gelesen
+_file_key_cache = LRUCache(maxsize=1024)
+
+
+def _content_key(content) -> bytes:
+    return hashlib.blake2b(content, digest_size=16, person=OCR_CACHE_VERSION).digest()
+
+
+def _file_key(file_path: str) -> Optional[bytes]:
+    """Inhalts-Hash einer Datei; gehasht wird per mmap, ohne die Datei zu kopieren"""
+    try:
+        stat = os.stat(file_path)
+        stat_key = f"{file_path}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+        key = _file_key_cache.get(stat_key)
+        if key is None:
+            with open(file_path, "rb") as f:
+                if stat.st_size == 0:
+                    key = _content_key(b"")
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        key = _content_key(mapped)
+            _file_key_cache.put(stat_key, key)
+        return key
+    except (OSError, ValueError):
+        return None
+
+
+def _get_cached_ocr(key: bytes) -> Optional[tuple]:
+    """OCR-Ergebnis aus dem Speicher, sonst von Platte (und dann im Speicher ablegen)"""
+    cached = _ocr_cache.get(key)
+    if cached is None:
+        stored = _ocr_disk_cache.get(key)
+        if stored is not None:
+            cached = tuple(stored)
+            _ocr_cache.put(key, cached)
+    return cached
+
+
+def _put_cached_ocr(key: bytes, ocr_result: tuple) -> None:
+    _ocr_cache.put(key, ocr_result)
+    _ocr_disk_cache.put(key, list(ocr_result))
+
+
+# Eigener Thread-Pool fuer die OCR-Modellaufrufe der async-Methoden: belegt so
+# nicht den Starlette-Threadpool, aus dem auch die synchronen Endpoints laufen
+_ocr_executor = ThreadPoolExecutor(max_workers=app_settings.OCR_WORKERS, thread_name_prefix="ocr")
+
+# Prozessweite Engine-Instanzen (OCRProcessor wird pro Request erzeugt).
+# None = noch nicht geladen, False = docTR nicht verfuegbar
+_doctr_processor = None
+_tesseract_processor = None
+_processor_lock = threading.Lock()
+
+
+def _get_doctr_processor():
+    """docTR-Prozessor (einmal pro Prozess), None wenn docTR nicht installiert ist"""
+    global _doctr_processor
+    if _doctr_processor is None:
+        with _processor_lock:
+            if _doctr_processor is None:
+                try:
+                    import doctr  # noqa
+                    from app.ocr.doctr_processor import DocTRProcessor
+                    _doctr_processor = DocTRProcessor()
+                except ImportError as e:
+                    logger.warning(f"docTR nicht verfuegbar: {e}")
+                    _doctr_processor = False
+    return _doctr_processor or None
+
+
+def _get_tesseract_processor():
+    """Tesseract-Prozessor (einmal pro Prozess)"""
+    global _tesseract_processor
+    if _tesseract_processor is None:
+        with _processor_lock:
+            if _tesseract_processor is None:
+                from app.ocr.tesseract_processor import TesseractProcessor
+                _tesseract_processor = TesseractProcessor()
+    return _tesseract_processor
+
+
+def preload_ocr() -> None:
+    """
+    OCR-Engines beim Start laden und einmal ausfuehren, damit der erste Upload
+    weder Modell-Ladezeit noch Kernel-Initialisierung traegt.
+    """
+    # Fehler sind nicht fatal: der erste OCR-Aufruf versucht es erneut bzw. nutzt Tesseract
+    processor = _get_doctr_processor()
+    if processor is not None:
+        try:
+            processor.warmup()
+        except Exception as e:
+            logger.warning(f"docTR-Warm-up fehlgeschlagen: {e}")
+
+    try:
+        _get_tesseract_processor().warmup()
+    except Exception as e:
+        logger.warning(f"Tesseract-Warm-up fehlgeschlagen: {e}")
+
 
 @dataclass
 class OCRResult:
@@ -46,39 +163,20 @@ class OCRProcessor:
         """
         self.db = db
         self.extractor = InvoiceDataExtractor()
-        self._doctr_processor = None
-        self._tesseract_processor = None
-        self._doctr_available = None
 
     @property
     def doctr_processor(self):
-        """Lazy load docTR processor"""
-        if self._doctr_processor is None:
-            try:
-                from app.ocr.doctr_processor import DocTRProcessor
-                self._doctr_processor = DocTRProcessor()
-            except ImportError as e:
-                logger.warning(f"docTR nicht verfuegbar: {e}")
-                self._doctr_processor = False  # False = nicht verfuegbar
-        return self._doctr_processor if self._doctr_processor else None
+        """docTR-Prozessor (prozessweit geteilt), None wenn nicht verfuegbar"""
+        return _get_doctr_processor()
 
     @property
     def tesseract_processor(self):
-        """Lazy load Tesseract processor"""
-        if self._tesseract_processor is None:
-            from app.ocr.tesseract_processor import TesseractProcessor
-            self._tesseract_processor = TesseractProcessor()
-        return self._tesseract_processor
+        """Tesseract-Prozessor (prozessweit geteilt)"""
+        return _get_tesseract_processor()
 
     def _is_doctr_available(self) -> bool:
         """Pruefe ob docTR verfuegbar ist"""
-        if self._doctr_available is None:
-            try:
-                import doctr  # noqa
-                self._doctr_available = True
-            except ImportError:
-                self._doctr_available = False
-        return self._doctr_available
+        return self.doctr_processor is not None
 
     def process_file(self, file_path: str) -> OCRResult:
         """
@@ -94,7 +192,7 @@ class OCRProcessor:
         raw_text, confidence, engine = self._run_ocr_file(file_path)
 
         # Versuche LLM-Extraktion, dann Regex-Fallback
-        extracted_data, llm_used, llm_error = self._extract_data(raw_text)
+        extracted_data, llm_used, llm_error = self._extract_data(raw_text, confidence)
 
         return OCRResult(
             raw_text=raw_text,
@@ -120,7 +218,7 @@ class OCRProcessor:
         raw_text, confidence, engine = self._run_ocr_bytes(content, filename)
 
         # Versuche LLM-Extraktion, dann Regex-Fallback
-        extracted_data, llm_used, llm_error = self._extract_data(raw_text)
+        extracted_data, llm_used, llm_error = self._extract_data(raw_text, confidence)
 
         return OCRResult(
             raw_text=raw_text,
@@ -131,13 +229,100 @@ class OCRProcessor:
             engine_used=engine
         )
 
-    def _run_ocr_file(self, file_path: str) -> tuple:
+    def process_files(self, file_paths: list[str]) -> list[OCRResult]:
+        """
+        Verarbeite mehrere Dateien; docTR erkennt alle Seiten in einem Modellaufruf.
+
+        Schlaegt der Batch fehl, wird jede Datei einzeln verarbeitet
+        (inkl. Tesseract-Fallback). Reihenfolge wie file_paths.
+        """
+        ocr_results = self._run_ocr_files(file_paths)
+        extractions = self._extract_data_batch(
+            [raw_text for raw_text, _, _ in ocr_results],
+            [confidence for _, confidence, _ in ocr_results],
+        )
+        return self._build_results(ocr_results, extractions)
+
+    async def process_file_async(self, file_path: str) -> OCRResult:
+        """
+        Wie process_file, ohne die Event-Loop zu blockieren.
+
+        OCR laeuft im OCR-Thread-Pool, die LLM-Extraktion direkt auf der
+        laufenden Loop (geteilter HTTP-Client).
+        """
+        loop = asyncio.get_running_loop()
+        ocr_result = await loop.run_in_executor(_ocr_executor, self._run_ocr_file, file_path)
+        extractions = await self._extract_data_batch_async([ocr_result[0]], [ocr_result[1]])
+        return self._build_results([ocr_result], extractions)[0]
+
+    async def process_files_async(self, file_paths: list[str]) -> list[OCRResult]:
+        """Wie process_files, ohne die Event-Loop zu blockieren"""
+        loop = asyncio.get_running_loop()
+        ocr_results = await loop.run_in_executor(_ocr_executor, self._run_ocr_files, file_paths)
+        extractions = await self._extract_data_batch_async(
+            [raw_text for raw_text, _, _ in ocr_results],
+            [confidence for _, confidence, _ in ocr_results],
+        )
+        return self._build_results(ocr_results, extractions)
+
+    @staticmethod
+    def _build_results(ocr_results: list[tuple], extractions: list[tuple]) -> list[OCRResult]:
+        results = []
+        for (raw_text, confidence, engine), extraction in zip(ocr_results, extractions):
+            extracted_data, llm_used, llm_error = extraction
+            results.append(OCRResult(
+                raw_text=raw_text,
+                confidence=confidence,
+                extracted_data=extracted_data,
+                llm_extraction_used=llm_used,
+                llm_extraction_error=llm_error,
+                engine_used=engine
+            ))
+        return results
+
+    def _run_ocr_files(self, file_paths: list[str]) -> list[tuple]:
+        """
+        OCR fuer mehrere Dateien; docTR erkennt alle Seiten in einem Modellaufruf.
+
+        Returns:
+            list[tuple]: je Datei (raw_text, confidence, engine)
+        """
+        keys = [_file_key(file_path) for file_path in file_paths]
+        ocr_results = [_get_cached_ocr(key) if key else None for key in keys]
+        missing = [i for i, cached in enumerate(ocr_results) if cached is None]
+
+        if missing and self._is_doctr_available() and self.doctr_processor:
+            try:
+                batch = self.doctr_processor.process_batch([file_paths[i] for i in missing])
+                logger.info(f"docTR Batch-OCR erfolgreich: {len(missing)} Dateien")
+                for i, r in zip(missing, batch):
+                    ocr_results[i] = (r.raw_text, r.confidence, "doctr")
+                    if keys[i]:
+                        _put_cached_ocr(keys[i], ocr_results[i])
+                missing = []
+            except Exception as e:
+                logger.warning(f"docTR Batch fehlgeschlagen, verarbeite einzeln: {e}")
+
+        for i in missing:
+            ocr_results[i] = self._run_ocr_file(file_paths[i], keys[i])
+        return ocr_results
+
+    def _run_ocr_file(self, file_path: str, key: Optional[bytes] = None) -> tuple:
         """
         Fuehre OCR auf Datei aus (docTR oder Tesseract).
 
+        Args:
+            key: Bereits berechneter Inhalts-Hash (sonst wird die Datei gehasht)
+
         Returns:
             tuple: (raw_text, confidence, engine_name)
         """
+        key = key or _file_key(file_path)
+        cached = _get_cached_ocr(key) if key else None
+        if cached:
+            logger.info("OCR-Ergebnis aus Cache (gleicher Dateiinhalt)")
+            return cached
+
         # Versuche docTR
         if self._is_doctr_available():
             try:
@@ -145,7 +330,10 @@ class OCRProcessor:
                 if processor:
                     result = processor.process_file(file_path)
                     logger.info(f"docTR OCR erfolgreich, Konfidenz: {result.confidence}%")
-                    return result.raw_text, result.confidence, "doctr"
+                    ocr_result = (result.raw_text, result.confidence, "doctr")
+                    if key:
+                        _put_cached_ocr(key, ocr_result)
+                    return ocr_result
             except Exception as e:
                 logger.warning(f"docTR fehlgeschlagen, verwende Tesseract: {e}")
 
@@ -161,6 +349,12 @@ class OCRProcessor:
         Returns:
             tuple: (raw_text, confidence, engine_name)
         """
+        key = _content_key(content)
+        cached = _get_cached_ocr(key)
+        if cached:
+            logger.info("OCR-Ergebnis aus Cache (gleicher Dateiinhalt)")
+            return cached
+
         # Versuche docTR
         if self._is_doctr_available():
             try:
@@ -168,7 +362,9 @@ class OCRProcessor:
                 if processor:
                     result = processor.process_bytes(content, filename)
                     logger.info(f"docTR OCR erfolgreich, Konfidenz: {result.confidence}%")
-                    return result.raw_text, result.confidence, "doctr"
+                    ocr_result = (result.raw_text, result.confidence, "doctr")
+                    _put_cached_ocr(key, ocr_result)
+                    return ocr_result
             except Exception as e:
                 logger.warning(f"docTR fehlgeschlagen, verwende Tesseract: {e}")
 
@@ -177,50 +373,99 @@ class OCRProcessor:
         logger.info(f"Tesseract OCR erfolgreich, Konfidenz: {result.confidence}%")
         return result.raw_text, result.confidence, "tesseract"
 
-    def _extract_data(self, text: str) -> tuple:
+    def _get_llm_extractor(self):
+        """LLMExtractor wenn LLM konfiguriert ist (und eine Session vorliegt), sonst None"""
+        if not self.db:
+            return None
+
+        from app.services.llm_service import get_llm_settings
+
+        settings = get_llm_settings(self.db)
+        if not settings.is_configured:
+            return None
+
+        from app.ocr.llm_corrector import LLMExtractor
+        return LLMExtractor(settings.api_key, settings.model, settings.fast_model)
+
+    def _from_llm_result(self, text: str, result) -> tuple:
+        """ExtractionResult in (ExtractedInvoiceData, llm_used, error) umwandeln, Regex-Fallback bei Fehler"""
+        if result.success:
+            logger.info(f"LLM-Extraktion erfolgreich mit {result.model_used}")
+            # Konvertiere ExtractionResult zu ExtractedInvoiceData
+            return ExtractedInvoiceData(
+                vendor_name=result.vendor_name,
+                invoice_number=result.invoice_number,
+                invoice_date=result.invoice_date,
+                total_amount=result.total_amount,
+                suggested_category=classify(text, result.vendor_name, self.db)
+            ), True, None
+
+        error_msg = f"LLM-Extraktion fehlgeschlagen: {result.error_message}"
+        logger.warning(f"{error_msg}, verwende Regex-Fallback")
+        # Regex-Fallback mit Fehlermeldung
+        return self.extractor.extract(text), False, error_msg
+
+    def _extract_data(self, text: str, confidence: Optional[float] = None) -> tuple:
         """
         Extrahiere Rechnungsdaten - LLM wenn konfiguriert, sonst Regex.
 
         Returns:
             tuple: (ExtractedInvoiceData, llm_used: bool, error_message: Optional[str])
         """
-        if not text:
-            return ExtractedInvoiceData(), False, None
+        return self._extract_data_batch([text], [confidence])[0]
+
+    def _extract_data_batch(
+        self, texts: list[str], confidences: Optional[list[float]] = None
+    ) -> list[tuple]:
+        """Synchrone Version von _extract_data_batch_async (eigene Event-Loop)"""
+        from app.ocr.llm_corrector import run_sync
+        return run_sync(self._extract_data_batch_async(texts, confidences))
+
+    async def _extract_data_batch_async(
+        self, texts: list[str], confidences: Optional[list[float]] = None
+    ) -> list[tuple]:
+        """
+        Wie _extract_data fuer mehrere Texte; die LLM-Requests laufen parallel.
+        Die OCR-Konfidenzen steuern das Modell-Routing des LLMExtractors.
 
-        # Versuche LLM-Extraktion wenn konfiguriert
-        if self.db:
-            try:
-                from app.services.llm_service import get_llm_settings
-
-                settings = get_llm_settings(self.db)
-
-                if settings.is_configured:
-                    from app.ocr.llm_corrector import LLMExtractor
-
-                    extractor = LLMExtractor(settings.api_key, settings.model)
-                    result = extractor.extract_data_sync(text)
-
-                    if result.success:
-                        logger.info(f"LLM-Extraktion erfolgreich mit {result.model_used}")
-                        # Konvertiere ExtractionResult zu ExtractedInvoiceData
-                        return ExtractedInvoiceData(
-                            vendor_name=result.vendor_name,
-                            invoice_number=result.invoice_number,
-                            invoice_date=result.invoice_date,
-                            total_amount=result.total_amount,
-                            suggested_category=result.cost_category
-                        ), True, None
-                    else:
-                        error_msg = f"LLM-Extraktion fehlgeschlagen: {result.error_message}"
-                        logger.warning(f"{error_msg}, verwende Regex-Fallback")
-                        # Regex-Fallback mit Fehlermeldung
-                        return self.extractor.extract(text), False, error_msg
+        Returns:
+            list[tuple]: je Text (ExtractedInvoiceData, llm_used, error_message)
+        """
+        results: list[Optional[tuple]] = [
+            None if text else (ExtractedInvoiceData(), False, None) for text in texts
+        ]
+        pending = [i for i, text in enumerate(texts) if text]
+        if not pending:
+            return results
 
-            except Exception as e:
-                error_msg = f"Fehler bei LLM-Extraktion: {e}"
-                logger.error(f"{error_msg}, verwende Regex-Fallback")
-                return self.extractor.extract(text), False, error_msg
+        # Versuche LLM-Extraktion wenn konfiguriert
+        try:
+            # Einstellungen und Kategorie-Historie kommen aus der synchronen
+            # Session: im Threadpool abfragen, nicht auf der Event-Loop
+            extractor = await asyncio.to_thread(self._get_llm_extractor)
+            if extractor:
+                llm_results = await extractor.extract_data_batch(
+                    [texts[i] for i in pending],
+                    [confidences[i] for i in pending] if confidences else None,
+                )
+                converted = await asyncio.to_thread(
+                    lambda: [
+                        self._from_llm_result(texts[i], llm_result)
+                        for i, llm_result in zip(pending, llm_results)
+                    ]
+                )
+                for i, result in zip(pending, converted):
+                    results[i] = result
+                return results
+        except Exception as e:
+            error_msg = f"Fehler bei LLM-Extraktion: {e}"
+            logger.error(f"{error_msg}, verwende Regex-Fallback")
+            for i in pending:
+                results[i] = (self.extractor.extract(texts[i]), False, error_msg)
+            return results
 
         # Fallback: Regex-basierte Extraktion (kein LLM konfiguriert)
         logger.debug("Verwende Regex-Extraktion")
-        return self.extractor.extract(text), False, None
+        for i in pending:
+            results[i] = (self.extractor.extract(texts[i]), False, None)
+        return results
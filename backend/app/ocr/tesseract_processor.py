@@ -3,107 +3,162 @@ Tesseract OCR-Prozessor (Fallback)
 Wird verwendet wenn docTR nicht verfuegbar ist.
 """
 import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dataclasses import dataclass
 
-import cv2
-import numpy as np
 import pytesseract
 from PIL import Image
 import pdf2image
 
 from app.config import settings
-from app.ocr.extractor import InvoiceDataExtractor, ExtractedInvoiceData
+from app.ocr.engine_result import EngineResult
 
 
-@dataclass
-class OCRResult:
-    """Ergebnis der OCR-Verarbeitung"""
-    raw_text: str
-    confidence: float
-    extracted_data: ExtractedInvoiceData
+# pytesseract startet pro Seite einen tesseract-Prozess -> Threads reichen fuer Parallelitaet
+_page_executor: ThreadPoolExecutor | None = None
+_page_executor_lock = threading.Lock()
+
+
+def _get_page_executor() -> ThreadPoolExecutor:
+    """Gemeinsamer Thread-Pool fuer Seiten-OCR (einmal pro Prozess erzeugt)"""
+    global _page_executor
+    if _page_executor is None:
+        with _page_executor_lock:
+            if _page_executor is None:
+                _page_executor = ThreadPoolExecutor(
+                    max_workers=os.cpu_count() or 1, thread_name_prefix="tesseract"
+                )
+    return _page_executor
 
 
 class TesseractProcessor:
     """Tesseract-basierter OCR-Prozessor (Fallback)"""
 
     def __init__(self):
-        self.extractor = InvoiceDataExtractor()
         self.tesseract_config = r'--oem 3 --psm 6 -l deu'
         pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
 
-    def process_file(self, file_path: str) -> OCRResult:
-        """Verarbeite eine Datei und extrahiere Rechnungsdaten"""
+    def warmup(self) -> None:
+        """Einmal auf einem Leerbild ausfuehren (Binary und Sprachdaten im Page-Cache)"""
+        pytesseract.image_to_data(Image.new('L', (32, 32), 255), config=self.tesseract_config)
+
+    def process_file(self, file_path: str) -> EngineResult:
+        """Erkenne den Text einer Datei"""
         path = Path(file_path)
 
         if not path.exists():
             raise FileNotFoundError(f"Datei nicht gefunden: {file_path}")
 
-        images = self._convert_to_images(path)
-        return self._process_images(images)
+        if path.suffix.lower() == '.pdf':
+            return self._process_pdf(pdf2image.convert_from_path, str(path))
+
+        return self._process_images(self._convert_to_images(path))
 
-    def process_bytes(self, content: bytes, filename: str) -> OCRResult:
-        """Verarbeite Bytes und extrahiere Rechnungsdaten"""
+    def process_bytes(self, content: bytes, filename: str) -> EngineResult:
+        """Erkenne den Text aus Bytes"""
         if filename.lower().endswith('.pdf'):
-            images = pdf2image.convert_from_bytes(content, dpi=300)
+            return self._process_pdf(pdf2image.convert_from_bytes, content)
+
+        return self._process_images([Image.open(io.BytesIO(content))])
+
+    def _process_pdf(self, convert, source) -> EngineResult:
+        """
+        PDF in ein temporaeres Verzeichnis rastern und die Seiten von dort erkennen.
+
+        Jede Seite wird erst im OCR-Aufruf geoeffnet und danach geschlossen:
+        im Speicher sind hoechstens so viele Seiten wie parallele OCR-Threads.
+        """
+        with tempfile.TemporaryDirectory(prefix="tesseract-") as tmpdir:
+            page_paths = convert(source, output_folder=tmpdir, paths_only=True, **self._pdf_options())
+            return self._process_images(page_paths)
+
+    def _process_images(self, images: list) -> EngineResult:
+        """Verarbeite eine Liste von Bildern (PIL-Images oder Pfade gerasterter Seiten)"""
+        # Seiten sind unabhaengig: parallel erkennen, Reihenfolge bleibt erhalten
+        if len(images) > 1:
+            pages = list(_get_page_executor().map(self._ocr_page, images))
         else:
-            images = [Image.open(io.BytesIO(content))]
-
-        return self._process_images(images)
-
-    def _process_images(self, images: list) -> OCRResult:
-        """Verarbeite eine Liste von Bildern"""
-        all_text = []
-        total_confidence = 0
-
-        for img in images:
-            processed_img = self._preprocess_image(img)
+            pages = [self._ocr_page(img) for img in images]
 
-            data = pytesseract.image_to_data(
-                processed_img,
-                config=self.tesseract_config,
-                output_type=pytesseract.Output.DICT
-            )
-
-            text = pytesseract.image_to_string(
-                processed_img,
-                config=self.tesseract_config
-            )
-            all_text.append(text)
-
-            confidences = [int(c) for c in data['conf'] if int(c) > 0]
-            if confidences:
-                total_confidence += sum(confidences) / len(confidences)
+        all_text = [text for text, _ in pages]
+        total_confidence = sum(confidence for _, confidence in pages)
 
         full_text = "\n".join(all_text)
         avg_confidence = total_confidence / len(images) if images else 0
 
-        extracted_data = self.extractor.extract(full_text)
+        return EngineResult(raw_text=full_text, confidence=round(avg_confidence, 2))
+
+    def _ocr_page(self, page) -> tuple[str, float]:
+        """OCR einer Seite (Bild oder Bildpfad): (Text, mittlere Konfidenz)"""
+        if isinstance(page, str):
+            with Image.open(page) as img:
+                return self._ocr_image(img)
+        return self._ocr_image(page)
+
+    def _ocr_image(self, img: Image.Image) -> tuple[str, float]:
+        processed_img = self._preprocess_image(img)
 
-        return OCRResult(
-            raw_text=full_text,
-            confidence=round(avg_confidence, 2),
-            extracted_data=extracted_data
+        # Ein OCR-Durchlauf pro Seite: Text wird aus den Wortdaten zusammengesetzt
+        data = pytesseract.image_to_data(
+            processed_img,
+            config=self.tesseract_config,
+            output_type=pytesseract.Output.DICT
         )
+        return self._text_and_confidence(data)
+
+    @staticmethod
+    def _text_and_confidence(data: dict) -> tuple[str, float]:
+        """Seitentext (Zeilen wie image_to_string) und mittlere Wort-Konfidenz aus image_to_data"""
+        lines = []
+        words = []
+        confidences = []
+        line_key = None
+
+        for block, par, line, word, conf in zip(
+            data['block_num'], data['par_num'], data['line_num'], data['text'], data['conf']
+        ):
+            conf = float(conf)
+            if conf > 0:
+                confidences.append(conf)
+            if not word or word.isspace():
+                continue
+            key = (block, par, line)
+            if key != line_key:
+                if words:
+                    lines.append(" ".join(words))
+                words = []
+                line_key = key
+            words.append(word)
+
+        if words:
+            lines.append(" ".join(words))
+
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+        return "\n".join(lines), avg_confidence
+
+    @staticmethod
+    def _pdf_options() -> dict:
+        """pdf2image-Optionen: direkt in Graustufen rastern (poppler, mehrere Prozesse)"""
+        return {
+            "dpi": settings.TESSERACT_PDF_DPI,
+            "grayscale": True,
+            "thread_count": os.cpu_count() or 1,
+        }
 
     def _convert_to_images(self, path: Path) -> list:
-        """Konvertiere Dokument zu Bildern"""
+        """Lade ein Bilddokument (PDFs: _process_pdf)"""
         suffix = path.suffix.lower()
 
-        if suffix == '.pdf':
-            return pdf2image.convert_from_path(str(path), dpi=300)
-        elif suffix in ['.png', '.jpg', '.jpeg']:
+        if suffix in ['.png', '.jpg', '.jpeg']:
             return [Image.open(path)]
         else:
             raise ValueError(f"Nicht unterstuetztes Dateiformat: {suffix}")
 
     def _preprocess_image(self, image: Image.Image) -> Image.Image:
-        """Einfache Bildvorverarbeitung - nur Graustufen"""
-        img_array = np.array(image)
-
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
-
-        return Image.fromarray(gray)
+        """Einfache Bildvorverarbeitung - nur Graustufen (PIL, eine Kopie)"""
+        if image.mode == 'L':
+            return image  # PDF-Seiten kommen bereits in Graustufen
+        return image.convert('L')
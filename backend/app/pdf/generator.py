@@ -2,24 +2,37 @@
 PDF-Generator für Nebenkostenabrechnungen
 """
 
+import hashlib
 import io
+import os
+import tempfile
+import time
 from datetime import date
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 from pathlib import Path
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional, List
 from uuid import UUID
 
+import weasyprint
 from weasyprint import HTML, CSS
-from jinja2 import Environment, FileSystemLoader
-from sqlalchemy.orm import Session
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, undefer
 from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, NameObject, TextStringObject
 import img2pdf
 
+try:
+    import pikepdf
+except ImportError:  # optional, pypdf als Fallback
+    pikepdf = None
+
 from app.models.settlement import Settlement
-from app.models.settlement_result import SettlementResult, SettlementCostBreakdown
+from app.models.settlement_result import SettlementResult
 from app.models.document import Document
 from app.models.invoice import Invoice
-from app.models.settings import Settings
+from app.services.settings_store import get_values
 from app.models.enums import COST_CATEGORY_LABELS
 from app.config import settings
 from app.services.signing_service import (
@@ -27,43 +40,134 @@ from app.services.signing_service import (
     create_signing_service,
     get_signature_image_base64,
     get_signature_type,
+    load_signature_settings,
+)
+
+
+# Decimal-Konstanten einmal anlegen statt pro Rechnung/Abrechnung zu parsen
+_DAYS_PER_MONTH = Decimal("30.44")
+_FULL_ALLOCATION = Decimal(1)
+# Umgelegte Beträge auf Cent runden (wie gedruckt, damit die Summe stimmt)
+_CENT = Decimal("0.01")
+
+# Tausender-/Dezimaltrennzeichen tauschen: 1,234.56 -> 1.234,56 (ein Durchlauf)
+_DE_NUMBER_TABLE = str.maketrans(",.", ".,")
+
+# Maximale Threads für die Konvertierung von Anhängen pro PDF
+ATTACHMENT_WORKERS = 8
+
+# Bild-Anhänge auf A4 einpassen (210mm x 297mm)
+_A4_LAYOUT = img2pdf.get_layout_fun(
+    pagesize=(img2pdf.mm_to_pt(210), img2pdf.mm_to_pt(297)),
+    fit=img2pdf.FitMode.into,
+)
+# JPEG-Qualität für Bilder, die img2pdf nicht direkt einbetten kann
+JPEG_FALLBACK_QUALITY = 85
+
+# Zu PDF konvertierte Bild-Anhänge (Schlüssel: Pfad, Größe, mtime, MIME-Typ)
+ATTACHMENT_CACHE_DIR = Path(settings.UPLOAD_DIR) / "cache" / "attachments"
+# Von WeasyPrint gerenderte Berichte (Schlüssel: Hash des HTML)
+REPORT_CACHE_DIR = Path(settings.UPLOAD_DIR) / "cache" / "reports"
+# Das HTML enthält das Erstellungsdatum: ältere Einträge treffen nie wieder
+REPORT_CACHE_MAX_AGE_SECONDS = 2 * 24 * 60 * 60
+# Obergrenze für Einträge desselben Tages (älteste zuerst gelöscht)
+REPORT_CACHE_MAX_FILES = 200
+
+# Jinja2-Umgebung einmal pro Prozess: Templates werden nicht erneut geprüft
+# (auto_reload=False), kompilierter Bytecode liegt im Temp-Verzeichnis
+_ENV = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "templates"),
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache(),
 )
 
 
-def get_setting(db: Session, key: str, default: str = "") -> str:
-    """Hole einen Einstellungswert aus der DB"""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    return setting.value if setting else default
+LANDLORD_SETTINGS = {
+    "name": "company_name",
+    "street": "company_street",
+    "postal_code": "company_postal_code",
+    "city": "company_city",
+}
+
+
+def get_landlord(db: Session) -> dict:
+    """Vermieter-Daten aus den Einstellungen (eine Abfrage für alle Felder)"""
+    values = get_values(db, list(LANDLORD_SETTINGS.values()))
+    return {
+        field: values.get(key) or "" for field, key in LANDLORD_SETTINGS.items()
+    }
+
+
+def get_invoice_rows(db: Session, settlement_id: UUID) -> List[dict]:
+    """Rechnungsübersicht als reine Spaltenabfrage (ohne ORM-Objekte)"""
+    rows = db.execute(
+        select(
+            Invoice.vendor_name,
+            Invoice.invoice_number,
+            Invoice.invoice_date,
+            Invoice.cost_category,
+            Invoice.total_amount,
+            Invoice.allocation_percentage,
+            Invoice.document_id,
+        )
+        .where(Invoice.settlement_id == settlement_id)
+        .order_by(Invoice.cost_category, Invoice.invoice_date)
+    ).all()
+
+    invoices_data = []
+    for row in rows:
+        allocation = row.allocation_percentage or _FULL_ALLOCATION
+        invoices_data.append(
+            {
+                "vendor_name": row.vendor_name,
+                "invoice_number": row.invoice_number,
+                "invoice_date": row.invoice_date,
+                "cost_category": row.cost_category,
+                "total_amount": row.total_amount,
+                "allocation_percentage": allocation,
+                "allocated_amount": (row.total_amount * allocation).quantize(
+                    _CENT, rounding=ROUND_HALF_UP
+                ),
+                "document_id": str(row.document_id) if row.document_id else None,
+            }
+        )
+    return invoices_data
 
 
 class PDFGenerator:
     """Generator für Nebenkostenabrechnung PDFs"""
 
     def __init__(self):
-        template_dir = Path(__file__).parent / "templates"
-        self.env = Environment(loader=FileSystemLoader(template_dir))
-
-        # Deutsche Formatierung registrieren
-        self.env.filters["euro"] = self._format_euro
-        self.env.filters["german_date"] = self._format_german_date
-        self.env.filters["percentage"] = self._format_percentage
-        self.env.filters["area"] = self._format_area
-        self.env.filters["round_up_even"] = self._round_up_even
+        self.env = _ENV
 
         # Legacy Signing Service (wird durch DB-basierte Konfiguration ersetzt)
         self.legacy_signing_service = create_signing_service(
             settings.SIGNING_CERT_PATH, settings.SIGNING_CERT_PASSWORD
         )
 
-    def generate_settlement_pdf(self, settlement_id: UUID, db: Session) -> bytes:
-        """Generiere PDF für eine Abrechnung"""
-        settlement = db.query(Settlement).filter(Settlement.id == settlement_id).first()
+    def generate_settlement_pdf(
+        self, settlement_id: UUID, db: Session, output: Optional[BinaryIO] = None
+    ) -> Optional[bytes]:
+        """Generiere PDF für eine Abrechnung (mit output: dorthin schreiben, None zurück)"""
+        settlement = (
+            db.query(Settlement)
+            .options(joinedload(Settlement.property_ref, innerjoin=True))
+            .filter(Settlement.id == settlement_id)
+            .first()
+        )
 
         if not settlement:
             raise ValueError(f"Abrechnung nicht gefunden: {settlement_id}")
 
+        # Einheit/Mieter per INNER JOIN (FKs sind NOT NULL; Aufschlüsselung steckt
+        # in calculation_details)
         results = (
             db.query(SettlementResult)
+            .options(
+                joinedload(SettlementResult.unit, innerjoin=True),
+                joinedload(SettlementResult.tenant, innerjoin=True),
+                undefer(SettlementResult.calculation_details),
+            )
             .filter(SettlementResult.settlement_id == settlement_id)
             .all()
         )
@@ -74,22 +178,16 @@ class PDFGenerator:
             )
 
         total_days = (settlement.period_end - settlement.period_start).days + 1
-        period_months = total_days / Decimal("30.44")
+        period_months = total_days / _DAYS_PER_MONTH
 
         # Template laden
-        template = self.env.get_template("settlement.html")
+        template = _SETTLEMENT_TEMPLATE
 
         # Daten für Template aufbereiten
         property_obj = settlement.property_ref
         results_data = []
 
         for result in results:
-            breakdowns = (
-                db.query(SettlementCostBreakdown)
-                .filter(SettlementCostBreakdown.settlement_result_id == result.id)
-                .all()
-            )
-
             results_data.append(
                 {
                     "unit": result.unit,
@@ -98,36 +196,12 @@ class PDFGenerator:
                     "total_prepayments": result.total_prepayments,
                     "balance": result.balance,
                     "occupancy_days": result.occupancy_days,
-                    "breakdowns": breakdowns,
+                    "breakdowns": result.cost_breakdowns,
                 }
             )
 
         # Rechnungen für Übersicht laden
-        invoices = (
-            db.query(Invoice)
-            .filter(Invoice.settlement_id == settlement_id)
-            .order_by(Invoice.cost_category, Invoice.invoice_date)
-            .all()
-        )
-
-        # Rechnungsdaten aufbereiten
-        invoices_data = []
-        for inv in invoices:
-            allocation = (
-                float(inv.allocation_percentage) if inv.allocation_percentage else 1.0
-            )
-            invoices_data.append(
-                {
-                    "vendor_name": inv.vendor_name,
-                    "invoice_number": inv.invoice_number,
-                    "invoice_date": inv.invoice_date,
-                    "cost_category": inv.cost_category,
-                    "total_amount": inv.total_amount,
-                    "allocation_percentage": allocation,
-                    "allocated_amount": inv.total_amount * Decimal(str(allocation)),
-                    "document_id": str(inv.document_id) if inv.document_id else None,
-                }
-            )
+        invoices_data = get_invoice_rows(db, settlement_id)
 
         # Anhänge laden (für Platzhalter im HTML)
         attachments = (
@@ -141,21 +215,17 @@ class PDFGenerator:
         )
 
         # Vermieter-Daten aus Einstellungen laden
-        landlord = {
-            "name": get_setting(db, "company_name"),
-            "street": get_setting(db, "company_street"),
-            "postal_code": get_setting(db, "company_postal_code"),
-            "city": get_setting(db, "company_city"),
-        }
-
-        # Signatur-Daten für Template
-        sig_type = get_signature_type(db)
+        landlord = get_landlord(db)
+
+        # Signatur-Daten für Template (alle Signatur-Einstellungen in einer Abfrage)
+        sig_settings = load_signature_settings(db)
+        sig_type = get_signature_type(db, sig_settings)
         signature_image = None
         signature_area = False
 
         # Visuelle Signaturen (PAD, IMAGE, TEXT) werden direkt im HTML eingebettet
         if sig_type in ["PAD", "IMAGE", "TEXT"]:
-            signature_image = get_signature_image_base64(db)
+            signature_image = get_signature_image_base64(db, sig_settings)
             signature_area = signature_image is not None
         # Bei CERTIFICATE wird der Signaturbereich auch angezeigt (ohne Bild)
         elif sig_type == "CERTIFICATE":
@@ -176,17 +246,8 @@ class PDFGenerator:
             period_months=period_months,
         )
 
-        # CSS laden
-        css_path = Path(__file__).parent / "templates" / "styles.css"
-        css = CSS(filename=str(css_path)) if css_path.exists() else None
-
-        # PDF generieren
-        html = HTML(string=html_content)
-
-        if css:
-            main_pdf_bytes = html.write_pdf(stylesheets=[css])
-        else:
-            main_pdf_bytes = html.write_pdf()
+        # PDF generieren (bei unverändertem HTML aus dem Cache)
+        main_pdf_bytes = self._render_html(html_content)
 
         if attachments:
             pdf_bytes = self._merge_pdfs_with_attachments(main_pdf_bytes, attachments)
@@ -195,38 +256,115 @@ class PDFGenerator:
 
         # Kryptographische Signatur (nur bei CERTIFICATE-Typ)
         # Visuelle Signaturen sind bereits im HTML eingebettet
+        signing_service = None
         if sig_type == "CERTIFICATE":
-            signing_service = create_signature_service(db)
-
-            if signing_service is None:
-                # Fallback auf Legacy-Konfiguration (Umgebungsvariablen)
-                signing_service = self.legacy_signing_service
-
-            if signing_service:
-                period_label = f"{settlement.period_start.strftime('%d.%m.%Y')} - {settlement.period_end.strftime('%d.%m.%Y')}"
-                pdf_bytes = signing_service.apply_signature(
-                    pdf_bytes, reason=f"Nebenkostenabrechnung {period_label}"
-                )
-        elif sig_type == "NONE" and self.legacy_signing_service:
-            # Legacy-Fallback für Umgebungsvariablen-Konfiguration
-            period_label = f"{settlement.period_start.strftime('%d.%m.%Y')} - {settlement.period_end.strftime('%d.%m.%Y')}"
-            pdf_bytes = self.legacy_signing_service.apply_signature(
-                pdf_bytes, reason=f"Nebenkostenabrechnung {period_label}"
+            # Fallback auf Legacy-Konfiguration (Umgebungsvariablen)
+            signing_service = (
+                create_signature_service(db, sig_settings) or self.legacy_signing_service
             )
+        elif sig_type == "NONE":
+            # Legacy-Fallback für Umgebungsvariablen-Konfiguration
+            signing_service = self.legacy_signing_service
+
+        period_label = f"{settlement.period_start.strftime('%d.%m.%Y')} - {settlement.period_end.strftime('%d.%m.%Y')}"
+        return self._sign_and_write(
+            pdf_bytes, signing_service, f"Nebenkostenabrechnung {period_label}", output
+        )
 
+    def _render_html(self, html_content: str) -> bytes:
+        """Rendere HTML per WeasyPrint; Ergebnis auf Platte nach HTML-Hash cachen"""
+        key = hashlib.blake2b(
+            html_content.encode(), digest_size=16, key=_RENDER_VERSION
+        ).hexdigest()
+        cache_path = REPORT_CACHE_DIR / f"{key}.pdf"
+        if cache_path.exists():
+            return cache_path.read_bytes()
+
+        # Stylesheet ist vorab geparst
+        pdf_bytes = HTML(string=html_content).write_pdf(stylesheets=_STYLESHEETS)
+        self._write_cache(cache_path, pdf_bytes)
+        self._prune_cache(REPORT_CACHE_DIR, REPORT_CACHE_MAX_AGE_SECONDS, REPORT_CACHE_MAX_FILES)
         return pdf_bytes
 
     def _merge_pdfs_with_attachments(
         self, main_pdf_bytes: bytes, attachments: List[Document]
     ) -> bytes:
         """Füge Anhänge zum Haupt-PDF hinzu mit internen Links"""
+        # Anhänge parallel konvertieren, in Originalreihenfolge hinzufügen
+        converted = self._convert_attachments(attachments)
+
+        if pikepdf is not None:
+            try:
+                return self._merge_with_pikepdf(main_pdf_bytes, attachments, converted)
+            except Exception as e:
+                print(f"Fehler beim Zusammenführen mit pikepdf, nutze pypdf: {e}")
+
+        return self._merge_with_pypdf(main_pdf_bytes, attachments, converted)
+
+    @staticmethod
+    def _merge_with_pikepdf(
+        main_pdf_bytes: bytes,
+        attachments: List[Document],
+        converted: List[Optional[bytes]],
+    ) -> bytes:
+        """Zusammenführen per pikepdf (libqpdf, deutlich schneller als pypdf)"""
+        # Haupt-PDF direkt weiterverwenden statt seine Seiten in ein neues PDF
+        # zu kopieren; Quell-PDFs müssen bis zum Speichern geöffnet bleiben
+        output_pdf = pikepdf.Pdf.open(io.BytesIO(main_pdf_bytes))
+        sources = [output_pdf]
+        try:
+            # Letzte Seite (Platzhalter) entfernen, ebenso die Lesezeichen, die
+            # auf sie zeigen können (wie beim pypdf-Pfad, der keine übernimmt)
+            del output_pdf.pages[-1]
+            if "/Outlines" in output_pdf.Root:
+                del output_pdf.Root.Outlines
+
+            # Mapping: Named Destination -> Seitenzahl
+            doc_page_mapping = {}
+            for doc, attachment_pdf in zip(attachments, converted):
+                if not attachment_pdf:
+                    continue
+                try:
+                    source = pikepdf.Pdf.open(io.BytesIO(attachment_pdf))
+                except Exception as e:
+                    print(f"Fehler beim Hinzufügen von Anhang {doc.original_filename}: {e}")
+                    continue
+                sources.append(source)
+                doc_page_mapping[f"doc-{doc.id}"] = len(output_pdf.pages)
+                output_pdf.pages.extend(source.pages)
+
+            # Named Destinations für die Links im Haupt-PDF
+            dests = pikepdf.NameTree.new(output_pdf)
+            for name, page_index in doc_page_mapping.items():
+                dests[name] = pikepdf.Array(
+                    [output_pdf.pages[page_index].obj, pikepdf.Name.Fit]
+                )
+            # Ersetzt auch die Platzhalter-Destinations des Haupt-PDFs
+            output_pdf.Root.Names = pikepdf.Dictionary(Dests=dests.obj)
+
+            output = io.BytesIO()
+            output_pdf.save(output)
+            return output.getvalue()
+        finally:
+            for source in sources:
+                source.close()
+
+    @staticmethod
+    def _merge_with_pypdf(
+        main_pdf_bytes: bytes,
+        attachments: List[Document],
+        converted: List[Optional[bytes]],
+    ) -> bytes:
+        """Zusammenführen per pypdf (Fallback ohne pikepdf)"""
         writer = PdfWriter()
 
         # Haupt-PDF hinzufügen (letzte Seite ist Platzhalter, wird übersprungen)
         main_reader = PdfReader(io.BytesIO(main_pdf_bytes))
         main_page_count = len(main_reader.pages)
 
-        # Alle Seiten außer der letzten (Platzhalter-Seite) hinzufügen
+        # Alle Seiten außer der letzten (Platzhalter-Seite) hinzufügen.
+        # Bewusst add_page statt append: append verwirft Links auf Named
+        # Destinations, die es im Writer noch nicht gibt (doc-* kommen erst später)
         for i in range(main_page_count - 1):
             writer.add_page(main_reader.pages[i])
 
@@ -236,37 +374,58 @@ class PDFGenerator:
         # Mapping: doc.id -> Seitenzahl (für Named Destinations)
         doc_page_mapping = {}
 
-        # Anhänge hinzufügen
-        for doc in attachments:
+        for doc, attachment_pdf in zip(attachments, converted):
             try:
-                attachment_pdf = self._document_to_pdf(doc)
                 if attachment_pdf:
                     attachment_reader = PdfReader(io.BytesIO(attachment_pdf))
+                    page_count = len(attachment_reader.pages)
+
+                    # Seiten in einem Schritt übernehmen (ohne Lesezeichen)
+                    writer.append(attachment_reader, import_outline=False)
 
                     # Merken, wo dieses Dokument startet
                     doc_page_mapping[str(doc.id)] = current_page
-
-                    # Seiten hinzufügen
-                    for page in attachment_reader.pages:
-                        writer.add_page(page)
-
-                    current_page += len(attachment_reader.pages)
+                    current_page += page_count
             except Exception as e:
                 print(f"Fehler beim Hinzufügen von Anhang {doc.original_filename}: {e}")
                 continue
 
-        # Named Destinations aktualisieren (überschreiben die Platzhalter-Destinations)
+        # Named Destinations in einem Schritt schreiben: vorhandene Einträge und
+        # doc-* zusammenführen, einmal sortieren (statt einzeln einzufügen)
+        dest_root = writer.get_named_dest_root()
+        entries = dict(zip(dest_root[::2], dest_root[1::2]))
         for doc_id, page_index in doc_page_mapping.items():
-            try:
-                writer.add_named_destination(f"doc-{doc_id}", page_index)
-            except Exception as e:
-                print(f"Fehler beim Erstellen von Named Destination doc-{doc_id}: {e}")
+            entries[TextStringObject(f"doc-{doc_id}")] = ArrayObject(
+                [writer.pages[page_index].indirect_reference, NameObject("/Fit")]
+            )
+        dest_root.clear()
+        for name in sorted(entries):
+            dest_root.extend([name, entries[name]])
 
         # Zusammengeführtes PDF ausgeben
         output = io.BytesIO()
         writer.write(output)
         return output.getvalue()
 
+    def _convert_attachments(
+        self, attachments: List[Document]
+    ) -> List[Optional[bytes]]:
+        """Konvertiere alle Anhänge parallel (Datei-I/O, img2pdf)"""
+
+        def convert(doc: Document) -> Optional[bytes]:
+            try:
+                return self._document_to_pdf(doc)
+            except Exception as e:
+                print(f"Fehler beim Konvertieren von Anhang {doc.original_filename}: {e}")
+                return None
+
+        if len(attachments) == 1:
+            return [convert(attachments[0])]
+
+        workers = min(ATTACHMENT_WORKERS, len(attachments))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(convert, attachments))
+
     def _document_to_pdf(self, doc: Document) -> Optional[bytes]:
         """Konvertiere Dokument zu PDF (falls nötig)"""
         file_path = Path(doc.file_path)
@@ -280,33 +439,109 @@ class PDFGenerator:
         if mime_type == "application/pdf":
             return file_path.read_bytes()
 
-        # Bild zu PDF konvertieren
+        # Bild zu PDF konvertieren (Ergebnis wird auf Platte zwischengespeichert)
         if mime_type.startswith("image/"):
+            stat = file_path.stat()
+            key = hashlib.blake2b(
+                f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}:{mime_type}".encode(),
+                digest_size=16,
+            ).hexdigest()
+            cache_path = ATTACHMENT_CACHE_DIR / f"{key}.pdf"
+            if cache_path.exists():
+                return cache_path.read_bytes()
+
             try:
-                # A4 Größe: 210mm x 297mm, mit Rand
-                a4_width = img2pdf.mm_to_pt(210)
-                a4_height = img2pdf.mm_to_pt(297)
-                layout = img2pdf.get_layout_fun(
-                    pagesize=(a4_width, a4_height),
-                    fit=img2pdf.FitMode.into,  # Bild in Seite einpassen
-                )
-                with open(file_path, "rb") as img_file:
-                    return img2pdf.convert(img_file, layout_fun=layout)
+                try:
+                    # JPEG/PNG/TIFF bettet img2pdf ohne Neukodierung ein
+                    pdf_bytes = img2pdf.convert(str(file_path), layout_fun=_A4_LAYOUT)
+                except (img2pdf.AlphaChannelError, img2pdf.ImageOpenError):
+                    # Transparenz oder von img2pdf nicht unterstütztes Format (z.B. WebP)
+                    pdf_bytes = img2pdf.convert(
+                        self._to_jpeg(file_path), layout_fun=_A4_LAYOUT
+                    )
             except Exception as e:
                 print(f"Fehler bei Bildkonvertierung: {e}")
                 return None
 
+            self._write_cache(cache_path, pdf_bytes)
+            return pdf_bytes
+
         return None
 
+    @staticmethod
+    def _to_jpeg(file_path: Path) -> bytes:
+        """Bild per Pillow nach RGB-JPEG umwandeln (Fallback für img2pdf)"""
+        from PIL import Image
+
+        with Image.open(file_path) as img:
+            if img.mode in ("RGBA", "LA", "P"):
+                # Transparenz auf weißen Hintergrund legen
+                rgba = img.convert("RGBA")
+                rgb = Image.new("RGB", rgba.size, "white")
+                rgb.paste(rgba, mask=rgba.getchannel("A"))
+            else:
+                rgb = img.convert("RGB")
+        output = io.BytesIO()
+        rgb.save(output, format="JPEG", quality=JPEG_FALLBACK_QUALITY)
+        return output.getvalue()
+
+    @staticmethod
+    def _write_cache(cache_path: Path, data: bytes) -> None:
+        """Schreibe Cache-Datei atomar (temporäre Datei + os.replace)"""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(data)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            # Cache ist optional, PDF wird trotzdem erzeugt
+            print(f"Fehler beim Schreiben der Cache-Datei {cache_path.name}: {e}")
+
+    @staticmethod
+    def _prune_cache(cache_dir: Path, max_age_seconds: int, max_files: int) -> None:
+        """Cache-Dateien älter als max_age_seconds löschen, danach auf max_files begrenzen"""
+        now = time.time()
+        entries = []
+        expired = []
+        try:
+            for entry in os.scandir(cache_dir):
+                if not entry.name.endswith(".pdf"):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if now - mtime > max_age_seconds:
+                    expired.append(entry.path)
+                else:
+                    entries.append((mtime, entry.path))
+        except OSError as e:
+            print(f"Fehler beim Aufräumen des Caches {cache_dir}: {e}")
+            return
+
+        entries.sort()
+        expired.extend(path for _, path in entries[:max(len(entries) - max_files, 0)])
+        for path in expired:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # Paralleler Worker hat die Datei bereits gelöscht
+                pass
+            except OSError as e:
+                print(f"Fehler beim Löschen der Cache-Datei {path}: {e}")
+
     @staticmethod
     def _format_euro(value: Decimal) -> str:
         """Formatiere als Euro-Betrag"""
         if value is None:
             return "0,00 EUR"
-        # Deutsches Format: 1.234,56 EUR
-        formatted = (
-            f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        )
+        # Deutsches Format: 1.234,56 EUR (Decimal, float würde z.B. 2,675 abrunden)
+        formatted = f"{value:,.2f}".translate(_DE_NUMBER_TABLE)
         return f"{formatted} EUR"
 
     @staticmethod
@@ -321,7 +556,7 @@ class PDFGenerator:
         """Formatiere als Prozent"""
         if value is None:
             return "0,00 %"
-        percent = value * 100
+        percent = float(value) * 100
         return f"{percent:.2f} %".replace(".", ",")
 
     @staticmethod
@@ -329,9 +564,7 @@ class PDFGenerator:
         """Formatiere als Flächenangabe"""
         if value is None:
             return "0,00 m²"
-        formatted = (
-            f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        )
+        formatted = f"{float(value):,.2f}".translate(_DE_NUMBER_TABLE)
         return f"{formatted} m²"
 
     @staticmethod
@@ -349,12 +582,20 @@ class PDFGenerator:
         return rounded
 
     def generate_unit_settlement_pdf(
-        self, unit_settlement_id: UUID, db: Session
-    ) -> bytes:
-        """Generiere PDF für eine einzelne Wohneinheit/Mieter"""
-        # SettlementResult laden
+        self, unit_settlement_id: UUID, db: Session, output: Optional[BinaryIO] = None
+    ) -> Optional[bytes]:
+        """Generiere PDF für eine einzelne Wohneinheit/Mieter (mit output: dorthin schreiben)"""
+        # SettlementResult mit Einheit, Mieter, Abrechnung und Objekt in einer Abfrage
         result = (
             db.query(SettlementResult)
+            .options(
+                joinedload(SettlementResult.unit, innerjoin=True),
+                joinedload(SettlementResult.tenant, innerjoin=True),
+                joinedload(SettlementResult.settlement, innerjoin=True).joinedload(
+                    Settlement.property_ref, innerjoin=True
+                ),
+                undefer(SettlementResult.calculation_details),
+            )
             .filter(SettlementResult.id == unit_settlement_id)
             .first()
         )
@@ -362,25 +603,16 @@ class PDFGenerator:
         if not result:
             raise ValueError(f"Einzelabrechnung nicht gefunden: {unit_settlement_id}")
 
-        settlement = (
-            db.query(Settlement).filter(Settlement.id == result.settlement_id).first()
-        )
+        settlement = result.settlement
 
         if not settlement:
             raise ValueError("Abrechnung nicht gefunden")
 
         total_days = (settlement.period_end - settlement.period_start).days + 1
-        period_months = total_days / Decimal("30.44")
-
-        # Breakdowns laden
-        breakdowns = (
-            db.query(SettlementCostBreakdown)
-            .filter(SettlementCostBreakdown.settlement_result_id == result.id)
-            .all()
-        )
+        period_months = total_days / _DAYS_PER_MONTH
 
         # Template laden
-        template = self.env.get_template("settlement.html")
+        template = _SETTLEMENT_TEMPLATE
 
         # Daten für Template aufbereiten (nur diese eine Unit)
         property_obj = settlement.property_ref
@@ -392,36 +624,12 @@ class PDFGenerator:
                 "total_prepayments": result.total_prepayments,
                 "balance": result.balance,
                 "occupancy_days": result.occupancy_days,
-                "breakdowns": breakdowns,
+                "breakdowns": result.cost_breakdowns,
             }
         ]
 
-        # Rechnungen für Übersicht laden (nur anteilig für diese Unit)
-        invoices = (
-            db.query(Invoice)
-            .filter(Invoice.settlement_id == result.settlement_id)
-            .order_by(Invoice.cost_category, Invoice.invoice_date)
-            .all()
-        )
-
-        # Rechnungsdaten aufbereiten
-        invoices_data = []
-        for inv in invoices:
-            allocation = (
-                float(inv.allocation_percentage) if inv.allocation_percentage else 1.0
-            )
-            invoices_data.append(
-                {
-                    "vendor_name": inv.vendor_name,
-                    "invoice_number": inv.invoice_number,
-                    "invoice_date": inv.invoice_date,
-                    "cost_category": inv.cost_category,
-                    "total_amount": inv.total_amount,
-                    "allocation_percentage": allocation,
-                    "allocated_amount": inv.total_amount * Decimal(str(allocation)),
-                    "document_id": str(inv.document_id) if inv.document_id else None,
-                }
-            )
+        # Rechnungen für Übersicht laden
+        invoices_data = get_invoice_rows(db, result.settlement_id)
 
         # Anhänge laden:
         # 1. Unit-spezifische Dokumente (settlement_result_id = diese Unit)
@@ -451,20 +659,16 @@ class PDFGenerator:
         attachments = list(settlement_attachments) + list(unit_attachments)
 
         # Vermieter-Daten aus Einstellungen laden
-        landlord = {
-            "name": get_setting(db, "company_name"),
-            "street": get_setting(db, "company_street"),
-            "postal_code": get_setting(db, "company_postal_code"),
-            "city": get_setting(db, "company_city"),
-        }
-
-        # Signatur-Daten für Template
-        sig_type = get_signature_type(db)
+        landlord = get_landlord(db)
+
+        # Signatur-Daten für Template (alle Signatur-Einstellungen in einer Abfrage)
+        sig_settings = load_signature_settings(db)
+        sig_type = get_signature_type(db, sig_settings)
         signature_image = None
         signature_area = False
 
         if sig_type in ["PAD", "IMAGE", "TEXT"]:
-            signature_image = get_signature_image_base64(db)
+            signature_image = get_signature_image_base64(db, sig_settings)
             signature_area = signature_image is not None
         elif sig_type == "CERTIFICATE":
             signature_area = True
@@ -481,22 +685,13 @@ class PDFGenerator:
             landlord=landlord,
             signature_area=signature_area,
             signature_image=signature_image,
-            period_months=float(period_months),
+            period_months=period_months,
             is_single_unit=True,
             unit_notes=result.notes,
         )
 
-        # CSS laden
-        css_path = Path(__file__).parent / "templates" / "styles.css"
-        css = CSS(filename=str(css_path)) if css_path.exists() else None
-
-        # PDF generieren
-        html = HTML(string=html_content)
-
-        if css:
-            main_pdf_bytes = html.write_pdf(stylesheets=[css])
-        else:
-            main_pdf_bytes = html.write_pdf()
+        # PDF generieren (bei unverändertem HTML aus dem Cache)
+        main_pdf_bytes = self._render_html(html_content)
 
         if attachments:
             pdf_bytes = self._merge_pdfs_with_attachments(main_pdf_bytes, attachments)
@@ -504,22 +699,57 @@ class PDFGenerator:
             pdf_bytes = main_pdf_bytes
 
         # Kryptographische Signatur
+        period_label = f"{settlement.period_start.strftime('%d.%m.%Y')} - {settlement.period_end.strftime('%d.%m.%Y')}"
+        signing_service = None
+        reason = f"Nebenkostenabrechnung {period_label}"
         if sig_type == "CERTIFICATE":
-            signing_service = create_signature_service(db)
-            if signing_service is None:
-                signing_service = self.legacy_signing_service
-
-            if signing_service:
-                period_label = f"{settlement.period_start.strftime('%d.%m.%Y')} - {settlement.period_end.strftime('%d.%m.%Y')}"
-                unit_label = result.unit.designation
-                pdf_bytes = signing_service.apply_signature(
-                    pdf_bytes,
-                    reason=f"Nebenkostenabrechnung {period_label} - {unit_label}",
-                )
-        elif sig_type == "NONE" and self.legacy_signing_service:
-            period_label = f"{settlement.period_start.strftime('%d.%m.%Y')} - {settlement.period_end.strftime('%d.%m.%Y')}"
-            pdf_bytes = self.legacy_signing_service.apply_signature(
-                pdf_bytes, reason=f"Nebenkostenabrechnung {period_label}"
+            signing_service = (
+                create_signature_service(db, sig_settings) or self.legacy_signing_service
             )
+            reason = f"{reason} - {result.unit.designation}"
+        elif sig_type == "NONE":
+            signing_service = self.legacy_signing_service
+
+        return self._sign_and_write(pdf_bytes, signing_service, reason, output)
 
+    @staticmethod
+    def _sign_and_write(
+        pdf_bytes: bytes,
+        signing_service,
+        reason: str,
+        output: Optional[BinaryIO],
+    ) -> Optional[bytes]:
+        """
+        PDF signieren (falls ein Service konfiguriert ist).
+
+        Mit output wird das Ergebnis direkt dorthin geschrieben und None
+        zurückgegeben - ohne zusätzliche Kopie des signierten PDFs im Speicher.
+        """
+        if signing_service is not None:
+            return signing_service.apply_signature(pdf_bytes, reason=reason, output=output)
+        if output is not None:
+            output.write(pdf_bytes)
+            return None
         return pdf_bytes
+
+
+# Deutsche Formatierung registrieren (vor dem Kompilieren der Templates)
+_ENV.filters["euro"] = PDFGenerator._format_euro
+_ENV.filters["german_date"] = PDFGenerator._format_german_date
+_ENV.filters["percentage"] = PDFGenerator._format_percentage
+_ENV.filters["area"] = PDFGenerator._format_area
+_ENV.filters["round_up_even"] = PDFGenerator._round_up_even
+
+_SETTLEMENT_TEMPLATE = _ENV.get_template("settlement.html")
+
+# styles.css einmal pro Prozess parsen und für alle PDFs wiederverwenden
+_CSS_PATH = Path(__file__).parent / "templates" / "styles.css"
+_STYLESHEETS = [CSS(filename=str(_CSS_PATH))] if _CSS_PATH.exists() else None
+
+# Fließt in den Cache-Schlüssel des Berichts ein: neues Stylesheet oder neue
+# WeasyPrint-Version ergibt neue Einträge
+_RENDER_VERSION = hashlib.blake2b(
+    (_CSS_PATH.read_bytes() if _CSS_PATH.exists() else b"")
+    + weasyprint.__version__.encode(),
+    digest_size=16,
+).digest()
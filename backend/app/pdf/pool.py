@@ -0,0 +1,159 @@
+"""
+Prozess-Pool für die PDF-Generierung
+
+WeasyPrint-Rendering ist CPU-lastig und hält den GIL. Jeder Worker-Prozess
+erzeugt einmalig einen PDFGenerator (Templates, Filter, Legacy-Signing) und
+öffnet pro Auftrag eine eigene DB-Session.
+
+Das fertige PDF geht nicht als Bytes durch die Prozess-Pipe: der Worker
+schreibt es in eine temporäre Datei, die Antwort streamt diese Datei und
+löscht sie danach.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Optional
+from uuid import UUID
+
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+
+from app.config import settings
+
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+
+# Generator-Instanz im Worker-Prozess (wird von _init_worker gesetzt)
+_generator = None
+
+
+def _init_worker() -> None:
+    """Initialisiere Worker-Prozess: Generator einmalig anlegen"""
+    global _generator
+    from app.db.session import engine
+    from app.pdf.generator import PDFGenerator
+
+    # Vom Elternprozess geerbte DB-Verbindungen nicht weiterverwenden
+    engine.dispose(close=False)
+    _generator = PDFGenerator()
+
+
+def _render_to_temp_pdf(render: Callable[[BinaryIO], None]) -> str:
+    """
+    render(datei) schreibt das PDF direkt in eine temporäre Datei (Aufrufer löscht sie).
+    Das signierte PDF entsteht so nicht noch einmal als Bytes-Kopie im Worker.
+    """
+    fd, path = tempfile.mkstemp(prefix="export_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as pdf_file:
+            render(pdf_file)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def _render_settlement(settlement_id: UUID) -> str:
+    """Im Worker: PDF für eine Abrechnung generieren, Pfad zurückgeben"""
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return _render_to_temp_pdf(
+            lambda pdf_file: _generator.generate_settlement_pdf(settlement_id, db, output=pdf_file)
+        )
+    finally:
+        db.close()
+
+
+def _render_unit_settlement(unit_settlement_id: UUID) -> str:
+    """Im Worker: PDF für eine Einzelabrechnung generieren, Pfad zurückgeben"""
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return _render_to_temp_pdf(
+            lambda pdf_file: _generator.generate_unit_settlement_pdf(
+                unit_settlement_id, db, output=pdf_file
+            )
+        )
+    finally:
+        db.close()
+
+
+def _warmup() -> int:
+    """Im Worker: nichts tun (erzwingt Prozessstart und _init_worker)"""
+    return os.getpid()
+
+
+def _pool_size() -> int:
+    """Anzahl Worker: PDF_POOL_WORKERS, sonst CPU-Anzahl"""
+    return settings.PDF_POOL_WORKERS or os.cpu_count() or 1
+
+
+def start_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Lege den Prozess-Pool an (idempotent).
+
+    Worker starten per forkserver, nicht per fork: die API hat zu diesem
+    Zeitpunkt bereits Threads (Settings-Listener, OCR-Modell mit OpenMP),
+    ein fork würde deren Zustand und Speicher in jeden Worker kopieren.
+    """
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        _PDF_POOL = ProcessPoolExecutor(
+            max_workers=_pool_size(),
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+        )
+    return _PDF_POOL
+
+
+async def warm_pdf_pool() -> None:
+    """
+    Alle Worker starten und initialisieren (App-Lifespan).
+
+    ProcessPoolExecutor startet Worker erst beim submit; ein No-op pro Worker
+    verlagert Prozessstart und _init_worker vor den ersten Export.
+    """
+    pool = start_pdf_pool()
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(loop.run_in_executor(pool, _warmup) for _ in range(_pool_size()))
+    )
+
+
+def shutdown_pdf_pool() -> None:
+    """Beende den Prozess-Pool"""
+    global _PDF_POOL
+    if _PDF_POOL is not None:
+        _PDF_POOL.shutdown(wait=True, cancel_futures=True)
+        _PDF_POOL = None
+
+
+async def render_settlement_pdf(settlement_id: UUID) -> str:
+    """Abrechnungs-PDF im Prozess-Pool rendern (Pfad einer temporären Datei)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        start_pdf_pool(), _render_settlement, settlement_id
+    )
+
+
+async def render_unit_settlement_pdf(unit_settlement_id: UUID) -> str:
+    """Einzelabrechnungs-PDF im Prozess-Pool rendern (Pfad einer temporären Datei)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        start_pdf_pool(), _render_unit_settlement, unit_settlement_id
+    )
+
+
+def pdf_file_response(path: str, filename: str) -> FileResponse:
+    """Temporäre PDF-Datei ausliefern und danach löschen"""
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(os.unlink, path),
+    )
@@ -19,15 +19,19 @@ class DocumentResponse(BaseModel):
     file_size_mb: float
     mime_type: str
     document_status: DocumentStatus
+    llm_extraction_used: bool = False
+    include_in_export: bool = False
+    upload_date: datetime
+    processed_at: Optional[datetime] = None
+
+
+class DocumentDetailResponse(DocumentResponse):
+    """Einzelansicht inkl. OCR-Ergebnis (lädt document_ocr nach)"""
     ocr_raw_text: Optional[str] = None
     ocr_corrected_text: Optional[str] = None
     ocr_confidence: Optional[Decimal] = None
     ocr_engine: Optional[str] = None
-    llm_extraction_used: bool = False
     llm_extraction_error: Optional[str] = None
-    include_in_export: bool = False
-    upload_date: datetime
-    processed_at: Optional[datetime] = None
 
 
 class DocumentUpdate(BaseModel):
@@ -5,11 +5,11 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
-from app.models.enums import CostCategory
+from app.models.enums import CostCategory, EntryType
 
 
 class ManualEntryBase(BaseModel):
-    entry_type: str  # CREDIT, DEBIT, ADJUSTMENT
+    entry_type: EntryType
     description: str
     amount: Decimal
     cost_category: Optional[CostCategory] = None
@@ -22,7 +22,7 @@ class ManualEntryCreate(ManualEntryBase):
 
 
 class ManualEntryUpdate(BaseModel):
-    entry_type: Optional[str] = None
+    entry_type: Optional[EntryType] = None
     description: Optional[str] = None
     amount: Optional[Decimal] = None
     cost_category: Optional[CostCategory] = None
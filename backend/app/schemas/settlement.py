@@ -116,8 +116,28 @@ class UnitSettlementUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+class UnitSettlementListItem(BaseModel):
+    """Einzelabrechnung in der Listenansicht (ohne Aufschlüsselung/Dokumente)"""
+    id: UUID
+    settlement_id: UUID
+    unit_id: UUID
+    tenant_id: UUID
+
+    total_costs: Decimal
+    total_prepayments: Decimal
+    balance: Decimal
+    occupancy_days: int
+
+    unit_designation: str
+    tenant_name: str
+    tenant_last_name: str
+    document_count: int = 0
+
+    created_at: datetime
+
+
 class UnitSettlementListResponse(BaseModel):
     """Liste von Einzelabrechnungen"""
-    unit_settlements: List[UnitSettlementResponse]
+    unit_settlements: List[UnitSettlementListItem]
     total_costs: Decimal  # Summe aller Kosten
     total_balance: Decimal  # Summe aller Salden
@@ -3,24 +3,36 @@ Service für die Berechnung von Nebenkostenabrechnungen
 """
 
 from calendar import isleap
+from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    BigInteger, Row, column, func, or_, select, type_coerce, update, values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session, joinedload
 
+from app.db.bulk import bulk_insert_results
 from app.models.settlement import Settlement
-from app.models.property import Property
 from app.models.unit import Unit
 from app.models.tenant import Tenant
 from app.models.invoice import Invoice
 from app.models.manual_entry import ManualEntry
 from app.models.unit_allocation import UnitAllocation
-from app.models.settlement_result import SettlementResult, SettlementCostBreakdown
+from app.models.settlement_result import SettlementResult, CostBreakdown
 from app.models.enums import CostCategory, AllocationMethod, SettlementStatus
 
 
+# Rundung auf Cent
+CENT = Decimal("0.01")
+# Genauigkeit der Anteile in der Kostenaufschlüsselung (wie zuvor NUMERIC(5, 4))
+PERCENT_PRECISION = Decimal("0.0001")
+# Durchschnittliche Tage pro Monat (Vorauszahlungen)
+DAYS_PER_MONTH = Decimal("30.44")
+
+
 class CalculationService:
     """Service für Nebenkostenberechnungen"""
 
@@ -30,7 +42,12 @@ class CalculationService:
         """
         Berechne die Nebenkostenabrechnung für alle Wohneinheiten
         """
-        settlement = db.query(Settlement).filter(Settlement.id == settlement_id).first()
+        settlement = (
+            db.query(Settlement)
+            .options(joinedload(Settlement.property_ref, innerjoin=True))
+            .filter(Settlement.id == settlement_id)
+            .first()
+        )
         if not settlement:
             raise ValueError(f"Abrechnung nicht gefunden: {settlement_id}")
 
@@ -42,46 +59,97 @@ class CalculationService:
         if not units:
             raise ValueError("Keine Wohneinheiten in dieser Liegenschaft")
 
+        # Mieter im Abrechnungszeitraum: eine Abfrage mit Datumsfilter in SQL
+        # (statt der gesamten Mieterhistorie pro Einheit)
+        tenant_by_unit = self._get_tenants_for_period(
+            db, [unit.id for unit in units], settlement.period_start, settlement.period_end
+        )
+
         # Alle Rechnungen der Abrechnung summiert nach Kategorie
         original_costs, allocated_costs, invoice_allocations = (
             self._get_costs_by_category(settlement, db)
         )
 
+        # Individuelle Verteilerschlüssel aller Einheiten: (unit_id, Kategorie) -> AllocationInfo
+        # (einmal erzeugt, in der Kategorie-Schleife nur noch nachgeschlagen)
+        unit_allocations = {
+            (row.unit_id, row.cost_category): AllocationInfo(
+                percentage=row.allocation_percentage, method=row.allocation_method
+            )
+            for row in db.execute(
+                select(
+                    UnitAllocation.unit_id,
+                    UnitAllocation.cost_category,
+                    UnitAllocation.allocation_percentage,
+                    UnitAllocation.allocation_method,
+                ).where(UnitAllocation.unit_id.in_([unit.id for unit in units]))
+            )
+        }
+
         # Manuelle Buchungen
-        manual_entries = (
-            db.query(ManualEntry)
-            .filter(ManualEntry.settlement_id == settlement_id)
-            .all()
-        )
+        # Nur lesend benötigt: Spalten-Tupel statt ORM-Instanzen (kein Identity-Map-Eintrag)
+        manual_entries = db.execute(
+            select(ManualEntry.unit_id, ManualEntry.amount)
+            .where(ManualEntry.settlement_id == settlement_id)
+        ).all()
 
         # Vor dem Löschen: Dokument-Unit-Zuordnung speichern
         # (Dokumente mit settlement_result_id werden nach Neuberechnung wieder verknüpft)
         from app.models.document import Document
 
-        doc_unit_mapping: dict[UUID, UUID] = {}  # document_id -> unit_id
-        old_results = (
-            db.query(SettlementResult)
-            .filter(SettlementResult.settlement_id == settlement_id)
-            .all()
-        )
-        for old_result in old_results:
-            for doc in old_result.documents:
-                doc_unit_mapping[doc.id] = old_result.unit_id
-
-        # Alte Ergebnisse löschen (Dokumente bekommen settlement_result_id=NULL durch SET NULL FK)
+        # Eine Abfrage für alle Dokumente aller alten Ergebnisse (statt Lazy-Load von
+        # result.documents pro Ergebnis); Core-Select liefert nur Spalten-Tupel
+        mapping_rows = db.execute(
+            select(Document.id, SettlementResult.unit_id)
+            .join(SettlementResult, Document.settlement_result_id == SettlementResult.id)
+            .where(SettlementResult.settlement_id == settlement_id)
+        ).all()
+        doc_unit_mapping: dict[UUID, UUID] = dict(mapping_rows)  # document_id -> unit_id
+
+        # Alte Ergebnisse löschen (Dokumente bekommen settlement_result_id=NULL durch SET NULL FK).
+        # Ohne Session-Abgleich: geladene Alt-Ergebnisse verfallen spätestens beim Commit
         db.query(SettlementResult).filter(
             SettlementResult.settlement_id == settlement_id
-        ).delete()
+        ).delete(synchronize_session=False)
 
         results = []
         # Mapping: unit_id -> neues SettlementResult für spätere Dokument-Verknüpfung
         unit_to_result: dict[UUID, SettlementResult] = {}
 
+        total_days = (settlement.period_end - settlement.period_start).days + 1
+        total_days_dec = Decimal(total_days)
+
+        # Rechnungen beziehen sich auf ein volles Jahr.
+        # Bei kürzerem Abrechnungszeitraum Kosten anteilig berechnen.
+        year_days = 366 if isleap(settlement.period_start.year) else 365
+        period_fraction = (
+            total_days_dec / Decimal(year_days)
+            if total_days < year_days
+            else Decimal("1")
+        )
+
+        # Für alle Einheiten gleich: einmal vor der Schleife berechnen
+        # Kategorie -> (umlagefähiger Betrag im Zeitraum, Invoice-Allocation, Original-Betrag)
+        category_costs = [
+            (
+                category,
+                category_allocated * period_fraction,
+                invoice_allocations.get(category, Decimal("1")),
+                original_costs.get(category, Decimal("0")),
+            )
+            for category, category_allocated in allocated_costs.items()
+        ]
+
+        # Manuelle Buchungen: für alle Einheiten (unit_id None) bzw. pro Einheit
+        shared_manual_amounts = [e.amount for e in manual_entries if e.unit_id is None]
+        unit_manual_amounts: dict[UUID, list[Decimal]] = {}
+        for entry in manual_entries:
+            if entry.unit_id is not None:
+                unit_manual_amounts.setdefault(entry.unit_id, []).append(entry.amount)
+
         for unit in units:
             # Aktiven Mieter im Abrechnungszeitraum finden
-            tenant = self._get_tenant_for_period(
-                unit, settlement.period_start, settlement.period_end
-            )
+            tenant = tenant_by_unit.get(unit.id)
 
             if not tenant:
                 continue  # Keine Abrechnung für leerstehende Einheiten
@@ -90,81 +158,62 @@ class CalculationService:
             occupancy_days = self._calculate_occupancy_days(
                 tenant, settlement.period_start, settlement.period_end
             )
+            occupied = Decimal(occupancy_days)
 
-            total_days = (settlement.period_end - settlement.period_start).days + 1
-
-            # Rechnungen beziehen sich auf ein volles Jahr.
-            # Bei kürzerem Abrechnungszeitraum Kosten anteilig berechnen.
-            year_days = 366 if isleap(settlement.period_start.year) else 365
-            period_fraction = (
-                Decimal(total_days) / Decimal(year_days)
-                if total_days < year_days
-                else Decimal("1")
+            # Wohnflächenanteil einmal pro Einheit (Standard-Schlüssel, manuelle Buchungen)
+            area_share = unit.area_sqm / property_obj.total_area_sqm
+            area_allocation = AllocationInfo(
+                percentage=area_share, method=AllocationMethod.WOHNFLAECHE
             )
 
             # Kosten pro Kategorie berechnen
             total_costs = Decimal("0")
             breakdowns = []
 
-            for category, category_allocated in allocated_costs.items():
+            for category, period_allocated, inv_allocation, original_total in category_costs:
                 # Verteilerschlüssel für diese Einheit und Kategorie (Wohnflächenanteil)
-                unit_allocation = self._get_allocation(unit, category, property_obj, db)
-
-                # Invoice-Allocation für diese Kategorie
-                inv_allocation = invoice_allocations.get(category, Decimal("1"))
-
-                # Original-Rechnungsbetrag (vor Invoice-Allocation)
-                original_total = original_costs.get(category, Decimal("0"))
-
-                # Anteil berechnen (Invoice-Allocation × Unit-Allocation × Zeitraumanteil)
-                allocated_amount = (
-                    category_allocated * period_fraction * unit_allocation.percentage
+                unit_allocation = self._get_allocation(
+                    unit, category, area_allocation, unit_allocations
                 )
 
+                # Anteil berechnen (Invoice-Allocation × Zeitraumanteil × Unit-Allocation)
+                allocated_amount = period_allocated * unit_allocation.percentage
+
                 # Zeitanteil (bei Mieterwechsel)
                 if occupancy_days < total_days:
                     allocated_amount = (
-                        allocated_amount * Decimal(occupancy_days) / Decimal(total_days)
+                        allocated_amount * occupied / total_days_dec
                     )
 
-                allocated_amount = allocated_amount.quantize(
-                    Decimal("0.01"), rounding=ROUND_HALF_UP
-                )
+                allocated_amount = allocated_amount.quantize(CENT, rounding=ROUND_HALF_UP)
                 total_costs += allocated_amount
 
                 # Kombinierter Anteil: Invoice-Allocation × Unit-Allocation
                 combined_percentage = inv_allocation * unit_allocation.percentage
 
                 breakdowns.append(
-                    SettlementCostBreakdown(
+                    CostBreakdown(
                         cost_category=category,
                         total_property_cost=original_total,  # Original-Rechnungsbetrag
-                        allocation_percentage=combined_percentage,  # Kombinierter Anteil
+                        # Kombinierter Anteil (4 Nachkommastellen wie zuvor NUMERIC(5, 4))
+                        allocation_percentage=combined_percentage.quantize(
+                            PERCENT_PRECISION, rounding=ROUND_HALF_UP
+                        ),
                         allocated_amount=allocated_amount,
                         allocation_method=unit_allocation.method,
                     )
                 )
 
-            # Manuelle Einträge für diese Einheit
-            unit_manual_entries = [
-                e for e in manual_entries if e.unit_id is None or e.unit_id == unit.id
-            ]
-
-            for entry in unit_manual_entries:
-                if entry.unit_id is None:
-                    # Für alle Einheiten: Anteil berechnen
-                    share = unit.area_sqm / property_obj.total_area_sqm
-                    amount = entry.amount * share
-                else:
-                    # Nur für diese Einheit
-                    amount = entry.amount
+            # Manuelle Einträge für alle Einheiten: Anteil nach Wohnfläche
+            for amount in shared_manual_amounts:
+                total_costs += (amount * area_share).quantize(CENT, rounding=ROUND_HALF_UP)
 
-                total_costs += amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            # Manuelle Einträge nur für diese Einheit
+            for amount in unit_manual_amounts.get(unit.id, ()):
+                total_costs += amount.quantize(CENT, rounding=ROUND_HALF_UP)
 
             # Vorauszahlungen berechnen
-            total_prepayments = self._calculate_prepayments(
-                tenant, settlement.period_start, settlement.period_end
-            )
+            total_prepayments = self._calculate_prepayments(tenant, occupancy_days)
 
             # Saldo: Positiv = Nachzahlung, Negativ = Guthaben
             balance = total_costs - total_prepayments
@@ -186,28 +235,36 @@ class CalculationService:
                     "period_fraction": float(period_fraction),
                     "unit_area": float(unit.area_sqm),
                     "property_area": float(property_obj.total_area_sqm),
+                    "breakdowns": [b.to_dict() for b in breakdowns],
                 },
             )
 
-            db.add(result)
-            db.flush()
-
-            # Kostenaufschlüsselung speichern
-            for breakdown in breakdowns:
-                breakdown.settlement_result_id = result.id
-                db.add(breakdown)
-
             results.append(result)
             unit_to_result[unit.id] = result
 
-        # Dokumente wieder mit neuen SettlementResults verknüpfen
-        if doc_unit_mapping:
-            for doc_id, unit_id in doc_unit_mapping.items():
-                if unit_id in unit_to_result:
-                    new_result = unit_to_result[unit_id]
-                    db.query(Document).filter(Document.id == doc_id).update(
-                        {"settlement_result_id": new_result.id}
-                    )
+        # Ergebnisse (inkl. Kostenaufschlüsselung im JSONB) per COPY schreiben
+        bulk_insert_results(db, results)
+
+        # Dokumente wieder mit neuen SettlementResults verknüpfen: ein
+        # UPDATE ... FROM (VALUES (document_id, result_id), ...) statt eines pro Dokument
+        # (Hash-Join statt CASE mit einem WHEN-Zweig pro Dokument)
+        doc_result_rows = [
+            (doc_id, unit_to_result[unit_id].id)
+            for doc_id, unit_id in doc_unit_mapping.items()
+            if unit_id in unit_to_result
+        ]
+        if doc_result_rows:
+            relinks = values(
+                column("document_id", PG_UUID(as_uuid=True)),
+                column("result_id", PG_UUID(as_uuid=True)),
+                name="relinks",
+            ).data(doc_result_rows)
+            db.execute(
+                update(Document)
+                .where(Document.id == relinks.c.document_id)
+                .values(settlement_result_id=relinks.c.result_id),
+                execution_options={"synchronize_session": False},
+            )
 
         # Status aktualisieren
         settlement.status = SettlementStatus.CALCULATED
@@ -231,27 +288,27 @@ class CalculationService:
             - allocated_costs: Allocated amounts (after invoice allocation)
             - invoice_allocations: Weighted average invoice allocation per category
         """
-        invoices = (
-            db.query(Invoice).filter(Invoice.settlement_id == settlement.id).all()
-        )
+        # Summen per GROUP BY in der DB (Index-Only-Scan über ix_invoices_settlement_cat).
+        # total_amount ist BIGINT in Cent: roh summieren, erst in Python nach Euro umrechnen
+        cents = type_coerce(Invoice.total_amount, BigInteger)
+        rows = db.execute(
+            select(
+                Invoice.cost_category,
+                func.sum(cents),
+                # Wenn allocation_percentage gesetzt, nur diesen Anteil verwenden
+                func.sum(cents * func.coalesce(Invoice.allocation_percentage, 1)),
+            )
+            .where(Invoice.settlement_id == settlement.id)
+            .group_by(Invoice.cost_category)
+            .order_by(Invoice.cost_category)
+        ).all()
 
         original_costs: dict[CostCategory, Decimal] = {}
         allocated_costs: dict[CostCategory, Decimal] = {}
 
-        for invoice in invoices:
-            if invoice.cost_category not in original_costs:
-                original_costs[invoice.cost_category] = Decimal("0")
-                allocated_costs[invoice.cost_category] = Decimal("0")
-
-            original_costs[invoice.cost_category] += invoice.total_amount
-
-            # Wenn allocation_percentage gesetzt, nur diesen Anteil verwenden
-            if invoice.allocation_percentage is not None:
-                amount = invoice.total_amount * invoice.allocation_percentage
-            else:
-                amount = invoice.total_amount
-
-            allocated_costs[invoice.cost_category] += amount
+        for category, original_cents, allocated_cents in rows:
+            original_costs[category] = Decimal(original_cents).scaleb(-2)
+            allocated_costs[category] = Decimal(allocated_cents).scaleb(-2)
 
         # Berechne gewichteten Durchschnitt der Invoice-Allocation pro Kategorie
         invoice_allocations: dict[CostCategory, Decimal] = {}
@@ -265,25 +322,38 @@ class CalculationService:
 
         return original_costs, allocated_costs, invoice_allocations
 
-    def _get_tenant_for_period(
-        self, unit: Unit, period_start: date, period_end: date
-    ) -> Optional[Tenant]:
-        """Finde den Mieter für den Abrechnungszeitraum"""
-        for tenant in unit.tenants:
-            # Mieter muss vor Ende des Zeitraums eingezogen sein
-            if tenant.move_in_date > period_end:
-                continue
-
-            # Wenn ausgezogen, muss Auszug nach Beginn des Zeitraums sein
-            if tenant.move_out_date and tenant.move_out_date < period_start:
-                continue
-
-            return tenant
+    def _get_tenants_for_period(
+        self, db: Session, unit_ids: list[UUID], period_start: date, period_end: date
+    ) -> dict[UUID, Row]:
+        """
+        Finde pro Einheit den Mieter für den Abrechnungszeitraum.
 
-        return None
+        Liefert nur die benötigten Spalten als Row (id, unit_id, Ein-/Auszug,
+        Vorauszahlung) statt ORM-Instanzen in der Identity Map.
+        """
+        rows = db.execute(
+            select(
+                Tenant.id,
+                Tenant.unit_id,
+                Tenant.move_in_date,
+                Tenant.move_out_date,
+                Tenant.monthly_prepayment,
+            )
+            .where(
+                Tenant.unit_id.in_(unit_ids),
+                # Mieter muss vor Ende des Zeitraums eingezogen sein
+                Tenant.move_in_date <= period_end,
+                # Wenn ausgezogen, muss Auszug nach Beginn des Zeitraums sein
+                or_(Tenant.move_out_date.is_(None), Tenant.move_out_date >= period_start),
+            )
+            # Bei Mieterwechsel im Zeitraum: der zuerst eingezogene Mieter
+            .distinct(Tenant.unit_id)
+            .order_by(Tenant.unit_id, Tenant.move_in_date)
+        ).all()
+        return {row.unit_id: row for row in rows}
 
     def _calculate_occupancy_days(
-        self, tenant: Tenant, period_start: date, period_end: date
+        self, tenant: Row, period_start: date, period_end: date
     ) -> int:
         """Berechne die Belegungstage im Abrechnungszeitraum"""
         # Effektiver Start: Später von Einzug und Periodenstart
@@ -301,53 +371,31 @@ class CalculationService:
         return (effective_end - effective_start).days + 1
 
     def _get_allocation(
-        self, unit: Unit, category: CostCategory, property_obj: Property, db: Session
+        self,
+        unit: Unit,
+        category: CostCategory,
+        area_allocation: "AllocationInfo",
+        unit_allocations: dict,
     ) -> "AllocationInfo":
-        """Hole oder berechne den Verteilerschlüssel"""
-        # Prüfe ob spezifischer Verteilerschlüssel existiert
-        allocation = (
-            db.query(UnitAllocation)
-            .filter(
-                UnitAllocation.unit_id == unit.id,
-                UnitAllocation.cost_category == category,
-            )
-            .first()
-        )
+        """Hole den Verteilerschlüssel (Standard: Wohnflächenanteil der Einheit)"""
+        # Spezifischer Verteilerschlüssel (vorab geladen), sonst nach Wohnfläche
+        return unit_allocations.get((unit.id, category), area_allocation)
 
-        if allocation:
-            return AllocationInfo(
-                percentage=allocation.allocation_percentage,
-                method=allocation.allocation_method,
-            )
-
-        # Standard: Nach Wohnfläche
-        percentage = unit.area_sqm / property_obj.total_area_sqm
-
-        return AllocationInfo(
-            percentage=percentage, method=AllocationMethod.WOHNFLAECHE
-        )
-
-    def _calculate_prepayments(
-        self, tenant: Tenant, period_start: date, period_end: date
-    ) -> Decimal:
-        """Berechne die geleisteten Vorauszahlungen"""
+    def _calculate_prepayments(self, tenant: Row, occupancy_days: int) -> Decimal:
+        """Berechne die geleisteten Vorauszahlungen (Belegungstage bereits berechnet)"""
         if not tenant.monthly_prepayment:
             return Decimal("0")
 
-        # Belegungstage
-        days = self._calculate_occupancy_days(tenant, period_start, period_end)
-
         # Monate (approximiert)
-        months = Decimal(days) / Decimal("30.44")  # Durchschnittliche Tage pro Monat
+        months = Decimal(occupancy_days) / DAYS_PER_MONTH
 
         return (tenant.monthly_prepayment * months).quantize(
-            Decimal("0.01"), rounding=ROUND_HALF_UP
+            CENT, rounding=ROUND_HALF_UP
         )
 
 
+@dataclass(frozen=True, slots=True)
 class AllocationInfo:
-    """Hilfklasse für Verteilerschlüssel-Informationen"""
-
-    def __init__(self, percentage: Decimal, method: AllocationMethod):
-        self.percentage = percentage
-        self.method = method
+    """Verteilerschlüssel einer Einheit für eine Kostenart"""
+    percentage: Decimal
+    method: AllocationMethod
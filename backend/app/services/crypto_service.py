@@ -3,17 +3,27 @@ Crypto Service für sichere Speicherung sensibler Daten (z.B. Zertifikat-Passwö
 """
 import os
 import base64
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+# Präfix neuer Werte (AES-256-GCM); ältere Fernet-Tokens beginnen mit "gAAAAA"
+AESGCM_PREFIX = "v2:"
+NONCE_SIZE = 12
 
+
+@lru_cache(maxsize=1)
 def get_encryption_key() -> bytes:
     """
     Hole oder generiere den Verschlüsselungsschlüssel.
 
     Verwendet SETTINGS_ENCRYPTION_KEY Umgebungsvariable.
     Falls nicht gesetzt, wird ein deterministischer Key aus DATABASE_URL generiert.
+    Das Ergebnis wird pro Prozess gecacht (PBKDF2 läuft nur einmal).
     """
     env_key = os.getenv("SETTINGS_ENCRYPTION_KEY")
 
@@ -36,6 +46,31 @@ def get_encryption_key() -> bytes:
     return key
 
 
+@lru_cache(maxsize=1)
+def _get_fernet() -> Fernet:
+    """Fernet-Instanz für den Prozess-Schlüssel"""
+    return Fernet(get_encryption_key())
+
+
+@lru_cache(maxsize=1)
+def _get_aesgcm() -> AESGCM:
+    """AES-256-GCM mit eigenem, per HKDF vom Prozess-Schlüssel abgeleitetem Key"""
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"abrechnungstool-settings-aesgcm",
+    )
+    return AESGCM(hkdf.derive(get_encryption_key()))
+
+
+def reset_crypto_cache() -> None:
+    """Gecachten Schlüssel verwerfen (z.B. nach Änderung der Umgebungsvariablen)"""
+    _get_aesgcm.cache_clear()
+    _get_fernet.cache_clear()
+    get_encryption_key.cache_clear()
+
+
 def encrypt_value(value: str) -> str:
     """
     Verschlüsselt einen String-Wert.
@@ -44,12 +79,11 @@ def encrypt_value(value: str) -> str:
         value: Der zu verschlüsselnde Wert
 
     Returns:
-        Base64-encodierter verschlüsselter Wert
+        "v2:" + Base64-encodierte Nonce und Chiffretext (AES-256-GCM)
     """
-    key = get_encryption_key()
-    fernet = Fernet(key)
-    encrypted = fernet.encrypt(value.encode('utf-8'))
-    return encrypted.decode('utf-8')
+    nonce = os.urandom(NONCE_SIZE)
+    encrypted = _get_aesgcm().encrypt(nonce, value.encode('utf-8'), None)
+    return AESGCM_PREFIX + base64.urlsafe_b64encode(nonce + encrypted).decode('ascii')
 
 
 def decrypt_value(encrypted_value: str) -> str:
@@ -62,12 +96,22 @@ def decrypt_value(encrypted_value: str) -> str:
     Returns:
         Der entschlüsselte Original-Wert
 
+    Werte ohne "v2:"-Präfix sind ältere Fernet-Tokens und bleiben lesbar.
+
     Raises:
         cryptography.fernet.InvalidToken: Wenn Entschlüsselung fehlschlägt
     """
-    key = get_encryption_key()
-    fernet = Fernet(key)
-    decrypted = fernet.decrypt(encrypted_value.encode('utf-8'))
+    if not encrypted_value.startswith(AESGCM_PREFIX):
+        decrypted = _get_fernet().decrypt(encrypted_value.encode('utf-8'))
+        return decrypted.decode('utf-8')
+
+    try:
+        payload = base64.urlsafe_b64decode(encrypted_value[len(AESGCM_PREFIX):])
+        decrypted = _get_aesgcm().decrypt(
+            payload[:NONCE_SIZE], payload[NONCE_SIZE:], None
+        )
+    except (InvalidTag, ValueError) as e:
+        raise InvalidToken from e
     return decrypted.decode('utf-8')
 
 
@@ -7,24 +7,27 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
-from app.models.settings import Settings
+from app.services.settings_store import get_value, get_values, set_value
 
 
 # LLM-Einstellungs-Keys
 LLM_API_KEY = "openrouter_api_key"
 LLM_MODEL = "openrouter_model"
 LLM_ENABLED = "llm_correction_enabled"
+LLM_FAST_MODEL = "openrouter_fast_model"
 
 # Standardwerte
 DEFAULT_LLM_MODEL = "anthropic/claude-sonnet-4.5"
 
 
-@dataclass
+@dataclass(frozen=True)
 class LLMSettings:
     """LLM-Einstellungen"""
     api_key: Optional[str]
     model: str
     enabled: bool
+    # Guenstiges Modell fuer kurze, einfache Belege (None = kein Routing)
+    fast_model: Optional[str] = None
 
     @property
     def is_configured(self) -> bool:
@@ -36,20 +39,22 @@ def get_llm_settings(db: Session) -> LLMSettings:
     """
     Hole LLM-Einstellungen aus der Datenbank.
 
+    Alle Keys in einer Abfrage; solange der Settings-Listener läuft, kommen sie
+    aus dem Prozess-Cache (ohne Abfrage). Kein eigener TTL-Cache: set_value()
+    verwirft die Keys per NOTIFY in allen Prozessen sofort.
+
     Args:
         db: Datenbank-Session
 
     Returns:
         LLMSettings mit aktuellen Werten
     """
-    api_key = _get_setting(db, LLM_API_KEY)
-    model = _get_setting(db, LLM_MODEL) or DEFAULT_LLM_MODEL
-    enabled = _get_setting(db, LLM_ENABLED) == "true"
-
+    values = get_values(db, [LLM_API_KEY, LLM_MODEL, LLM_ENABLED, LLM_FAST_MODEL])
     return LLMSettings(
-        api_key=api_key,
-        model=model,
-        enabled=enabled
+        api_key=values[LLM_API_KEY],
+        model=values[LLM_MODEL] or DEFAULT_LLM_MODEL,
+        enabled=values[LLM_ENABLED] == "true",
+        fast_model=values[LLM_FAST_MODEL] or None
     )
 
 
@@ -63,6 +68,11 @@ def set_llm_model(db: Session, model: str):
     _set_setting(db, LLM_MODEL, model, "OpenRouter Modell")
 
 
+def set_llm_fast_model(db: Session, model: str):
+    """Setze guenstiges Modell fuer einfache Belege (leer = kein Routing)"""
+    _set_setting(db, LLM_FAST_MODEL, model, "OpenRouter Modell fuer einfache Belege")
+
+
 def set_llm_enabled(db: Session, enabled: bool):
     """Aktiviere/Deaktiviere LLM-Korrektur"""
     _set_setting(db, LLM_ENABLED, "true" if enabled else "false", "LLM-Korrektur aktiviert")
@@ -76,18 +86,10 @@ def has_api_key(db: Session) -> bool:
 
 def _get_setting(db: Session, key: str) -> Optional[str]:
     """Interner Helper: Hole Setting-Wert"""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    return setting.value if setting else None
+    return get_value(db, key)
 
 
 def _set_setting(db: Session, key: str, value: str, description: str = None):
     """Interner Helper: Setze Setting-Wert"""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting:
-        setting.value = value
-        if description:
-            setting.description = description
-    else:
-        setting = Settings(key=key, value=value, description=description)
-        db.add(setting)
+    set_value(db, key, value, description)
     db.commit()
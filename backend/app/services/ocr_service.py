@@ -2,21 +2,74 @@
 OCR-Service für die Verarbeitung von Dokumenten
 """
 from datetime import datetime
+from functools import lru_cache
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.models.document import Document
+from app.models.document_ocr import DocumentOcr
 from app.models.invoice import Invoice
 from app.models.enums import DocumentStatus
 from app.ocr.processor import OCRProcessor
 
+# Extraktionsfelder, die bei gleichem Dateiinhalt übernommen werden
+EXTRACTED_FIELDS = (
+    "extracted_vendor_name",
+    "extracted_invoice_number",
+    "extracted_invoice_date",
+    "extracted_total_amount",
+    "extracted_cost_category",
+    "llm_extraction_used",
+)
+
+
+def apply_cached_ocr_result(document: Document, db: Session) -> bool:
+    """
+    Übernimm OCR- und Extraktionsergebnis eines bereits verarbeiteten
+    Dokuments mit gleichem content_sha256.
+
+    Returns:
+        True wenn ein Treffer übernommen wurde (OCR muss nicht laufen)
+    """
+    if document.content_sha256 is None:
+        return False
+
+    source = db.query(Document).options(joinedload(Document.ocr)).filter(
+        Document.content_sha256 == document.content_sha256,
+        Document.document_status.in_([DocumentStatus.PROCESSED, DocumentStatus.VERIFIED]),
+        Document.id != document.id,
+    ).order_by(Document.processed_at.desc().nulls_last()).first()
+
+    if not source:
+        return False
+
+    for field in EXTRACTED_FIELDS:
+        setattr(document, field, getattr(source, field))
+    if source.ocr is not None:
+        document.ocr = DocumentOcr(
+            raw_text=source.ocr.raw_text,
+            corrected_text=source.ocr.corrected_text,
+            confidence=source.ocr.confidence,
+            engine=source.ocr.engine,
+            llm_extraction_error=source.ocr.llm_extraction_error,
+        )
+    document.document_status = DocumentStatus.PROCESSED
+    document.processed_at = datetime.now()
+    return True
+
+
+@lru_cache(maxsize=1)
+def _get_processor() -> OCRProcessor:
+    """Prozessweiter OCRProcessor ohne DB-Session (zustandslos, threadsicher)"""
+    return OCRProcessor()
+
 
 class OCRService:
     """Service für OCR-Verarbeitung von Dokumenten"""
 
     def __init__(self):
-        self.processor = OCRProcessor()
+        self.processor = _get_processor()
 
     def process_document(self, document_id: UUID, db: Session) -> Document:
         """
@@ -32,12 +85,8 @@ class OCRService:
             document.document_status = DocumentStatus.PROCESSING
             db.commit()
 
-            # OCR ausführen
-            result = self.processor.process_file(document.file_path)
-
-            # Ergebnisse speichern
-            document.ocr_raw_text = result.raw_text
-            document.ocr_confidence = result.confidence
+            # OCR ausführen und Ergebnisse (inkl. Extraktion) speichern
+            self._run_ocr(document)
             document.document_status = DocumentStatus.PROCESSED
             document.processed_at = datetime.now()
 
@@ -69,19 +118,18 @@ class OCRService:
         if document.document_status != DocumentStatus.PROCESSED:
             raise ValueError("Dokument wurde noch nicht verarbeitet")
 
-        # OCR-Ergebnisse erneut extrahieren
-        result = self.processor.process_file(document.file_path)
-        extracted = result.extracted_data
+        # Gespeicherte Extraktion verwenden (OCR nur für Altbestand ohne Ergebnis)
+        self._ensure_ocr_result(document, db)
 
         # Rechnung erstellen
         invoice = Invoice(
             settlement_id=document.settlement_id,
             document_id=document.id,
-            vendor_name=extracted.vendor_name or "Unbekannt",
-            invoice_number=extracted.invoice_number,
-            invoice_date=extracted.invoice_date,
-            total_amount=extracted.total_amount or 0,
-            cost_category=extracted.suggested_category,
+            vendor_name=document.extracted_vendor_name or "Unbekannt",
+            invoice_number=document.extracted_invoice_number,
+            invoice_date=document.extracted_invoice_date,
+            total_amount=document.extracted_total_amount or 0,
+            cost_category=document.extracted_cost_category,
             is_verified=False
         )
 
@@ -107,18 +155,40 @@ class OCRService:
                 "suggestions": None
             }
 
-        result = self.processor.process_file(document.file_path)
-        extracted = result.extracted_data
+        self._ensure_ocr_result(document, db)
+        invoice_date = document.extracted_invoice_date
+        total_amount = document.extracted_total_amount
+        category = document.extracted_cost_category
 
         return {
             "status": document.document_status.value,
-            "confidence": result.confidence,
+            "confidence": document.ocr_confidence,
             "suggestions": {
-                "vendor_name": extracted.vendor_name,
-                "invoice_number": extracted.invoice_number,
-                "invoice_date": extracted.invoice_date.isoformat() if extracted.invoice_date else None,
-                "total_amount": float(extracted.total_amount) if extracted.total_amount else None,
-                "suggested_category": extracted.suggested_category.value if extracted.suggested_category else None
+                "vendor_name": document.extracted_vendor_name,
+                "invoice_number": document.extracted_invoice_number,
+                "invoice_date": invoice_date.isoformat() if invoice_date else None,
+                "total_amount": float(total_amount) if total_amount else None,
+                "suggested_category": category.value if category else None
             },
-            "raw_text": result.raw_text[:2000]  # Erste 2000 Zeichen
+            "raw_text": (document.ocr_raw_text or "")[:2000]  # Erste 2000 Zeichen
         }
+
+    def _run_ocr(self, document: Document) -> None:
+        """OCR ausführen, Text und extrahierte Felder am Dokument speichern"""
+        result = self.processor.process_file(document.file_path)
+        document.ocr_raw_text = result.raw_text
+        document.ocr_confidence = result.confidence
+        extracted = result.extracted_data
+        if extracted:
+            document.extracted_vendor_name = extracted.vendor_name
+            document.extracted_invoice_number = extracted.invoice_number
+            document.extracted_invoice_date = extracted.invoice_date
+            document.extracted_total_amount = extracted.total_amount
+            document.extracted_cost_category = extracted.suggested_category
+
+    def _ensure_ocr_result(self, document: Document, db: Session) -> None:
+        """Nur Dokumente ohne gespeichertes OCR-Ergebnis erneut erkennen"""
+        if document.ocr is not None:
+            return
+        self._run_ocr(document)
+        db.commit()
@@ -0,0 +1,217 @@
+"""
+Zugriff auf die settings-Tabelle mit prozesslokalem Cache
+
+Einstellungen werden bei fast jedem Request gelesen, aber nur selten
+geschrieben. Gelesene Werte bleiben im Prozess gecacht; Schreibzugriffe
+senden NOTIFY settings_changed (zustellt erst beim Commit), worauf alle
+API-Prozesse den Key verwerfen.
+
+Der Cache ist nur aktiv, solange der Listener läuft (App-Lifespan).
+Skripte und PDF-Worker (forkserver) lesen weiterhin direkt aus der DB. Per
+fork gestartete Kindprozesse erben weder Listener noch Cache.
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "settings_changed"
+# Obergrenze für gecachte Keys (es gibt nur wenige Dutzend Einstellungen)
+CACHE_MAX_KEYS = 256
+
+# Key -> Wert (None = Key existiert nicht)
+_cache: dict[str, Optional[str]] = {}
+_cache_lock = threading.Lock()
+# Wird bei jedem Verwerfen erhöht: parallel gelesene Altwerte nicht cachen
+_generation = 0
+_listener_connection = None
+# Im Kindprozess geerbte Listener-Verbindung: nur referenzieren, nie schließen
+_inherited_connection = None
+
+# Session.info-Key: in dieser Transaktion geschriebene, noch nicht committete Keys
+_PENDING_KEYS = "settings_pending_keys"
+
+
+def _evict(key: Optional[str] = None) -> None:
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        if key:
+            _cache.pop(key, None)
+        else:
+            _cache.clear()
+
+
+def get_value(db: Session, key: str) -> Optional[str]:
+    """Einstellungswert lesen (None wenn nicht gesetzt)"""
+    # Eigene, noch nicht committete Änderungen immer aus der DB lesen
+    use_cache = _listener_connection is not None and not db.info.get(_PENDING_KEYS)
+
+    if use_cache:
+        with _cache_lock:
+            if key in _cache:
+                return _cache[key]
+            generation = _generation
+
+    value = db.execute(select(Settings.value).where(Settings.key == key)).scalar()
+
+    if use_cache:
+        with _cache_lock:
+            if generation != _generation:
+                return value
+            if len(_cache) >= CACHE_MAX_KEYS:
+                _cache.clear()
+            _cache[key] = value
+    return value
+
+
+def get_values(db: Session, keys: list[str]) -> dict[str, Optional[str]]:
+    """Mehrere Einstellungswerte mit einer Abfrage lesen (None wenn nicht gesetzt)"""
+    use_cache = _listener_connection is not None and not db.info.get(_PENDING_KEYS)
+    values: dict[str, Optional[str]] = {}
+
+    if use_cache:
+        with _cache_lock:
+            for key in keys:
+                if key in _cache:
+                    values[key] = _cache[key]
+            generation = _generation
+
+    missing = [key for key in keys if key not in values]
+    if not missing:
+        return values
+
+    rows = dict(
+        db.execute(
+            select(Settings.key, Settings.value).where(Settings.key.in_(missing))
+        ).all()
+    )
+    loaded = {key: rows.get(key) for key in missing}
+    values.update(loaded)
+
+    if use_cache:
+        with _cache_lock:
+            if generation == _generation:
+                if len(_cache) + len(loaded) > CACHE_MAX_KEYS:
+                    _cache.clear()
+                _cache.update(loaded)
+    return values
+
+
+def set_value(db: Session, key: str, value: str, description: Optional[str] = None) -> None:
+    """
+    Einstellungswert per Upsert schreiben (ohne Commit).
+
+    Eine vorhandene Beschreibung bleibt erhalten, wenn description None ist.
+    """
+    stmt = insert(Settings).values(key=key, value=value, description=description)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Settings.key],
+        set_={
+            "value": stmt.excluded.value,
+            "description": func.coalesce(stmt.excluded.description, Settings.description),
+        },
+    )
+    db.execute(stmt)
+    db.execute(select(func.pg_notify(NOTIFY_CHANNEL, key)))
+    db.info.setdefault(_PENDING_KEYS, set()).add(key)
+    _evict(key)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    # Eigener Prozess: sofort verwerfen, nicht auf die Notification warten
+    for key in session.info.pop(_PENDING_KEYS, ()):
+        _evict(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEYS, None)
+
+
+def _reset_after_fork() -> None:
+    """
+    Im Kindprozess: Listener und Cache des Elternprozesses nicht übernehmen.
+
+    Das Kind pollt den LISTEN-Socket nie, der geerbte Cache würde also nie
+    verworfen. Die Verbindung wird nicht geschlossen (das beendete auch die
+    Sitzung des Elternprozesses), sondern nur nicht mehr verwendet.
+    """
+    global _listener_connection, _inherited_connection, _cache_lock, _generation
+    _inherited_connection = _listener_connection
+    _listener_connection = None
+    # Lock kann zum fork-Zeitpunkt von einem anderen Thread gehalten worden sein
+    _cache_lock = threading.Lock()
+    _cache.clear()
+    _generation += 1
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _on_notify() -> None:
+    """Reader-Callback der Event-Loop: eingegangene Notifications abarbeiten"""
+    try:
+        _listener_connection.poll()
+    except Exception as e:
+        logger.error(f"Settings-Listener unterbrochen, Cache deaktiviert: {e}")
+        stop_settings_listener()
+        return
+
+    while _listener_connection.notifies:
+        notify = _listener_connection.notifies.pop(0)
+        _evict(notify.payload)
+
+
+def start_settings_listener() -> None:
+    """LISTEN settings_changed auf eigener Verbindung starten (idempotent)"""
+    global _listener_connection
+    if _listener_connection is not None:
+        return
+
+    from app.db.session import engine
+
+    try:
+        raw = engine.raw_connection()
+        # Dauerhaft belegte Verbindung aus dem Pool lösen
+        raw.detach()
+        connection = raw.driver_connection
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        asyncio.get_running_loop().add_reader(connection.fileno(), _on_notify)
+    except Exception as e:
+        logger.warning(f"Settings-Listener nicht gestartet, Einstellungen ungecacht: {e}")
+        return
+
+    _evict()
+    _listener_connection = connection
+
+
+def stop_settings_listener() -> None:
+    """Listener beenden und Cache leeren"""
+    global _listener_connection
+    connection = _listener_connection
+    _listener_connection = None
+    _evict()
+    if connection is None:
+        return
+
+    try:
+        asyncio.get_running_loop().remove_reader(connection.fileno())
+    except Exception:
+        pass
+    try:
+        connection.close()
+    except Exception:
+        pass
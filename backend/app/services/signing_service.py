@@ -8,10 +8,14 @@ Unterstützt verschiedene Signaturtypen:
 - TEXT: Visuelle Signatur aus Text
 """
 import io
-import base64
+import os
+import hashlib
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional, Literal
+from typing import BinaryIO, Optional, Literal
 from PIL import Image, ImageDraw, ImageFont
 
 from pyhanko.sign import signers
@@ -20,9 +24,16 @@ from pypdf import PdfReader, PdfWriter
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
 from sqlalchemy.orm import Session
 
-from app.models.settings import Settings
+try:
+    # SIMD-beschleunigt (SSSE3/AVX2/NEON), gleiche API wie das stdlib-Modul
+    import pybase64 as base64
+except ImportError:  # optional, stdlib als Fallback
+    import base64
+
+from app.services.settings_store import get_value, get_values, set_value
 from app.services.crypto_service import decrypt_value
 
 
@@ -37,23 +48,38 @@ SIGNATURE_CERT_PASSWORD_KEY = "signature_cert_password"
 SIGNATURE_IMAGE_PATH_KEY = "signature_image_path"
 SIGNATURE_TEXT_KEY = "signature_text"
 SIGNATURE_TEXT_FONT_KEY = "signature_text_font"
+SIGNATURE_SETTING_KEYS = [
+    SIGNATURE_TYPE_KEY,
+    SIGNATURE_CERT_PATH_KEY,
+    SIGNATURE_CERT_PASSWORD_KEY,
+    SIGNATURE_IMAGE_PATH_KEY,
+    SIGNATURE_TEXT_KEY,
+    SIGNATURE_TEXT_FONT_KEY,
+]
+
+# Geladene PKCS#12-Signer: (Pfad, mtime_ns, SHA-256 des Passworts) -> SimpleSigner.
+# load_pkcs12 entschlüsselt den Container (PBE) und parst Schlüssel/Zertifikate –
+# das passiert so nur einmal pro Zertifikatsversion und Prozess.
+_SIGNER_CACHE: dict[tuple, signers.SimpleSigner] = {}
+_SIGNER_CACHE_MAX = 8
+_signer_cache_lock = threading.Lock()
 
 
 def get_signature_setting(db: Session, key: str, default: str = "") -> str:
     """Hole einen Signatur-Einstellungswert aus der DB"""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    return setting.value if setting else default
+    value = get_value(db, key)
+    return value if value is not None else default
+
+
+def load_signature_settings(db: Session) -> dict[str, str]:
+    """Alle Signatur-Einstellungen mit einer Abfrage laden (fehlende Keys = "")"""
+    values = get_values(db, SIGNATURE_SETTING_KEYS)
+    return {key: value or "" for key, value in values.items()}
 
 
 def set_signature_setting(db: Session, key: str, value: str, description: str = None):
     """Setze einen Signatur-Einstellungswert in der DB"""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting:
-        setting.value = value
-    else:
-        setting = Settings(key=key, value=value, description=description)
-        db.add(setting)
-    db.flush()
+    set_value(db, key, value, description)
 
 
 class BaseSignatureService(ABC):
@@ -64,27 +90,31 @@ class BaseSignatureService(ABC):
         self,
         pdf_bytes: bytes,
         reason: str = "Abrechnung erstellt",
+        output: Optional[BinaryIO] = None,
         **kwargs
-    ) -> bytes:
-        """Signiere ein PDF-Dokument"""
+    ) -> Optional[bytes]:
+        """
+        Signiere ein PDF-Dokument.
+
+        Mit output wird das Ergebnis direkt dorthin geschrieben (z.B. Datei)
+        und None zurückgegeben; ohne output als Bytes.
+        """
         pass
 
 
 class CryptographicSigningService(BaseSignatureService):
     """Service für digitale (kryptographische) PDF-Signaturen mit pyHanko"""
 
-    def __init__(self, pkcs12_path: str, password: str):
+    def __init__(self, pkcs12_path: str, password: str, mtime_ns: Optional[int] = None):
         """
         Initialisiere den Signing-Service mit PKCS#12-Zertifikat.
 
         Args:
             pkcs12_path: Pfad zur .p12/.pfx Zertifikatsdatei
             password: Passwort für das Zertifikat
+            mtime_ns: Bereits ermittelte mtime der Datei (spart einen stat-Aufruf)
         """
-        self.signer = signers.SimpleSigner.load_pkcs12(
-            pfx_file=pkcs12_path,
-            passphrase=password.encode('utf-8')
-        )
+        self.signer = _load_signer(pkcs12_path, password, mtime_ns)
 
     def apply_signature(
         self,
@@ -92,8 +122,9 @@ class CryptographicSigningService(BaseSignatureService):
         reason: str = "Abrechnung erstellt",
         location: str = "Deutschland",
         field_name: str = "Settlement_Signature",
+        output: Optional[BinaryIO] = None,
         **kwargs
-    ) -> bytes:
+    ) -> Optional[bytes]:
         """
         Signiere ein PDF-Dokument digital.
 
@@ -102,9 +133,10 @@ class CryptographicSigningService(BaseSignatureService):
             reason: Grund der Signatur
             location: Ort der Signatur
             field_name: Name des Signaturfeldes
+            output: Optionales Ziel (Datei o.ä.); dann wird None zurückgegeben
 
         Returns:
-            Signiertes PDF als Bytes
+            Signiertes PDF als Bytes (ohne output)
         """
         pdf_writer = IncrementalPdfFileWriter(io.BytesIO(pdf_bytes))
 
@@ -116,49 +148,128 @@ class CryptographicSigningService(BaseSignatureService):
         )
 
         pdf_signer = signers.PdfSigner(sig_meta, signer=self.signer)
-        signed = pdf_signer.sign_pdf(pdf_writer)
+        signed = pdf_signer.sign_pdf(pdf_writer, output=output)
 
-        return signed.getvalue()
+        return None if output is not None else signed.getvalue()
 
-
-class VisualSignatureService(BaseSignatureService):
-    """Service für visuelle Signaturen (Bild oder Pad-Zeichnung)"""
-
-    def __init__(self, image_path: str):
+    def sign_many(
+        self,
+        pdfs: list[bytes],
+        max_workers: Optional[int] = None,
+        **kwargs
+    ) -> list[bytes]:
         """
-        Initialisiere mit Pfad zum Signaturbild.
+        Signiere mehrere PDFs parallel mit demselben (geladenen) Signer.
+
+        Die Schlüsseloperation in OpenSSL gibt den GIL frei; das PDF-Schreiben
+        von pyHanko bleibt Python-Code. Reihenfolge wie pdfs.
 
         Args:
-            image_path: Pfad zum PNG/JPG Signaturbild
+            pdfs: PDFs als Bytes
+            max_workers: Anzahl Threads (Standard: CPU-Kerne)
+            **kwargs: Wie apply_signature (reason, location, field_name)
+
+        Returns:
+            Signierte PDFs als Bytes
         """
-        self.image_path = Path(image_path)
+        if len(pdfs) <= 1:
+            return [self.apply_signature(pdf, **kwargs) for pdf in pdfs]
 
-        if not self.image_path.exists():
-            raise ValueError(f"Signaturbild nicht gefunden: {image_path}")
+        workers = min(max_workers or os.cpu_count() or 1, len(pdfs))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda pdf: self.apply_signature(pdf, **kwargs), pdfs))
+
+
+def _stamp_last_page(
+    pdf_bytes: bytes, overlay_bytes: bytes, output: Optional[BinaryIO] = None
+) -> Optional[bytes]:
+    """
+    Overlay auf die letzte Seite legen und als inkrementelles Update anhängen.
+
+    Das Original bleibt Byte für Byte erhalten; geschrieben werden nur die
+    geänderten Objekte (Seite, Content-Stream, Ressourcen). Gelesen wird das
+    Dokument weiterhin vollständig: pypdf lädt und hasht beim Öffnen alle
+    Objekte, um Änderungen zu erkennen. Nur die Schreibseite ist inkrementell.
+
+    Mit output wird direkt dorthin geschrieben (keine Kopie über BytesIO).
+    """
+    writer = PdfWriter(io.BytesIO(pdf_bytes), incremental=True)
+    overlay_page = PdfReader(io.BytesIO(overlay_bytes)).pages[0]
+    # Nur die letzte Seite wird geändert; die übrigen Seitenobjekte werden
+    # nicht neu geschrieben (geladen werden sie trotzdem, siehe oben)
+    writer.pages[-1].merge_page(overlay_page)
+
+    if output is not None:
+        writer.write(output)
+        return None
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=8)
+def _load_font(font_path: str, size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """TrueType-Font einmal pro Prozess laden (nur drei bekannte Fonts)"""
+    try:
+        return ImageFont.truetype(font_path, size)
+    except OSError:
+        # Fallback auf Standard-Font
+        return ImageFont.load_default()
+
+
+def _signature_thumbnail(img: Image.Image, high_quality: bool = False) -> Image.Image:
+    """
+    Signaturbild auf die Signaturfläche (max. 60 x 25 mm) verkleinern (in place).
+
+    thumbnail() nutzt draft(): JPEGs werden bereits beim Dekodieren per
+    DCT-Skalierung verkleinert. Für die kleine Zielgröße reicht BICUBIC;
+    LANCZOS nur auf Wunsch (high_quality).
+    """
+    resample = Image.Resampling.LANCZOS if high_quality else Image.Resampling.BICUBIC
+    img.thumbnail((60 * mm, 25 * mm), resample)
+    return img
+
+
+class _VisualSignatureBase(BaseSignatureService):
+    """
+    Gemeinsame Logik der visuellen Signaturen: Bild unten rechts auf die letzte Seite.
+
+    Unterklassen liefern das Bild über _open_source().
+    """
+
+    high_quality: bool = False
+
+    @abstractmethod
+    def _open_source(self) -> Image.Image:
+        """Signaturbild öffnen (darf anschließend verändert werden)"""
+        pass
 
     def apply_signature(
         self,
         pdf_bytes: bytes,
         reason: str = "Abrechnung erstellt",
+        output: Optional[BinaryIO] = None,
         **kwargs
-    ) -> bytes:
+    ) -> Optional[bytes]:
         """
         Füge visuelle Signatur zur letzten Seite hinzu.
 
         Args:
             pdf_bytes: PDF als Bytes
-            reason: Wird als Text unter der Signatur angezeigt
+            reason: Grund der Signatur (wird nicht dargestellt)
+            output: Optionales Ziel (Datei o.ä.); dann wird None zurückgegeben
 
         Returns:
-            PDF mit visueller Signatur
+            PDF mit visueller Signatur (ohne output)
         """
-        # Signatur-Overlay erstellen
-        overlay_bytes = self._create_signature_overlay(reason)
+        return _stamp_last_page(pdf_bytes, self._overlay_bytes, output)
 
-        # PDFs zusammenführen
-        return self._merge_signature(pdf_bytes, overlay_bytes)
+    @cached_property
+    def _overlay_bytes(self) -> bytes:
+        """Overlay hängt nur vom Signaturbild ab: einmal pro Instanz erzeugen"""
+        return self._create_signature_overlay()
 
-    def _create_signature_overlay(self, reason: str) -> bytes:
+    def _create_signature_overlay(self) -> bytes:
         """Erstelle PDF-Overlay mit Signatur"""
         buffer = io.BytesIO()
         c = canvas.Canvas(buffer, pagesize=A4)
@@ -168,23 +279,11 @@ class VisualSignatureService(BaseSignatureService):
         sig_x = width - 80 * mm
         sig_y = 30 * mm
 
-        # Signaturbild laden und skalieren
+        # Signaturbild laden, skalieren und direkt einbetten (ImageReader nimmt PIL-Bilder)
         try:
-            img = Image.open(self.image_path)
-            # Auf maximale Breite/Höhe skalieren
-            max_width = 60 * mm
-            max_height = 25 * mm
-            img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-
-            # Temporär speichern für reportlab
-            temp_buffer = io.BytesIO()
-            img.save(temp_buffer, format='PNG')
-            temp_buffer.seek(0)
-
-            # Bild einfügen
-            from reportlab.lib.utils import ImageReader
+            img = _signature_thumbnail(self._open_source(), self.high_quality)
             c.drawImage(
-                ImageReader(temp_buffer),
+                ImageReader(img),
                 sig_x - img.width / 2,
                 sig_y,
                 width=img.width,
@@ -197,22 +296,26 @@ class VisualSignatureService(BaseSignatureService):
         c.save()
         return buffer.getvalue()
 
-    def _merge_signature(self, pdf_bytes: bytes, overlay_bytes: bytes) -> bytes:
-        """Füge Signatur-Overlay zur letzten Seite hinzu"""
-        pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
-        overlay_reader = PdfReader(io.BytesIO(overlay_bytes))
-        writer = PdfWriter()
 
-        # Alle Seiten kopieren
-        for i, page in enumerate(pdf_reader.pages):
-            if i == len(pdf_reader.pages) - 1:
-                # Letzte Seite: Overlay hinzufügen
-                page.merge_page(overlay_reader.pages[0])
-            writer.add_page(page)
+class VisualSignatureService(_VisualSignatureBase):
+    """Service für visuelle Signaturen (Bild oder Pad-Zeichnung)"""
 
-        output = io.BytesIO()
-        writer.write(output)
-        return output.getvalue()
+    def __init__(self, image_path: str, high_quality: bool = False):
+        """
+        Initialisiere mit Pfad zum Signaturbild.
+
+        Args:
+            image_path: Pfad zum PNG/JPG Signaturbild
+            high_quality: LANCZOS statt BICUBIC beim Verkleinern
+        """
+        self.image_path = Path(image_path)
+        self.high_quality = high_quality
+
+        if not self.image_path.exists():
+            raise ValueError(f"Signaturbild nicht gefunden: {image_path}")
+
+    def _open_source(self) -> Image.Image:
+        return Image.open(self.image_path)
 
 
 class TextSignatureService(BaseSignatureService):
@@ -240,37 +343,30 @@ class TextSignatureService(BaseSignatureService):
         self,
         pdf_bytes: bytes,
         reason: str = "Abrechnung erstellt",
+        output: Optional[BinaryIO] = None,
         **kwargs
-    ) -> bytes:
+    ) -> Optional[bytes]:
         """
         Füge Text-Signatur zur letzten Seite hinzu.
         """
-        # Text zu Bild rendern
-        sig_image = self._render_text_signature()
-
-        # Temporäres Bild speichern
-        temp_buffer = io.BytesIO()
-        sig_image.save(temp_buffer, format='PNG')
-        temp_buffer.seek(0)
-
-        # Visual Service nutzen
-        visual_service = VisualSignatureServiceFromBytes(temp_buffer.getvalue())
-        return visual_service.apply_signature(pdf_bytes, reason)
+        return self._visual_service.apply_signature(pdf_bytes, reason, output=output)
+
+    @cached_property
+    def _visual_service(self) -> "VisualSignatureServiceFromPILImage":
+        # Gerendertes Bild (gecacht pro Text und Schriftstil) direkt einbetten,
+        # ohne PNG-Encode/-Decode dazwischen; Overlay so nur einmal pro Instanz
+        return VisualSignatureServiceFromPILImage(
+            _render_text_image(self.text, self.font_style)
+        )
 
     def _render_text_signature(self) -> Image.Image:
         """Rendere Signaturtext als Bild"""
         # Font laden
         font_path = self.FONT_PATHS.get(self.font_style, self.FONT_PATHS["SANS"])
-        try:
-            font = ImageFont.truetype(font_path, 36)
-        except OSError:
-            # Fallback auf Standard-Font
-            font = ImageFont.load_default()
+        font = _load_font(font_path, 36)
 
-        # Textgröße ermitteln
-        dummy_img = Image.new('RGBA', (1, 1))
-        draw = ImageDraw.Draw(dummy_img)
-        bbox = draw.textbbox((0, 0), self.text, font=font)
+        # Textgröße direkt am Font messen (ohne Hilfsbild)
+        bbox = font.getbbox(self.text)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
 
@@ -288,112 +384,147 @@ class TextSignatureService(BaseSignatureService):
         return img
 
 
-class VisualSignatureServiceFromBytes(BaseSignatureService):
-    """Hilfsklasse für visuelle Signaturen aus Bytes"""
-
-    def __init__(self, image_bytes: bytes):
-        self.image_bytes = image_bytes
-
-    def apply_signature(
-        self,
-        pdf_bytes: bytes,
-        reason: str = "Abrechnung erstellt",
-        **kwargs
-    ) -> bytes:
-        """Füge visuelle Signatur zur letzten Seite hinzu"""
-        overlay_bytes = self._create_signature_overlay()
-        return self._merge_signature(pdf_bytes, overlay_bytes)
-
-    def _create_signature_overlay(self) -> bytes:
-        """Erstelle PDF-Overlay mit Signatur"""
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-
-        sig_x = width - 80 * mm
-        sig_y = 30 * mm
-
-        try:
-            img = Image.open(io.BytesIO(self.image_bytes))
-            max_width = 60 * mm
-            max_height = 25 * mm
-            img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+@lru_cache(maxsize=32)
+def _render_text_image(text: str, font_style: str) -> Image.Image:
+    """Text-Signatur einmal rendern; das Bild wird geteilt und nicht verändert"""
+    return TextSignatureService(text, font_style)._render_text_signature()
 
-            temp_buffer = io.BytesIO()
-            img.save(temp_buffer, format='PNG')
-            temp_buffer.seek(0)
 
-            from reportlab.lib.utils import ImageReader
-            c.drawImage(
-                ImageReader(temp_buffer),
-                sig_x - img.width / 2,
-                sig_y,
-                width=img.width,
-                height=img.height,
-                mask='auto'
-            )
-        except Exception as e:
-            print(f"Fehler beim Laden des Signaturbilds: {e}")
-
-        c.save()
-        return buffer.getvalue()
-
-    def _merge_signature(self, pdf_bytes: bytes, overlay_bytes: bytes) -> bytes:
-        """Füge Signatur-Overlay zur letzten Seite hinzu"""
-        pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
-        overlay_reader = PdfReader(io.BytesIO(overlay_bytes))
-        writer = PdfWriter()
+@lru_cache(maxsize=32)
+def _render_text_png(text: str, font_style: str) -> bytes:
+    """Text-Signatur als PNG-Bytes (für die Vorschau als data:-URL)"""
+    buffer = io.BytesIO()
+    _render_text_image(text, font_style).save(buffer, format='PNG')
+    return buffer.getvalue()
 
-        for i, page in enumerate(pdf_reader.pages):
-            if i == len(pdf_reader.pages) - 1:
-                page.merge_page(overlay_reader.pages[0])
-            writer.add_page(page)
-
-        output = io.BytesIO()
-        writer.write(output)
-        return output.getvalue()
 
+class VisualSignatureServiceFromBytes(_VisualSignatureBase):
+    """Hilfsklasse für visuelle Signaturen aus Bytes"""
 
-def get_signature_type(db: Session) -> SignatureType:
-    """Hole den konfigurierten Signaturtyp"""
-    sig_type = get_signature_setting(db, SIGNATURE_TYPE_KEY, "NONE")
+    def __init__(self, image_bytes: bytes, high_quality: bool = False):
+        self.image_bytes = image_bytes
+        self.high_quality = high_quality
+
+    def _open_source(self) -> Image.Image:
+        return Image.open(io.BytesIO(self.image_bytes))
+
+
+class VisualSignatureServiceFromPILImage(_VisualSignatureBase):
+    """Hilfsklasse für visuelle Signaturen aus einem bereits gerenderten PIL-Bild"""
+
+    def __init__(self, image: Image.Image, high_quality: bool = False):
+        self.image = image
+        self.high_quality = high_quality
+
+    def _open_source(self) -> Image.Image:
+        # Kopie: das Ausgangsbild ist gecacht und wird geteilt
+        return self.image.copy()
+
+
+def _load_signer(
+    pkcs12_path: str, password: str, mtime_ns: Optional[int] = None
+) -> signers.SimpleSigner:
+    """PKCS#12 laden, gecacht pro Dateiversion und Passwort"""
+    passphrase = password.encode('utf-8')
+    if mtime_ns is None:
+        mtime_ns = os.stat(pkcs12_path).st_mtime_ns
+    key = (pkcs12_path, mtime_ns, hashlib.sha256(passphrase).digest())
+    with _signer_cache_lock:
+        signer = _SIGNER_CACHE.get(key)
+    if signer is not None:
+        return signer
+
+    signer = signers.SimpleSigner.load_pkcs12(pfx_file=pkcs12_path, passphrase=passphrase)
+    if signer is not None:
+        with _signer_cache_lock:
+            if len(_SIGNER_CACHE) >= _SIGNER_CACHE_MAX:
+                _SIGNER_CACHE.clear()
+            _SIGNER_CACHE[key] = signer
+    return signer
+
+
+def get_signature_type(
+    db: Session, sig_settings: Optional[dict[str, str]] = None
+) -> SignatureType:
+    """Hole den konfigurierten Signaturtyp (optional aus bereits geladenen Einstellungen)"""
+    if sig_settings is None:
+        sig_type = get_signature_setting(db, SIGNATURE_TYPE_KEY, "NONE")
+    else:
+        sig_type = sig_settings[SIGNATURE_TYPE_KEY]
     if sig_type in ["NONE", "CERTIFICATE", "PAD", "IMAGE", "TEXT"]:
         return sig_type
     return "NONE"
 
 
-def create_signature_service(db: Session) -> Optional[BaseSignatureService]:
+def create_signature_service(
+    db: Session, sig_settings: Optional[dict[str, str]] = None
+) -> Optional[BaseSignatureService]:
     """
     Factory-Funktion für SignatureService basierend auf DB-Einstellungen.
 
+    Der Service wird pro Prozess gecacht. Schlüssel sind die Einstellungswerte
+    selbst plus mtime der Zertifikats-/Bilddatei; geänderte Einstellungen (auch
+    aus anderen Prozessen) oder eine neu hochgeladene Datei erzeugen ihn neu.
+
+    Args:
+        sig_settings: Ergebnis von load_signature_settings() (sonst wird geladen)
+
     Returns None wenn keine Signatur konfiguriert.
     """
-    sig_type = get_signature_type(db)
+    if sig_settings is None:
+        sig_settings = load_signature_settings(db)
+    sig_type = get_signature_type(db, sig_settings)
 
     if sig_type == "NONE":
         return None
 
     if sig_type == "CERTIFICATE":
-        cert_path = get_signature_setting(db, SIGNATURE_CERT_PATH_KEY)
-        encrypted_password = get_signature_setting(db, SIGNATURE_CERT_PASSWORD_KEY)
+        source_path = sig_settings[SIGNATURE_CERT_PATH_KEY]
+    elif sig_type in ["PAD", "IMAGE"]:
+        source_path = sig_settings[SIGNATURE_IMAGE_PATH_KEY]
+    else:
+        source_path = ""
+
+    mtime_ns = None
+    if source_path:
+        try:
+            mtime_ns = os.stat(source_path).st_mtime_ns
+        except OSError:
+            pass
+
+    return _build_signature_service(
+        sig_type, tuple(sig_settings[key] for key in SIGNATURE_SETTING_KEYS), mtime_ns
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_signature_service(
+    sig_type: SignatureType, values: tuple[str, ...], mtime_ns: Optional[int]
+) -> Optional[BaseSignatureService]:
+    """Service erzeugen (gecacht, siehe create_signature_service)"""
+    sig_settings = dict(zip(SIGNATURE_SETTING_KEYS, values))
+
+    if sig_type == "CERTIFICATE":
+        cert_path = sig_settings[SIGNATURE_CERT_PATH_KEY]
+        encrypted_password = sig_settings[SIGNATURE_CERT_PASSWORD_KEY]
 
         if not cert_path or not encrypted_password:
             return None
 
-        cert_file = Path(cert_path)
-        if not cert_file.exists():
+        if mtime_ns is None:
             print(f"Warnung: Zertifikat nicht gefunden: {cert_path}")
             return None
 
         try:
-            password = decrypt_value(encrypted_password)
-            return CryptographicSigningService(cert_path, password)
+            return CryptographicSigningService(
+                cert_path, decrypt_value(encrypted_password), mtime_ns
+            )
         except Exception as e:
             print(f"Fehler beim Laden des Zertifikats: {e}")
             return None
 
     if sig_type in ["PAD", "IMAGE"]:
-        image_path = get_signature_setting(db, SIGNATURE_IMAGE_PATH_KEY)
+        image_path = sig_settings[SIGNATURE_IMAGE_PATH_KEY]
 
         if not image_path:
             return None
@@ -405,8 +536,8 @@ def create_signature_service(db: Session) -> Optional[BaseSignatureService]:
             return None
 
     if sig_type == "TEXT":
-        text = get_signature_setting(db, SIGNATURE_TEXT_KEY)
-        font_style = get_signature_setting(db, SIGNATURE_TEXT_FONT_KEY, "HANDWRITING")
+        text = sig_settings[SIGNATURE_TEXT_KEY]
+        font_style = sig_settings[SIGNATURE_TEXT_FONT_KEY] or "HANDWRITING"
 
         if not text:
             return None
@@ -430,13 +561,15 @@ def create_signing_service(cert_path: Optional[str], password: Optional[str]) ->
     if not cert_path or not password:
         return None
 
-    cert_file = Path(cert_path)
-    if not cert_file.exists():
+    # Ein stat-Aufruf für Existenzprüfung und Cache-Schlüssel
+    try:
+        mtime_ns = os.stat(cert_path).st_mtime_ns
+    except OSError:
         print(f"Warnung: Zertifikat nicht gefunden: {cert_path}")
         return None
 
     try:
-        return CryptographicSigningService(cert_path, password)
+        return CryptographicSigningService(cert_path, password, mtime_ns)
     except Exception as e:
         print(f"Fehler beim Laden des Zertifikats: {e}")
         return None
@@ -459,22 +592,40 @@ def validate_pkcs12(cert_path: str, password: str) -> tuple[bool, str]:
         return False, f"Fehler beim Laden des Zertifikats: {str(e)}"
 
 
-def get_signature_image_base64(db: Session) -> Optional[str]:
+@lru_cache(maxsize=8)
+def _image_data_url(image_path: str, mtime_ns: int) -> str:
+    """
+    Signaturbild als data:-URL, einmal pro Prozess gelesen und encodiert.
+
+    Schlüssel enthält mtime: ein neu hochgeladenes Bild wird neu gelesen.
+    """
+    b64 = base64.b64encode(Path(image_path).read_bytes()).decode('utf-8')
+    return f"data:image/png;base64,{b64}"
+
+
+def get_signature_image_base64(
+    db: Session, sig_settings: Optional[dict[str, str]] = None
+) -> Optional[str]:
     """
     Hole das Signaturbild als Base64-String für HTML-Embedding.
 
+    Args:
+        sig_settings: Ergebnis von load_signature_settings() (sonst wird geladen)
+
     Returns:
         Base64-encodiertes PNG mit data:image/png;base64, prefix
         oder None wenn keine visuelle Signatur konfiguriert
     """
-    sig_type = get_signature_type(db)
+    if sig_settings is None:
+        sig_settings = load_signature_settings(db)
+    sig_type = get_signature_type(db, sig_settings)
 
     if sig_type == "NONE" or sig_type == "CERTIFICATE":
         # Keine visuelle Signatur
         return None
 
     if sig_type in ["PAD", "IMAGE"]:
-        image_path = get_signature_setting(db, SIGNATURE_IMAGE_PATH_KEY)
+        image_path = sig_settings[SIGNATURE_IMAGE_PATH_KEY]
 
         if not image_path:
             return None
@@ -484,27 +635,20 @@ def get_signature_image_base64(db: Session) -> Optional[str]:
             return None
 
         try:
-            image_data = path.read_bytes()
-            b64 = base64.b64encode(image_data).decode('utf-8')
-            return f"data:image/png;base64,{b64}"
+            return _image_data_url(image_path, path.stat().st_mtime_ns)
         except Exception as e:
             print(f"Fehler beim Lesen des Signaturbilds: {e}")
             return None
 
     if sig_type == "TEXT":
-        text = get_signature_setting(db, SIGNATURE_TEXT_KEY)
-        font_style = get_signature_setting(db, SIGNATURE_TEXT_FONT_KEY, "HANDWRITING")
+        text = sig_settings[SIGNATURE_TEXT_KEY]
+        font_style = sig_settings[SIGNATURE_TEXT_FONT_KEY] or "HANDWRITING"
 
         if not text:
             return None
 
         try:
-            service = TextSignatureService(text, font_style)
-            img = service._render_text_signature()
-
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            b64 = base64.b64encode(_render_text_png(text, font_style)).decode('utf-8')
             return f"data:image/png;base64,{b64}"
         except Exception as e:
             print(f"Fehler beim Rendern der Text-Signatur: {e}")
@@ -513,6 +657,31 @@ def get_signature_image_base64(db: Session) -> Optional[str]:
     return None
 
 
+def _trim_signature_png(image_data: bytes) -> bytes:
+    """
+    Transparenten Rand einer Canvas-Zeichnung abschneiden und PNG optimiert speichern.
+
+    Die Bounding Box des Alpha-Kanals berechnet Pillow in C (getbbox) in einem
+    Durchlauf. Ohne Alpha-Kanal, bei leerem Bild oder nicht lesbaren Daten bleibt
+    das Original unverändert.
+    """
+    try:
+        with Image.open(io.BytesIO(image_data)) as img:
+            if img.mode not in ("RGBA", "LA") and "transparency" not in img.info:
+                return image_data
+            rgba = img.convert("RGBA")
+    except Exception:
+        return image_data
+
+    bbox = rgba.getchannel("A").getbbox()
+    if bbox is None:
+        return image_data
+
+    buffer = io.BytesIO()
+    rgba.crop(bbox).save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
 def save_signature_image_from_base64(
     base64_data: str,
     upload_dir: str,
@@ -533,8 +702,8 @@ def save_signature_image_from_base64(
     if "," in base64_data:
         base64_data = base64_data.split(",")[1]
 
-    # Decodieren
-    image_data = base64.b64decode(base64_data)
+    # Decodieren und leeren (transparenten) Rand entfernen
+    image_data = _trim_signature_png(base64.b64decode(base64_data))
 
     # Verzeichnis erstellen
     sig_dir = Path(upload_dir) / "signatures" / "images"
@@ -13,8 +13,14 @@ Defaults:
     password: dev_password
 """
 import sys
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from OpenSSL import crypto
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import pkcs12
+from cryptography.x509.oid import NameOID
 
 
 def create_self_signed_cert(
@@ -36,26 +42,36 @@ def create_self_signed_cert(
         country: Ländercode (2 Buchstaben)
         validity_days: Gültigkeitsdauer in Tagen
     """
-    # RSA-Schlüssel generieren
-    key = crypto.PKey()
-    key.generate_key(crypto.TYPE_RSA, 4096)
+    # ECDSA-Schlüssel (P-256): Erzeugung in Millisekunden statt Sekunden wie bei
+    # RSA-4096, und jede PDF-Signatur ist deutlich schneller
+    key = ec.generate_private_key(ec.SECP256R1())
 
     # Zertifikat erstellen
-    cert = crypto.X509()
-    cert.get_subject().C = country
-    cert.get_subject().O = organization
-    cert.get_subject().CN = common_name
-    cert.set_serial_number(1000)
-    cert.gmtime_adj_notBefore(0)
-    cert.gmtime_adj_notAfter(validity_days * 24 * 60 * 60)
-    cert.set_issuer(cert.get_subject())
-    cert.set_pubkey(key)
-    cert.sign(key, 'sha256')
+    name = x509.Name([
+        x509.NameAttribute(NameOID.COUNTRY_NAME, country),
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, organization),
+        x509.NameAttribute(NameOID.COMMON_NAME, common_name),
+    ])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=validity_days))
+        .sign(key, hashes.SHA256())
+    )
 
     # PKCS#12 Container erstellen
-    p12 = crypto.PKCS12()
-    p12.set_privatekey(key)
-    p12.set_certificate(cert)
+    p12 = pkcs12.serialize_key_and_certificates(
+        name=common_name.encode('utf-8'),
+        key=key,
+        cert=cert,
+        cas=None,
+        encryption_algorithm=serialization.BestAvailableEncryption(password.encode('utf-8')),
+    )
 
     # Ausgabeverzeichnis erstellen
     output_file = Path(output_path)
@@ -63,11 +79,12 @@ def create_self_signed_cert(
 
     # Datei schreiben
     with open(output_file, 'wb') as f:
-        f.write(p12.export(password.encode('utf-8')))
+        f.write(p12)
 
     print(f"Zertifikat erstellt: {output_file.absolute()}")
     print(f"  Organisation: {organization}")
     print(f"  Common Name: {common_name}")
+    print("  Schlüssel: ECDSA P-256")
     print(f"  Gültig für: {validity_days} Tage")
     print(f"  Passwort: {password}")
     print()
@@ -25,6 +25,7 @@ export default function SettingsPage() {
   const [llmForm, setLlmForm] = useState({
     openrouter_api_key: '',
     openrouter_model: '',
+    openrouter_fast_model: '',
     llm_correction_enabled: false,
   })
 
@@ -44,6 +45,7 @@ export default function SettingsPage() {
       setLlmForm({
         openrouter_api_key: '', // Never pre-fill API key
         openrouter_model: settings.openrouter_model || '',
+        openrouter_fast_model: settings.openrouter_fast_model || '',
         llm_correction_enabled: settings.llm_correction_enabled,
       })
     }
@@ -58,6 +60,7 @@ export default function SettingsPage() {
   const handleSaveLlm = async () => {
     const updateData: Record<string, unknown> = {
       openrouter_model: llmForm.openrouter_model,
+      openrouter_fast_model: llmForm.openrouter_fast_model,
       llm_correction_enabled: llmForm.llm_correction_enabled,
     }
     // Only send API key if it was changed (not empty)
@@ -244,6 +247,27 @@ export default function SettingsPage() {
               </p>
             </div>
 
+            {/* Fast Model for simple receipts */}
+            <div className="space-y-2">
+              <Label htmlFor="openrouter_fast_model">Modell fuer einfache Belege (optional)</Label>
+              <select
+                id="openrouter_fast_model"
+                value={llmForm.openrouter_fast_model}
+                onChange={(e) => setLlmForm({ ...llmForm, openrouter_fast_model: e.target.value })}
+                className="w-full h-10 px-3 rounded-md border border-input bg-background text-sm ring-offset-background focus:outline-none focus:ring-2 focus:ring-ring focus:ring-offset-2"
+              >
+                <option value="">-- Immer das Hauptmodell verwenden --</option>
+                {recommendedModels?.map((model) => (
+                  <option key={model.id} value={model.id}>
+                    {model.name}
+                  </option>
+                ))}
+              </select>
+              <p className="text-xs text-muted-foreground">
+                Kurze, gut lesbare Belege ohne Positionstabelle werden mit diesem Modell ausgelesen.
+              </p>
+            </div>
+
             {/* Enable Toggle */}
             <div className="flex items-center justify-between p-4 border rounded-lg">
               <div className="space-y-0.5">
@@ -109,13 +109,13 @@ export function UnitSettlementsList({ settlementId, isFinalized }: UnitSettlemen
             >
               <div className="flex-1 min-w-0">
                 <div className="flex items-center gap-2">
-                  <span className="font-medium">{us.unit.designation}</span>
+                  <span className="font-medium">{us.unit_designation}</span>
                   <span className="text-muted-foreground">|</span>
-                  <span className="text-muted-foreground">{us.tenant.full_name}</span>
-                  {us.documents.length > 0 && (
+                  <span className="text-muted-foreground">{us.tenant_name}</span>
+                  {us.document_count > 0 && (
                     <Badge variant="outline" className="ml-2">
                       <FileText className="h-3 w-3 mr-1" />
-                      {us.documents.length}
+                      {us.document_count}
                     </Badge>
                   )}
                 </div>
@@ -131,7 +131,7 @@ export function UnitSettlementsList({ settlementId, isFinalized }: UnitSettlemen
                 <Button
                   variant="outline"
                   size="sm"
-                  onClick={(e) => handleExportPdf(e, us.id, us.unit.designation, us.tenant.last_name)}
+                  onClick={(e) => handleExportPdf(e, us.id, us.unit_designation, us.tenant_last_name)}
                   disabled={exportingId === us.id}
                 >
                   {exportingId === us.id ? (
@@ -17,6 +17,7 @@ export interface Settings {
   // LLM-Einstellungen
   openrouter_api_key_set: boolean
   openrouter_model: string
+  openrouter_fast_model: string | null
   llm_correction_enabled: boolean
 }
 
@@ -28,6 +29,7 @@ export interface SettingsUpdate {
   // LLM-Einstellungen
   openrouter_api_key?: string
   openrouter_model?: string
+  openrouter_fast_model?: string
   llm_correction_enabled?: boolean
 }
 
@@ -486,8 +486,24 @@ export interface UnitAllocationUpdate {
   custom_value?: number
 }
 
+export interface UnitSettlementListItem {
+  id: string
+  settlement_id: string
+  unit_id: string
+  tenant_id: string
+  total_costs: number
+  total_prepayments: number
+  balance: number
+  occupancy_days: number
+  unit_designation: string
+  tenant_name: string
+  tenant_last_name: string
+  document_count: number
+  created_at: string
+}
+
 export interface UnitSettlementListResponse {
-  unit_settlements: UnitSettlement[]
+  unit_settlements: UnitSettlementListItem[]
   total_costs: number
   total_balance: number
 }